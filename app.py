@@ -13,17 +13,14 @@ NOTA: Usa Google Sheets como base de datos para persistencia en la nube
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 import calendar
 from math import ceil
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from functools import lru_cache, partial
+from copy import copy
 import io
 
 # Importar el módulo de Google Sheets
@@ -35,6 +32,9 @@ except Exception as e:
     st.info("Asegúrate de tener configurado .streamlit/secrets.toml")
     USAR_GOOGLE_SHEETS = False
 
+# Nombres de los meses, calculados una sola vez por proceso
+MESES = {i: calendar.month_name[i] for i in range(1, 13)}
+
 # ==================== CONFIGURACIÓN DE LA BASE DE DATOS ====================
 
 @st.cache_resource
@@ -42,6 +42,9 @@ def get_database():
     """
     Obtiene la instancia de la base de datos (Google Sheets).
     Usa cache para no reconectar en cada interacción.
+    La creación de tablas también se ejecuta una sola vez por proceso;
+    si cambia la estructura de las hojas hay que limpiar la cache con
+    st.cache_resource.clear() para que se vuelva a inicializar.
     
     Returns:
         GoogleSheetsDB: Instancia de la base de datos
@@ -76,8 +79,59 @@ def conectar_db():
     """
     return get_database()
 
+@st.cache_resource
+def _obtener_estado_datos():
+    """
+    Contador compartido por todas las sesiones que cambia con cada escritura.
+    Las lecturas cacheadas lo reciben como argumento para invalidarse solas.
+    """
+    return {'version': 0}
+
+def obtener_version_datos():
+    """
+    Devuelve la versión actual de los datos.
+    """
+    return _obtener_estado_datos()['version']
+
+def invalidar_cache_datos():
+    """
+    Marca los datos como modificados para que las lecturas cacheadas se recalculen.
+    Debe llamarse después de cualquier escritura en la base de datos.
+    """
+    _obtener_estado_datos()['version'] += 1
+
+def consultar_dataframe(conn, query, params=(), tipos=None):
+    """
+    Ejecuta una consulta y arma el DataFrame directamente con las filas del
+    cursor, sin la capa genérica de pd.read_sql_query.
+    tipos: dict opcional {columna: dtype} para convertir columnas al final
+    """
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    columns = [description[0] for description in cursor.description]
+    df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+    if tipos:
+        df = df.astype(tipos)
+    return df
+
 # ==================== FUNCIONES CRUD GASTOS MENSUALES ====================
 
+def calcular_distribucion_base(tipo_distribucion, monto_total, monto_fijo_ricardo=None,
+                               monto_fijo_wendy=None, porcentaje_ricardo=50.0):
+    """
+    Traduce el tipo de distribución elegido en el formulario a los valores
+    que se guardan en la base de datos.
+    Returns: (dist_ricardo, dist_wendy)
+    """
+    if tipo_distribucion == 'fijo_ricardo':
+        return (monto_fijo_ricardo if monto_fijo_ricardo else monto_total, 0)
+    elif tipo_distribucion == 'fijo_wendy':
+        return (0, monto_fijo_wendy if monto_fijo_wendy else monto_total)
+    elif tipo_distribucion == 'personalizado':
+        return (porcentaje_ricardo, 100 - porcentaje_ricardo)
+    else:  # '50/50' (por defecto)
+        return (50.0, 50.0)
+
 def crear_gasto_mensual(db, concepto, monto_total, frecuencia, tipo_monto='fijo',
                        tipo_distribucion='50/50', monto_fijo_ricardo=None, monto_fijo_wendy=None,
                        porcentaje_ricardo=50.0, grupo=None):
@@ -90,24 +144,13 @@ def crear_gasto_mensual(db, concepto, monto_total, frecuencia, tipo_monto='fijo'
     """
     try:
         # Calcular distribución según el tipo
-        if tipo_distribucion == '50/50':
-            dist_ricardo = 50.0
-            dist_wendy = 50.0
-        elif tipo_distribucion == 'fijo_ricardo':
-            dist_ricardo = monto_fijo_ricardo if monto_fijo_ricardo else monto_total
-            dist_wendy = 0
-        elif tipo_distribucion == 'fijo_wendy':
-            dist_ricardo = 0
-            dist_wendy = monto_fijo_wendy if monto_fijo_wendy else monto_total
-        elif tipo_distribucion == 'personalizado':
-            dist_ricardo = porcentaje_ricardo
-            dist_wendy = 100 - porcentaje_ricardo
-        else:
-            dist_ricardo = 50.0
-            dist_wendy = 50.0
+        dist_ricardo, dist_wendy = calcular_distribucion_base(
+            tipo_distribucion, monto_total, monto_fijo_ricardo, monto_fijo_wendy, porcentaje_ricardo
+        )
         
         # Insertar en Google Sheets
         gasto_id = db.insertar_gasto_mensual(concepto, monto_total, frecuencia, dist_ricardo, dist_wendy)
+        invalidar_cache_datos()
         return True
     except Exception as e:
         st.error(f"Error al crear gasto: {e}")
@@ -116,16 +159,21 @@ def crear_gasto_mensual(db, concepto, monto_total, frecuencia, tipo_monto='fijo'
 def leer_gastos_mensuales(db, solo_activos=True):
     """
     Lee todos los gastos mensuales.
+    El resultado se cachea hasta la siguiente escritura desde la app, y como
+    mucho 5 minutos por si la hoja se edita directamente en Google Sheets.
     
     NOTA: Adaptado para Google Sheets
     """
     try:
-        df = db.obtener_gastos_mensuales()
-        return df
+        return _leer_gastos_mensuales(db, obtener_version_datos())
     except Exception as e:
         st.error(f"Error al leer gastos: {e}")
         return pd.DataFrame()
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _leer_gastos_mensuales(_db, version_datos):
+    return _db.obtener_gastos_mensuales()
+
 def actualizar_gasto_mensual(db, id_gasto, concepto, monto_total, frecuencia, tipo_monto,
                             tipo_distribucion='50/50', monto_fijo_ricardo=None, monto_fijo_wendy=None,
                             porcentaje_ricardo=50.0, grupo=None):
@@ -136,23 +184,12 @@ def actualizar_gasto_mensual(db, id_gasto, concepto, monto_total, frecuencia, ti
     """
     try:
         # Calcular distribución
-        if tipo_distribucion == '50/50':
-            dist_ricardo = 50.0
-            dist_wendy = 50.0
-        elif tipo_distribucion == 'fijo_ricardo':
-            dist_ricardo = monto_fijo_ricardo if monto_fijo_ricardo else monto_total
-            dist_wendy = 0
-        elif tipo_distribucion == 'fijo_wendy':
-            dist_ricardo = 0
-            dist_wendy = monto_fijo_wendy if monto_fijo_wendy else monto_total
-        elif tipo_distribucion == 'personalizado':
-            dist_ricardo = porcentaje_ricardo
-            dist_wendy = 100 - porcentaje_ricardo
-        else:
-            dist_ricardo = 50.0
-            dist_wendy = 50.0
+        dist_ricardo, dist_wendy = calcular_distribucion_base(
+            tipo_distribucion, monto_total, monto_fijo_ricardo, monto_fijo_wendy, porcentaje_ricardo
+        )
         
         db.actualizar_gasto_mensual(id_gasto, concepto, monto_total, frecuencia, dist_ricardo, dist_wendy)
+        invalidar_cache_datos()
         return True
     except Exception as e:
         st.error(f"Error al actualizar gasto: {e}")
@@ -166,6 +203,7 @@ def desactivar_gasto_mensual(db, id_gasto):
     """
     try:
         db.eliminar_gasto_mensual(id_gasto)
+        invalidar_cache_datos()
         return True
     except Exception as e:
         st.error(f"Error al eliminar gasto: {e}")
@@ -180,21 +218,17 @@ def obtener_monto_del_mes(conn, gasto_id, mes, anio):
     """
     cursor = conn.cursor()
     
-    # Primero buscar si hay un monto específico para este mes
+    # Monto específico del mes, o el monto base si no existe, en una sola consulta
     cursor.execute('''
-        SELECT monto_total FROM montos_mensuales
-        WHERE gasto_id = ? AND mes = ? AND anio = ?
-    ''', (gasto_id, mes, anio))
-    
-    resultado = cursor.fetchone()
+        SELECT COALESCE(
+            (SELECT monto_total FROM montos_mensuales
+             WHERE gasto_id = ? AND mes = ? AND anio = ?),
+            (SELECT monto_total FROM gastos_mensuales WHERE id = ?),
+            0.0
+        )
+    ''', (gasto_id, mes, anio, gasto_id))
     
-    if resultado:
-        return resultado[0]
-    else:
-        # Si no existe, devolver el monto base
-        cursor.execute('SELECT monto_total FROM gastos_mensuales WHERE id = ?', (gasto_id,))
-        resultado_base = cursor.fetchone()
-        return resultado_base[0] if resultado_base else 0.0
+    return cursor.fetchone()[0]
 
 def establecer_monto_del_mes(conn, gasto_id, mes, anio, monto):
     """
@@ -205,32 +239,24 @@ def establecer_monto_del_mes(conn, gasto_id, mes, anio, monto):
     fecha_actual = datetime.now().strftime('%Y-%m-%d')
     
     try:
-        # Verificar si ya existe un registro para este gasto en este mes
-        cursor.execute('''
-            SELECT id FROM montos_mensuales
-            WHERE gasto_id = ? AND mes = ? AND anio = ?
-        ''', (gasto_id, mes, anio))
-        
-        existe = cursor.fetchone()
-        
-        if existe:
-            # Actualizar el registro existente
+        with conn:
+            # Actualizar el registro existente, si lo hay
             cursor.execute('''
                 UPDATE montos_mensuales
                 SET monto_total = ?, fecha_registro = ?
                 WHERE gasto_id = ? AND mes = ? AND anio = ?
             ''', (monto, fecha_actual, gasto_id, mes, anio))
-        else:
-            # Insertar nuevo registro
-            cursor.execute('''
-                INSERT INTO montos_mensuales (gasto_id, mes, anio, monto_total, fecha_registro)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (gasto_id, mes, anio, monto, fecha_actual))
-        
-        conn.commit()
+            
+            if cursor.rowcount == 0:
+                # No existía: insertar nuevo registro
+                cursor.execute('''
+                    INSERT INTO montos_mensuales (gasto_id, mes, anio, monto_total, fecha_registro)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (gasto_id, mes, anio, monto, fecha_actual))
+
+        invalidar_cache_datos()
         return True
     except Exception as e:
-        conn.rollback()
         print(f"Error al establecer monto del mes: {e}")
         return False
 
@@ -240,28 +266,67 @@ def obtener_montos_configurados(conn, mes, anio):
     Si el gasto es 'variable', busca el monto personalizado del mes.
     Si el gasto es 'fijo', siempre usa el monto base.
     Incluye información de distribución personalizada.
+    El resultado se cachea por mes hasta la siguiente escritura.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT g.id, g.concepto, g.frecuencia, g.tipo_monto,
-               CASE 
-                   WHEN g.tipo_monto = 'variable' THEN COALESCE(m.monto_total, g.monto_total)
-                   ELSE g.monto_total
-               END as monto_total,
-               CASE WHEN m.id IS NOT NULL THEN 1 ELSE 0 END as personalizado,
-               g.tipo_distribucion, g.monto_fijo_ricardo, g.monto_fijo_wendy,
-               g.porcentaje_ricardo, g.grupo
-        FROM gastos_mensuales g
-        LEFT JOIN montos_mensuales m ON g.id = m.gasto_id AND m.mes = ? AND m.anio = ?
-        WHERE g.activo = 1
-        ORDER BY g.grupo, g.concepto
-    """, (mes, anio))
+    return _obtener_montos_configurados(conn, mes, anio, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _obtener_montos_configurados(_conn, mes, anio, version_datos):
+    cursor = _conn.cursor()
+    
+    # La mayoría de los meses no tienen montos personalizados: en ese caso
+    # no hace falta el LEFT JOIN con montos_mensuales
+    cursor.execute('''
+        SELECT EXISTS(SELECT 1 FROM montos_mensuales WHERE mes = ? AND anio = ?)
+    ''', (mes, anio))
+    hay_personalizados = cursor.fetchone()[0]
+    
+    if hay_personalizados:
+        cursor.execute("""
+            SELECT g.id, g.concepto, g.frecuencia, g.tipo_monto,
+                   CASE 
+                       WHEN g.tipo_monto = 'variable' THEN COALESCE(m.monto_total, g.monto_total)
+                       ELSE g.monto_total
+                   END as monto_total,
+                   CASE WHEN m.id IS NOT NULL THEN 1 ELSE 0 END as personalizado,
+                   g.tipo_distribucion, g.monto_fijo_ricardo, g.monto_fijo_wendy,
+                   g.porcentaje_ricardo, g.grupo
+            FROM gastos_mensuales g
+            LEFT JOIN montos_mensuales m ON g.id = m.gasto_id AND m.mes = ? AND m.anio = ?
+            WHERE g.activo = 1
+            ORDER BY g.grupo, g.concepto
+        """, (mes, anio))
+    else:
+        cursor.execute("""
+            SELECT g.id, g.concepto, g.frecuencia, g.tipo_monto,
+                   g.monto_total,
+                   0 as personalizado,
+                   g.tipo_distribucion, g.monto_fijo_ricardo, g.monto_fijo_wendy,
+                   g.porcentaje_ricardo, g.grupo
+            FROM gastos_mensuales g
+            WHERE g.activo = 1
+            ORDER BY g.grupo, g.concepto
+        """)
     
     columns = [description[0] for description in cursor.description]
     rows = cursor.fetchall()
     df = pd.DataFrame(rows, columns=columns)
     return df
 
+def obtener_montos_configurados_sesion(conn, mes, anio):
+    """
+    Igual que obtener_montos_configurados, pero guarda el último resultado en
+    st.session_state para que las reejecuciones de la misma sesión que solo
+    cambian widgets no paguen la copia que devuelve st.cache_data.
+    El DataFrame devuelto es compartido: no se debe modificar en el lugar.
+    """
+    clave = (mes, anio, obtener_version_datos())
+    guardado = st.session_state.get('montos_configurados')
+    if guardado is None or guardado[0] != clave:
+        guardado = (clave, obtener_montos_configurados(conn, mes, anio))
+        st.session_state['montos_configurados'] = guardado
+    return guardado[1]
+
 # ==================== FUNCIONES AUXILIARES PARA FRECUENCIAS ====================
 
 def calcular_distribucion_pago(gasto, monto_total_mes):
@@ -290,6 +355,69 @@ def calcular_distribucion_pago(gasto, monto_total_mes):
     
     return (monto_ricardo, monto_wendy)
 
+# Textos de la distribución según tipo_distribucion. Se rellenan con los montos
+# de Ricardo y Wendy (r, w) y sus porcentajes (pr, pw) en describir_distribucion
+TEXTOS_DISTRIBUCION_PAGO = {
+    '50/50': "⚖️ 50/50 - ${r:.2f} cada uno",
+    'fijo_ricardo': "💰 Ricardo paga ${r:.2f} fijo, Wendy ${w:.2f}",
+    'fijo_wendy': "💰 Wendy paga ${w:.2f} fijo, Ricardo ${r:.2f}",
+    'personalizado': "⚖️ Ricardo {pr:.0f}% (${r:.2f}), Wendy {pw:.0f}% (${w:.2f})"
+}
+
+TEXTOS_DISTRIBUCION_RESUMEN = {
+    'agrupado': "📦 Ver grupo",
+    '50/50': "⚖️ c/u: ${r:.2f}",
+    'fijo_ricardo': "💰R ${r:.2f} | W ${w:.2f}",
+    'fijo_wendy': "R ${r:.2f} | 💰W ${w:.2f}",
+    'personalizado': "⚙️ R {pr:.0f}% | W {pw:.0f}%"
+}
+
+def describir_distribucion(plantilla, gasto, monto_ricardo, monto_wendy):
+    """
+    Rellena una de las plantillas de TEXTOS_DISTRIBUCION_* para un gasto.
+    """
+    porcentaje_r = gasto.get('porcentaje_ricardo', 50.0) or 50.0
+    return plantilla.format(r=monto_ricardo, w=monto_wendy,
+                            pr=porcentaje_r, pw=100 - porcentaje_r)
+
+def _valores_o_defecto(serie, defecto):
+    """
+    Equivalente vectorizado de `valor or defecto`: los nulos y ceros toman el defecto.
+    """
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+    return np.where(np.isnan(valores) | (valores == 0), defecto, valores)
+
+def calcular_distribucion_vectorizada(gastos_df, montos_mes):
+    """
+    Versión vectorizada de calcular_distribucion_pago para todos los gastos a la vez.
+    montos_mes: monto total del mes de cada gasto, en el mismo orden que gastos_df
+    Returns: (montos_ricardo, montos_wendy) como arrays de NumPy
+    """
+    tipo_dist = gastos_df['tipo_distribucion'].to_numpy()
+    total = np.asarray(montos_mes, dtype=float)
+    fijo_ricardo = _valores_o_defecto(gastos_df['monto_fijo_ricardo'], 0.0)
+    fijo_wendy = _valores_o_defecto(gastos_df['monto_fijo_wendy'], 0.0)
+    porcentaje_r = _valores_o_defecto(gastos_df['porcentaje_ricardo'], 50.0)
+    
+    condiciones = [
+        tipo_dist == 'fijo_ricardo',
+        tipo_dist == 'fijo_wendy',
+        tipo_dist == 'personalizado'
+    ]
+    # '50/50' (por defecto) queda como valor por defecto de np.select
+    montos_ricardo = np.select(
+        condiciones,
+        [fijo_ricardo, np.maximum(0, total - fijo_wendy), total * (porcentaje_r / 100)],
+        default=total / 2
+    )
+    montos_wendy = np.select(
+        condiciones,
+        [np.maximum(0, total - fijo_ricardo), fijo_wendy, total - montos_ricardo],
+        default=total / 2
+    )
+    
+    return montos_ricardo, montos_wendy
+
 # ==================== FUNCIONES DE GRUPOS DE DISTRIBUCIÓN ====================
 
 def crear_grupo_distribucion(conn, nombre, descripcion, quien_paga_fijo, monto_fijo, gastos_ids):
@@ -306,73 +434,80 @@ def crear_grupo_distribucion(conn, nombre, descripcion, quien_paga_fijo, monto_f
         monto_r = monto_fijo if quien_paga_fijo == 'Ricardo' else None
         monto_w = monto_fijo if quien_paga_fijo == 'Wendy' else None
         
-        cursor.execute('''
-            INSERT INTO grupos_distribucion 
-            (nombre, descripcion, monto_fijo_ricardo, monto_fijo_wendy, quien_paga_fijo)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (nombre, descripcion, monto_r, monto_w, quien_paga_fijo))
+        with conn:
+            cursor.execute('''
+                INSERT INTO grupos_distribucion 
+                (nombre, descripcion, monto_fijo_ricardo, monto_fijo_wendy, quien_paga_fijo)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (nombre, descripcion, monto_r, monto_w, quien_paga_fijo))
         
-        grupo_id = cursor.lastrowid
+            grupo_id = cursor.lastrowid
         
-        # Asociar gastos al grupo
-        for gasto_id in gastos_ids:
-            cursor.execute('''
+            # Asociar gastos al grupo
+            cursor.executemany('''
                 INSERT INTO gastos_en_grupo (grupo_id, gasto_id)
                 VALUES (?, ?)
-            ''', (grupo_id, gasto_id))
-            
-            # Actualizar el tipo de distribución del gasto a 'agrupado'
-            cursor.execute('''
+            ''', [(grupo_id, gasto_id) for gasto_id in gastos_ids])
+        
+            # Actualizar el tipo de distribución de los gastos a 'agrupado'
+            cursor.executemany('''
                 UPDATE gastos_mensuales 
                 SET tipo_distribucion = 'agrupado'
                 WHERE id = ?
-            ''', (gasto_id,))
+            ''', [(gasto_id,) for gasto_id in gastos_ids])
         
-        conn.commit()
+        invalidar_cache_datos()
         return grupo_id
     except Exception as e:
-        conn.rollback()
         print(f"Error al crear grupo: {e}")
         return None
 
 def obtener_grupos_distribucion(conn):
     """
-    Obtiene todos los grupos de distribución activos con sus gastos.
+    Obtiene todos los grupos de distribución activos con sus gastos y el
+    monto base total de cada grupo ('total_grupo').
+    Usa una sola consulta con JOIN en lugar de una consulta por grupo,
+    y se cachea hasta la siguiente escritura.
     """
-    cursor = conn.cursor()
+    return _obtener_grupos_distribucion(conn, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _obtener_grupos_distribucion(_conn, version_datos):
+    cursor = _conn.cursor()
     cursor.execute('''
         SELECT gd.id, gd.nombre, gd.descripcion, gd.monto_fijo_ricardo, 
-               gd.monto_fijo_wendy, gd.quien_paga_fijo
+               gd.monto_fijo_wendy, gd.quien_paga_fijo,
+               g.id, g.concepto, g.monto_total
         FROM grupos_distribucion gd
+        LEFT JOIN gastos_en_grupo ge ON ge.grupo_id = gd.id
+        LEFT JOIN gastos_mensuales g ON g.id = ge.gasto_id AND g.activo = 1
         WHERE gd.activo = 1
-        ORDER BY gd.nombre
+        ORDER BY gd.nombre, gd.id, ge.id
     ''')
     
-    grupos = []
+    grupos = {}
     for row in cursor.fetchall():
-        grupo_id, nombre, desc, monto_r, monto_w, quien_paga = row
-        
-        # Obtener gastos del grupo
-        cursor.execute('''
-            SELECT g.id, g.concepto, g.monto_total
-            FROM gastos_mensuales g
-            INNER JOIN gastos_en_grupo ge ON g.id = ge.gasto_id
-            WHERE ge.grupo_id = ? AND g.activo = 1
-        ''', (grupo_id,))
-        
-        gastos = cursor.fetchall()
-        
-        grupos.append({
-            'id': grupo_id,
-            'nombre': nombre,
-            'descripcion': desc,
-            'monto_fijo_ricardo': monto_r,
-            'monto_fijo_wendy': monto_w,
-            'quien_paga_fijo': quien_paga,
-            'gastos': gastos
-        })
-    
-    return grupos
+        grupo_id, nombre, desc, monto_r, monto_w, quien_paga = row[:6]
+        gasto_id, concepto, monto_total = row[6:]
+        
+        if grupo_id not in grupos:
+            grupos[grupo_id] = {
+                'id': grupo_id,
+                'nombre': nombre,
+                'descripcion': desc,
+                'monto_fijo_ricardo': monto_r,
+                'monto_fijo_wendy': monto_w,
+                'quien_paga_fijo': quien_paga,
+                'gastos': [],
+                'total_grupo': 0.0
+            }
+        
+        # Los grupos sin gastos activos llegan con las columnas del gasto en NULL
+        if gasto_id is not None:
+            grupos[grupo_id]['gastos'].append((gasto_id, concepto, monto_total))
+            grupos[grupo_id]['total_grupo'] += monto_total
+    
+    return list(grupos.values())
 
 def obtener_gastos_de_grupo(conn, grupo_id):
     """
@@ -397,14 +532,15 @@ def actualizar_grupo_distribucion(conn, grupo_id, nombre, descripcion, quien_pag
     monto_r = monto_fijo if quien_paga_fijo == 'Ricardo' else None
     monto_w = monto_fijo if quien_paga_fijo == 'Wendy' else None
     
-    cursor.execute('''
-        UPDATE grupos_distribucion
-        SET nombre = ?, descripcion = ?, monto_fijo_ricardo = ?, 
-            monto_fijo_wendy = ?, quien_paga_fijo = ?
-        WHERE id = ?
-    ''', (nombre, descripcion, monto_r, monto_w, quien_paga_fijo, grupo_id))
+    with conn:
+        cursor.execute('''
+            UPDATE grupos_distribucion
+            SET nombre = ?, descripcion = ?, monto_fijo_ricardo = ?, 
+                monto_fijo_wendy = ?, quien_paga_fijo = ?
+            WHERE id = ?
+        ''', (nombre, descripcion, monto_r, monto_w, quien_paga_fijo, grupo_id))
     
-    conn.commit()
+    invalidar_cache_datos()
     return cursor.rowcount > 0
 
 def agregar_gasto_a_grupo(conn, grupo_id, gasto_id):
@@ -414,19 +550,20 @@ def agregar_gasto_a_grupo(conn, grupo_id, gasto_id):
     cursor = conn.cursor()
     
     try:
-        cursor.execute('''
-            INSERT INTO gastos_en_grupo (grupo_id, gasto_id)
-            VALUES (?, ?)
-        ''', (grupo_id, gasto_id))
+        with conn:
+            cursor.execute('''
+                INSERT INTO gastos_en_grupo (grupo_id, gasto_id)
+                VALUES (?, ?)
+            ''', (grupo_id, gasto_id))
         
-        # Actualizar tipo_distribucion a 'agrupado'
-        cursor.execute('''
-            UPDATE gastos_mensuales 
-            SET tipo_distribucion = 'agrupado'
-            WHERE id = ?
-        ''', (gasto_id,))
+            # Actualizar tipo_distribucion a 'agrupado'
+            cursor.execute('''
+                UPDATE gastos_mensuales 
+                SET tipo_distribucion = 'agrupado'
+                WHERE id = ?
+            ''', (gasto_id,))
         
-        conn.commit()
+        invalidar_cache_datos()
         return True
     except sqlite3.IntegrityError:
         return False
@@ -437,19 +574,20 @@ def remover_gasto_de_grupo(conn, grupo_id, gasto_id):
     """
     cursor = conn.cursor()
     
-    cursor.execute('''
-        DELETE FROM gastos_en_grupo
-        WHERE grupo_id = ? AND gasto_id = ?
-    ''', (grupo_id, gasto_id))
+    with conn:
+        cursor.execute('''
+            DELETE FROM gastos_en_grupo
+            WHERE grupo_id = ? AND gasto_id = ?
+        ''', (grupo_id, gasto_id))
     
-    # Cambiar tipo_distribucion a '50/50' por defecto
-    cursor.execute('''
-        UPDATE gastos_mensuales 
-        SET tipo_distribucion = '50/50'
-        WHERE id = ?
-    ''', (gasto_id,))
+        # Cambiar tipo_distribucion a '50/50' por defecto
+        cursor.execute('''
+            UPDATE gastos_mensuales 
+            SET tipo_distribucion = '50/50'
+            WHERE id = ?
+        ''', (gasto_id,))
     
-    conn.commit()
+    invalidar_cache_datos()
     return cursor.rowcount > 0
 
 def eliminar_grupo_distribucion(conn, grupo_id):
@@ -458,57 +596,84 @@ def eliminar_grupo_distribucion(conn, grupo_id):
     """
     cursor = conn.cursor()
     
-    # Cambiar todos los gastos del grupo a tipo '50/50'
-    cursor.execute('''
-        UPDATE gastos_mensuales 
-        SET tipo_distribucion = '50/50'
-        WHERE id IN (
-            SELECT gasto_id FROM gastos_en_grupo WHERE grupo_id = ?
-        )
-    ''', (grupo_id,))
+    with conn:
+        # Cambiar todos los gastos del grupo a tipo '50/50'
+        cursor.execute('''
+            UPDATE gastos_mensuales 
+            SET tipo_distribucion = '50/50'
+            WHERE id IN (
+                SELECT gasto_id FROM gastos_en_grupo WHERE grupo_id = ?
+            )
+        ''', (grupo_id,))
     
-    # Marcar grupo como inactivo
-    cursor.execute('''
-        UPDATE grupos_distribucion
-        SET activo = 0
-        WHERE id = ?
-    ''', (grupo_id,))
+        # Marcar grupo como inactivo
+        cursor.execute('''
+            UPDATE grupos_distribucion
+            SET activo = 0
+            WHERE id = ?
+        ''', (grupo_id,))
     
-    conn.commit()
+    invalidar_cache_datos()
     return cursor.rowcount > 0
 
+def obtener_grupo_por_gasto(conn):
+    """
+    Obtiene en una sola consulta el nombre del grupo activo de cada gasto agrupado.
+    El resultado se cachea hasta la siguiente escritura.
+    Returns: dict {gasto_id: nombre_grupo}
+    """
+    return _obtener_grupo_por_gasto(conn, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _obtener_grupo_por_gasto(_conn, version_datos):
+    cursor = _conn.cursor()
+    cursor.execute("""
+        SELECT ge.gasto_id, gd.nombre
+        FROM grupos_distribucion gd
+        INNER JOIN gastos_en_grupo ge ON gd.id = ge.grupo_id
+        WHERE gd.activo = 1
+    """)
+    
+    grupo_por_gasto = {}
+    for gasto_id, nombre in cursor.fetchall():
+        grupo_por_gasto.setdefault(gasto_id, nombre)
+    return grupo_por_gasto
+
+@lru_cache(maxsize=256)
+def separar_conceptos_grupo(concepto):
+    """
+    Separa un concepto agrupado ("Luz + Agua + Gas") en sus gastos individuales.
+    Se memoriza por concepto para no repetir el split en cada ejecución.
+    Returns: tupla de nombres sin espacios sobrantes
+    """
+    return tuple(g.strip() for g in concepto.split('+'))
+
+def obtener_primer_lunes(mes, anio):
+    """
+    Obtiene el primer lunes dentro del mes (nunca uno del mes anterior).
+    """
+    primer_dia = date(anio, mes, 1)
+    # weekday() es 0 para lunes, así que un mes que empieza en lunes no avanza
+    dias_hasta_lunes = (7 - primer_dia.weekday()) % 7
+    return primer_dia + timedelta(days=dias_hasta_lunes)
+
+@lru_cache(maxsize=None)
 def calcular_semanas_del_mes(mes, anio):
     """
     Calcula cuántas semanas (lunes a domingo) hay en un mes.
     Solo cuenta semanas que comienzan (lunes) dentro del mes.
     """
-    # Primer y último día del mes
-    primer_dia = date(anio, mes, 1)
     ultimo_dia = date(anio, mes, calendar.monthrange(anio, mes)[1])
-    
-    # Encontrar el primer lunes del mes (dentro del mes, no antes)
-    if primer_dia.weekday() == 0:  # Ya es lunes
-        primer_lunes = primer_dia
-    else:
-        # Avanzar al siguiente lunes dentro del mes
-        dias_hasta_lunes = (7 - primer_dia.weekday()) % 7
-        if dias_hasta_lunes == 0:
-            dias_hasta_lunes = 7
-        primer_lunes = primer_dia + timedelta(days=dias_hasta_lunes)
+    primer_lunes = obtener_primer_lunes(mes, anio)
     
     # Si el primer lunes está fuera del mes, no hay semanas completas
     if primer_lunes > ultimo_dia:
         return 0
     
-    # Contar semanas desde el primer lunes hasta el último día del mes
-    semanas = 0
-    fecha_actual = primer_lunes
-    while fecha_actual <= ultimo_dia:
-        semanas += 1
-        fecha_actual += timedelta(days=7)
-    
-    return semanas
+    # Un lunes por cada 7 días desde el primer lunes hasta el último día del mes
+    return (ultimo_dia - primer_lunes).days // 7 + 1
 
+@lru_cache(maxsize=None)
 def obtener_rango_semana(mes, anio, numero_semana):
     """
     Obtiene el rango de fechas de una semana específica del mes.
@@ -516,18 +681,7 @@ def obtener_rango_semana(mes, anio, numero_semana):
     Retorna el rango solo para semanas que empiezan dentro del mes.
     Returns: (fecha_inicio, fecha_fin) como strings 'dd/mm'
     """
-    # Primer día del mes
-    primer_dia = date(anio, mes, 1)
-    
-    # Encontrar el primer lunes dentro del mes
-    if primer_dia.weekday() == 0:  # Ya es lunes
-        primer_lunes = primer_dia
-    else:
-        # Avanzar al siguiente lunes dentro del mes
-        dias_hasta_lunes = (7 - primer_dia.weekday()) % 7
-        if dias_hasta_lunes == 0:
-            dias_hasta_lunes = 7
-        primer_lunes = primer_dia + timedelta(days=dias_hasta_lunes)
+    primer_lunes = obtener_primer_lunes(mes, anio)
     
     # Calcular inicio de la semana solicitada (lunes)
     fecha_inicio = primer_lunes + timedelta(days=(numero_semana - 1) * 7)
@@ -555,6 +709,19 @@ def calcular_monto_mensual_segun_frecuencia(monto_base, frecuencia, mes, anio):
     else:  # Mensual
         return monto_base
 
+def obtener_multiplicadores_frecuencia(mes, anio):
+    """
+    Factor por el que se multiplica el monto base según la frecuencia,
+    con la misma regla que calcular_monto_mensual_segun_frecuencia.
+    Las frecuencias desconocidas se tratan como mensuales.
+    """
+    return {
+        "Mensual": 1.0,
+        "Semanal": float(calcular_semanas_del_mes(mes, anio)),
+        "Quincenal": 2.0,
+        "Anual": 1 / 12
+    }
+
 # ==================== FUNCIONES DE PAGOS ====================
 
 def registrar_pago(conn, gasto_id, mes, anio, quien_pago, monto_pagado, semana=None):
@@ -562,28 +729,42 @@ def registrar_pago(conn, gasto_id, mes, anio, quien_pago, monto_pagado, semana=N
     Registra un pago realizado por Ricardo o Wendy.
     Para gastos semanales, incluye el número de semana.
     """
-    cursor = conn.cursor()
+    return registrar_pagos(conn, [(gasto_id, mes, anio, quien_pago, monto_pagado, semana)])
+
+def registrar_pagos(conn, pagos):
+    """
+    Registra varios pagos en una sola transacción.
+    pagos: lista de tuplas (gasto_id, mes, anio, quien_pago, monto_pagado, semana)
+    """
     fecha_actual = datetime.now().strftime('%Y-%m-%d')
-    cursor.execute('''
-        INSERT INTO pagos (gasto_id, mes, anio, quien_pago, monto_pagado, fecha_pago, semana)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (gasto_id, mes, anio, quien_pago, monto_pagado, fecha_actual, semana))
-    conn.commit()
+    with conn:
+        conn.executemany('''
+            INSERT INTO pagos (gasto_id, mes, anio, quien_pago, monto_pagado, fecha_pago, semana)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (gasto_id, mes, anio, quien_pago, monto_pagado, fecha_actual, semana)
+            for gasto_id, mes, anio, quien_pago, monto_pagado, semana in pagos
+        ])
+    invalidar_cache_datos()
     return True
 
 def obtener_pagos_del_mes(conn, mes, anio):
     """
     Obtiene todos los pagos de un mes específico.
+    El resultado se cachea hasta la siguiente escritura desde la app, y como
+    mucho 5 minutos por si la hoja se edita directamente en Google Sheets.
     """
-    query = """
+    return _obtener_pagos_del_mes(conn, mes, anio, obtener_version_datos())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _obtener_pagos_del_mes(_conn, mes, anio, version_datos):
+    return consultar_dataframe(_conn, """
         SELECT p.*, g.concepto, g.monto_total, g.frecuencia
         FROM pagos p
         JOIN gastos_mensuales g ON p.gasto_id = g.id
         WHERE p.mes = ? AND p.anio = ?
         ORDER BY p.fecha_pago DESC
-    """
-    df = pd.read_sql_query(query, conn, params=(mes, anio))
-    return df
+    """, (mes, anio))
 
 def verificar_pago_existente(conn, gasto_id, mes, anio, quien_pago, semana=None):
     """
@@ -593,16 +774,15 @@ def verificar_pago_existente(conn, gasto_id, mes, anio, quien_pago, semana=None)
     cursor = conn.cursor()
     if semana is not None:
         cursor.execute('''
-            SELECT COUNT(*) FROM pagos
-            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ? AND semana = ?
+            SELECT EXISTS(SELECT 1 FROM pagos
+            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ? AND semana = ?)
         ''', (gasto_id, mes, anio, quien_pago, semana))
     else:
         cursor.execute('''
-            SELECT COUNT(*) FROM pagos
-            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ?
+            SELECT EXISTS(SELECT 1 FROM pagos
+            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ?)
         ''', (gasto_id, mes, anio, quien_pago))
-    count = cursor.fetchone()[0]
-    return count > 0
+    return bool(cursor.fetchone()[0])
 
 def obtener_semanas_pagadas(conn, gasto_id, mes, anio, quien_pago):
     """
@@ -618,6 +798,56 @@ def obtener_semanas_pagadas(conn, gasto_id, mes, anio, quien_pago):
     semanas = [row[0] for row in cursor.fetchall()]
     return semanas
 
+def obtener_resumen_pagos_del_mes(conn, mes, anio):
+    """
+    Obtiene en una sola consulta el estado de pagos de todos los gastos del mes.
+    Reemplaza las llamadas a verificar_pago_existente y obtener_semanas_pagadas
+    gasto por gasto.
+    Returns: dict {(gasto_id, quien_pago): {'pagos': n, 'semanas': [semanas pagadas]}}
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT gasto_id, quien_pago, COUNT(*), GROUP_CONCAT(semana)
+        FROM pagos
+        WHERE mes = ? AND anio = ?
+        GROUP BY gasto_id, quien_pago
+    ''', (mes, anio))
+    
+    resumen = {}
+    for gasto_id, quien_pago, num_pagos, semanas in cursor.fetchall():
+        resumen[(gasto_id, quien_pago)] = {
+            'pagos': num_pagos,
+            'semanas': sorted(int(s) for s in semanas.split(',')) if semanas else []
+        }
+    return resumen
+
+def obtener_totales_pagados_del_mes(conn, mes, anio):
+    """
+    Obtiene en una sola consulta cuánto pagó cada persona por gasto y por grupo.
+    Los totales de grupo suman los pagos de todos los gastos del grupo.
+    Returns: dict {(id_fila, quien_pago): total}, donde id_fila es el gasto_id
+             o 'grupo_<id>', igual que la columna 'id' de calcular_tabla_mensual
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT 'gasto', gasto_id, quien_pago, COALESCE(SUM(monto_pagado), 0.0)
+        FROM pagos
+        WHERE mes = ? AND anio = ?
+        GROUP BY gasto_id, quien_pago
+        UNION ALL
+        SELECT 'grupo', geg.grupo_id, p.quien_pago, COALESCE(SUM(p.monto_pagado), 0.0)
+        FROM pagos p
+        INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
+        WHERE p.mes = ? AND p.anio = ?
+        GROUP BY geg.grupo_id, p.quien_pago
+    ''', (mes, anio, mes, anio))
+    
+    totales = {}
+    for tipo, clave, quien_pago, total in cursor.fetchall():
+        id_fila = f"grupo_{clave}" if tipo == 'grupo' else clave
+        totales[(id_fila, quien_pago)] = total
+    return totales
+
 def eliminar_pago(conn, pago_id):
     """
     Elimina un pago específico de la base de datos.
@@ -625,6 +855,7 @@ def eliminar_pago(conn, pago_id):
     cursor = conn.cursor()
     cursor.execute('DELETE FROM pagos WHERE id = ?', (pago_id,))
     conn.commit()
+    invalidar_cache_datos()
     return cursor.rowcount > 0
 
 def eliminar_pago_por_criterios(conn, gasto_id, mes, anio, quien_pago):
@@ -637,8 +868,23 @@ def eliminar_pago_por_criterios(conn, gasto_id, mes, anio, quien_pago):
         WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ?
     ''', (gasto_id, mes, anio, quien_pago))
     conn.commit()
+    invalidar_cache_datos()
     return cursor.rowcount > 0
 
+def eliminar_pagos_del_mes(conn, mes, anio):
+    """
+    Elimina todos los pagos de un mes.
+    Returns: cantidad de pagos eliminados
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        DELETE FROM pagos
+        WHERE mes = ? AND anio = ?
+    ''', (mes, anio))
+    conn.commit()
+    invalidar_cache_datos()
+    return cursor.rowcount
+
 # ==================== CÁLCULO DE TABLA MENSUAL ====================
 
 def calcular_tabla_mensual(conn, mes, anio):
@@ -647,14 +893,32 @@ def calcular_tabla_mensual(conn, mes, anio):
     Usa los montos específicos del mes si existen.
     Para gastos semanales, calcula el monto total del mes (semanas * monto_base).
     Soporta distribución personalizada de pagos y grupos de distribución.
+    El resultado se cachea por mes hasta la siguiente escritura.
     Returns:
         DataFrame con los gastos, montos y quién ha pagado
     """
+    return _calcular_tabla_mensual(conn, mes, anio, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _calcular_tabla_mensual(_conn, mes, anio, version_datos):
+    conn = _conn
     gastos_df = obtener_montos_configurados(conn, mes, anio)
     
     if gastos_df.empty:
         return pd.DataFrame()
     
+    # Multiplicador de cada gasto según su frecuencia (una sola vez por mes)
+    gastos_df['multiplicador'] = gastos_df['frecuencia'].map(
+        obtener_multiplicadores_frecuencia(mes, anio)
+    ).fillna(1.0)
+    
+    # Acceso directo por id, sin filtrar el DataFrame para cada gasto agrupado
+    multiplicador_por_id = dict(zip(gastos_df['id'], gastos_df['multiplicador']))
+    
+    # Estado de pagos de todo el mes en una sola consulta
+    resumen_pagos = obtener_resumen_pagos_del_mes(conn, mes, anio)
+    sin_pagos = {'pagos': 0, 'semanas': []}
+    
     # Crear lista para almacenar los resultados
     resultados = []
     gastos_procesados = set()  # Para evitar duplicar gastos agrupados
@@ -676,22 +940,13 @@ def calcular_tabla_mensual(conn, mes, anio):
         conceptos_grupo = []
         
         for gasto_id, concepto, monto_base in gastos_grupo:
-            # Obtener el monto actualizado del mes (considerando ediciones)
-            monto_mes_actualizado = obtener_monto_del_mes(conn, gasto_id, mes, anio)
-            
-            # Buscar frecuencia del gasto
-            gasto_info = gastos_df[gastos_df['id'] == gasto_id]
-            if not gasto_info.empty:
-                gasto_row = gasto_info.iloc[0]
-                frecuencia = gasto_row['frecuencia']
+            multiplicador = multiplicador_por_id.get(gasto_id)
+            if multiplicador is not None:
+                # Obtener el monto actualizado del mes (considerando ediciones)
+                monto_mes_actualizado = obtener_monto_del_mes(conn, gasto_id, mes, anio)
                 
                 # Calcular monto según frecuencia
-                monto_mes = calcular_monto_mensual_segun_frecuencia(
-                    monto_mes_actualizado, 
-                    frecuencia, 
-                    mes, 
-                    anio
-                )
+                monto_mes = monto_mes_actualizado * multiplicador
                 monto_total_grupo += monto_mes
                 conceptos_grupo.append(concepto)
                 gastos_procesados.add(gasto_id)
@@ -712,14 +967,8 @@ def calcular_tabla_mensual(conn, mes, anio):
             monto_wendy = monto_total_grupo / 2
         
         # Verificar si todos los gastos del grupo están pagados
-        ricardo_pago = all(
-            verificar_pago_existente(conn, g_id, mes, anio, 'Ricardo')
-            for g_id, _, _ in gastos_grupo
-        )
-        wendy_pago = all(
-            verificar_pago_existente(conn, g_id, mes, anio, 'Wendy')
-            for g_id, _, _ in gastos_grupo
-        )
+        ricardo_pago = all((g_id, 'Ricardo') in resumen_pagos for g_id, _, _ in gastos_grupo)
+        wendy_pago = all((g_id, 'Wendy') in resumen_pagos for g_id, _, _ in gastos_grupo)
         
         concepto_grupo = f"📦 {nombre_grupo} ({' + '.join(conceptos_grupo)})"
         
@@ -734,9 +983,15 @@ def calcular_tabla_mensual(conn, mes, anio):
             'Wendy Pagó': '✅' if wendy_pago else '❌'
         })
     
+    # Montos del mes y distribución de todos los gastos en una sola pasada
+    gastos_df['monto_mes'] = gastos_df['monto_total'] * gastos_df['multiplicador']
+    gastos_df['monto_ricardo'], gastos_df['monto_wendy'] = calcular_distribucion_vectorizada(
+        gastos_df, gastos_df['monto_mes']
+    )
+    
     # Procesar gastos individuales (no agrupados)
-    for _, gasto in gastos_df.iterrows():
-        gasto_id = gasto['id']
+    for gasto in gastos_df.itertuples(index=False):
+        gasto_id = gasto.id
         
         # Saltar si ya fue procesado como parte de un grupo
         if gasto_id in gastos_procesados:
@@ -744,26 +999,22 @@ def calcular_tabla_mensual(conn, mes, anio):
         
         # Saltar si tiene tipo_distribucion 'agrupado' pero no encontramos el grupo
         # (esto no debería pasar, pero por seguridad)
-        if gasto.get('tipo_distribucion') == 'agrupado':
+        if gasto.tipo_distribucion == 'agrupado':
             continue
         
-        concepto = gasto['concepto']
-        monto_base = gasto['monto_total']
-        frecuencia = gasto['frecuencia']
-        tipo_monto = gasto['tipo_monto']
-        personalizado = gasto['personalizado']
-        
-        # Calcular el monto total del mes según la frecuencia
-        monto_total = calcular_monto_mensual_segun_frecuencia(monto_base, frecuencia, mes, anio)
-        
-        # Calcular cuánto debe cada persona según distribución
-        monto_ricardo, monto_wendy = calcular_distribucion_pago(gasto, monto_total)
+        concepto = gasto.concepto
+        frecuencia = gasto.frecuencia
+        tipo_monto = gasto.tipo_monto
+        personalizado = gasto.personalizado
+        monto_total = gasto.monto_mes
+        monto_ricardo = gasto.monto_ricardo
+        monto_wendy = gasto.monto_wendy
         
         # Para gastos semanales, verificar si todas las semanas están pagadas
         if frecuencia == "Semanal":
             semanas_del_mes = calcular_semanas_del_mes(mes, anio)
-            ricardo_semanas = obtener_semanas_pagadas(conn, gasto_id, mes, anio, 'Ricardo')
-            wendy_semanas = obtener_semanas_pagadas(conn, gasto_id, mes, anio, 'Wendy')
+            ricardo_semanas = resumen_pagos.get((gasto_id, 'Ricardo'), sin_pagos)['semanas']
+            wendy_semanas = resumen_pagos.get((gasto_id, 'Wendy'), sin_pagos)['semanas']
             
             ricardo_pago = len(ricardo_semanas) == semanas_del_mes
             wendy_pago = len(wendy_semanas) == semanas_del_mes
@@ -772,8 +1023,8 @@ def calcular_tabla_mensual(conn, mes, anio):
             concepto_con_info = f"{concepto} ({len(ricardo_semanas)}/{semanas_del_mes} sem)"
         else:
             # Para gastos no semanales, verificar pago normal
-            ricardo_pago = verificar_pago_existente(conn, gasto_id, mes, anio, 'Ricardo')
-            wendy_pago = verificar_pago_existente(conn, gasto_id, mes, anio, 'Wendy')
+            ricardo_pago = (gasto_id, 'Ricardo') in resumen_pagos
+            wendy_pago = (gasto_id, 'Wendy') in resumen_pagos
             concepto_con_info = concepto
         
         # Indicador de monto
@@ -785,7 +1036,7 @@ def calcular_tabla_mensual(conn, mes, anio):
             indicador = ""  # Fijo
         
         # Indicador de distribución
-        tipo_dist = gasto.get('tipo_distribucion', '50/50')
+        tipo_dist = gasto.tipo_distribucion
         if tipo_dist == 'fijo_ricardo':
             dist_tag = " 💰R"  # Ricardo paga fijo
         elif tipo_dist == 'fijo_wendy':
@@ -812,7 +1063,13 @@ def calcular_saldo_neto(conn, mes, anio):
     """
     Calcula el saldo neto de deuda entre Ricardo y Wendy para un mes específico.
     Usa la misma lógica que la tabla mensual: calcula lo pagado vs lo que debe cada uno.
+    El resultado se cachea por mes hasta la siguiente escritura.
     """
+    return _calcular_saldo_neto(conn, mes, anio, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _calcular_saldo_neto(_conn, mes, anio, version_datos):
+    conn = _conn
     # Obtener la tabla mensual con los montos que debe cada uno
     tabla_df = calcular_tabla_mensual(conn, mes, anio)
     
@@ -831,61 +1088,10 @@ def calcular_saldo_neto(conn, mes, anio):
     total_debe_wendy = tabla_df['Asignado Wendy'].sum()
     
     # Calcular cuánto ha pagado cada uno usando la misma lógica de la tabla
-    cursor = conn.cursor()
+    totales_pagados = obtener_totales_pagados_del_mes(conn, mes, anio)
     
-    pagado_ricardo_total = 0.0
-    pagado_wendy_total = 0.0
-    
-    for _, row in tabla_df.iterrows():
-        gasto_id = row['id']
-        
-        # Calcular pagado por Ricardo
-        try:
-            if str(gasto_id).startswith('grupo_'):
-                grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                query = """
-                    SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                    FROM pagos p
-                    INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                    WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Ricardo'
-                """
-                cursor.execute(query, (grupo_id, mes, anio))
-            else:
-                query = """
-                    SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                    FROM pagos
-                    WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Ricardo'
-                """
-                cursor.execute(query, (gasto_id, mes, anio))
-            
-            result = cursor.fetchone()
-            pagado_ricardo_total += result[0] if result else 0.0
-        except:
-            pass
-        
-        # Calcular pagado por Wendy
-        try:
-            if str(gasto_id).startswith('grupo_'):
-                grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                query = """
-                    SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                    FROM pagos p
-                    INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                    WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Wendy'
-                """
-                cursor.execute(query, (grupo_id, mes, anio))
-            else:
-                query = """
-                    SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                    FROM pagos
-                    WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Wendy'
-                """
-                cursor.execute(query, (gasto_id, mes, anio))
-            
-            result = cursor.fetchone()
-            pagado_wendy_total += result[0] if result else 0.0
-        except:
-            pass
+    pagado_ricardo_total = sum(totales_pagados.get((gasto_id, 'Ricardo'), 0.0) for gasto_id in tabla_df['id'])
+    pagado_wendy_total = sum(totales_pagados.get((gasto_id, 'Wendy'), 0.0) for gasto_id in tabla_df['id'])
     
     # Calcular saldo (pendiente)
     saldo_ricardo = max(0, total_debe_ricardo - pagado_ricardo_total)
@@ -916,39 +1122,78 @@ def calcular_saldo_neto(conn, mes, anio):
         'mensaje': mensaje
     }
 
+def calcular_pendientes_persona(tabla_df, totales_pagados, persona):
+    """
+    Gastos de la tabla mensual en los que a una persona todavía le falta pagar
+    algo (incluso si ya pagó una parte), calculado por columnas.
+    totales_pagados: resultado de obtener_totales_pagados_del_mes
+    Returns: DataFrame con concepto, monto_total, frecuencia, debe_pagar_total,
+             ya_pago y pendiente
+    """
+    ya_pago = pd.Series(
+        [totales_pagados.get((gasto_id, persona), 0.0) for gasto_id in tabla_df['id']],
+        index=tabla_df.index,
+        dtype=float
+    )
+    gastos = pd.DataFrame({
+        'concepto': tabla_df['Concepto'],
+        'monto_total': tabla_df['Monto Total'],
+        'frecuencia': tabla_df['Frecuencia'],
+        'debe_pagar_total': tabla_df[f'Asignado {persona}'],
+        'ya_pago': ya_pago
+    })
+    gastos['pendiente'] = gastos['debe_pagar_total'] - gastos['ya_pago']
+    return gastos[gastos['pendiente'] > 0]
+
 # ==================== FUNCIONES DE GRÁFICOS ====================
 
 def crear_grafico_gastos_tiempo(conn):
     """
     Crea un gráfico de gastos en el tiempo con indicador de fecha actual.
+    Se cachea hasta la siguiente escritura; la fecha del día forma parte de
+    la clave para que la marca de "Hoy" no quede desfasada.
     """
+    return _crear_grafico_gastos_tiempo(conn, date.today(), obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _crear_grafico_gastos_tiempo(_conn, hoy, version_datos):
+    conn = _conn
+    # El periodo sale de SQLite como fecha ISO y se convierte a datetime al armar el DataFrame
     query = """
         SELECT 
-            p.anio || '-' || printf('%02d', p.mes) || '-01' as periodo,
+            DATE(p.anio || '-' || printf('%02d', p.mes) || '-01') as periodo,
             SUM(p.monto_pagado) as total,
             p.quien_pago
         FROM pagos p
         GROUP BY p.anio, p.mes, p.quien_pago
         ORDER BY p.anio, p.mes
     """
-    df = pd.read_sql_query(query, conn)
+    df = consultar_dataframe(conn, query, tipos={'periodo': 'datetime64[ns]'})
     
     if df.empty:
         return None
     
-    # Convertir periodo a datetime para ordenamiento correcto
-    df['periodo'] = pd.to_datetime(df['periodo'])
-    
     # Obtener fecha actual
     fecha_actual = datetime.now()
     # Crear timestamp para la fecha actual
     periodo_actual = pd.to_datetime(f"{fecha_actual.year}-{fecha_actual.month:02d}-{fecha_actual.day:02d}")
     
-    # Crear gráfico
-    fig = px.line(df, x='periodo', y='total', color='quien_pago',
-                  title=f'Gastos en el Tiempo (Hoy: {fecha_actual.day}/{fecha_actual.month}/{fecha_actual.year})',
-                  labels={'periodo': 'Mes', 'total': 'Monto ($)', 'quien_pago': 'Persona'},
-                  markers=True)
+    # Crear gráfico: los datos ya vienen agrupados, así que se arma una
+    # traza WebGL por persona sin pasar por plotly express
+    fig = go.Figure()
+    for persona in df['quien_pago'].unique():
+        datos_persona = df[df['quien_pago'] == persona]
+        fig.add_trace(go.Scattergl(
+            x=datos_persona['periodo'],
+            y=datos_persona['total'],
+            mode='lines+markers',
+            name=persona
+        ))
+    
+    fig.update_layout(
+        title=f'Gastos en el Tiempo (Hoy: {fecha_actual.day}/{fecha_actual.month}/{fecha_actual.year})',
+        legend_title_text='Persona'
+    )
     
     # Marcar la fecha actual con una línea vertical usando add_shape
     fig.add_shape(
@@ -988,16 +1233,22 @@ def crear_grafico_distribucion(conn, mes, anio):
     """
     Crea un gráfico de distribución de gastos por categoría.
     Agrupa los gastos que pertenecen a grupos de distribución.
+    El gráfico se cachea por mes hasta la siguiente escritura.
     """
+    return _crear_grafico_distribucion(conn, mes, anio, obtener_version_datos())
+
+@st.cache_data(show_spinner=False)
+def _crear_grafico_distribucion(_conn, mes, anio, version_datos):
     # Obtener la tabla calculada que ya agrupa correctamente
-    tabla_df = calcular_tabla_mensual(conn, mes, anio)
+    tabla_df = calcular_tabla_mensual(_conn, mes, anio)
     
     if tabla_df.empty:
         return None
     
     # Usar el concepto y monto total de la tabla calculada
-    df_grafico = tabla_df[['Concepto', 'Monto Total']].copy()
-    df_grafico.columns = ['concepto', 'total']
+    df_grafico = tabla_df[['Concepto', 'Monto Total']].rename(
+        columns={'Concepto': 'concepto', 'Monto Total': 'total'}
+    )
     
     fig = px.pie(df_grafico, values='total', names='concepto',
                  title=f'Distribución de Gastos - {calendar.month_name[mes]} {anio}',
@@ -1008,15 +1259,22 @@ def crear_grafico_distribucion(conn, mes, anio):
 
 # ==================== GENERACIÓN DE REPORTES PDF ====================
 
-def generar_pdf_reporte_general(conn, mes, anio):
+# Formateadores de montos, creados una sola vez. Los reportes los aplican
+# columna a columna con Series.map y la lista de pagos los reutiliza
+formatear_monto = '${:.2f}'.format
+formatear_porcentaje = '{:.0f}%'.format
+
+@lru_cache(maxsize=None)
+def obtener_estilos_pdf():
     """
-    Genera un reporte PDF general del mes con todos los detalles.
+    Estilos de párrafo compartidos por los reportes PDF.
+    Se construyen una sola vez; reportlab se importa al primer uso.
+    Returns: (styles, title_style, heading_style)
     """
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
     
-    # Estilos
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -1036,16 +1294,104 @@ def generar_pdf_reporte_general(conn, mes, anio):
         spaceBefore=12
     )
     
-    # Título
+    return styles, title_style, heading_style
+
+@lru_cache(maxsize=None)
+def obtener_estilo_tabla_detalle(color_encabezado):
+    """
+    Estilo común de las tablas de detalle (gastos y pagos) de los reportes:
+    encabezado de color, cuerpo blanco y cuadrícula negra.
+    color_encabezado: color hexadecimal del encabezado, p. ej. '#3498DB'
+    """
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(color_encabezado)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ])
+
+@lru_cache(maxsize=128)
+def _obtener_titulo_pdf(mes, anio, persona):
+    from reportlab.platypus import Paragraph
+    
+    _, title_style, _ = obtener_estilos_pdf()
     mes_nombre = calendar.month_name[mes]
-    titulo = Paragraph(f"REPORTE DE CONTABILIDAD DOMÉSTICA<br/>{mes_nombre.upper()} {anio}", title_style)
-    elements.append(titulo)
-    elements.append(Spacer(1, 0.3*inch))
+    if persona is None:
+        texto = f"REPORTE DE CONTABILIDAD DOMÉSTICA<br/>{mes_nombre.upper()} {anio}"
+    else:
+        texto = f"REPORTE INDIVIDUAL - {persona.upper()}<br/>{mes_nombre.upper()} {anio}"
+    return Paragraph(texto, title_style)
+
+def construir_encabezado_pdf(mes, anio, persona=None):
+    """
+    Encabezado de los reportes: título (general si persona es None) y fecha
+    de generación. El título se parsea una sola vez por (mes, anio, persona)
+    y cada documento recibe su propia copia, porque reportlab guarda el
+    estado de maquetación en el propio párrafo.
+    """
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
     
-    # Fecha de generación
+    styles, _, _ = obtener_estilos_pdf()
     fecha_gen = Paragraph(f"<b>Fecha de generación:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
-    elements.append(fecha_gen)
-    elements.append(Spacer(1, 0.3*inch))
+    
+    return [
+        copy(_obtener_titulo_pdf(mes, anio, persona)),
+        Spacer(1, 0.3*inch),
+        fecha_gen,
+        Spacer(1, 0.3*inch)
+    ]
+
+def calcular_filas_detalle_pdf(tabla_df, totales_pagados, persona):
+    """
+    Filas [Gasto, Asignado, Pagado, Pendiente, Progreso] de la tabla de
+    detalle de una persona, calculadas por columnas en vez de fila a fila.
+    totales_pagados: resultado de obtener_totales_pagados_del_mes
+    """
+    asignado = tabla_df[f'Asignado {persona}']
+    pagado = pd.Series(
+        [totales_pagados.get((gasto_id, persona), 0.0) for gasto_id in tabla_df['id']],
+        index=tabla_df.index
+    )
+    pendiente = (asignado - pagado).clip(lower=0).fillna(0)
+    porcentaje = (pagado / asignado.where(asignado > 0) * 100).fillna(0)
+    
+    return pd.DataFrame({
+        'Gasto': tabla_df['Concepto'],
+        'Asignado': asignado.map(formatear_monto),
+        'Pagado': pagado.map(formatear_monto),
+        'Pendiente': pendiente.map(formatear_monto),
+        'Progreso': porcentaje.map(formatear_porcentaje)
+    }).values.tolist()
+
+def generar_pdf_reporte_general(conn, mes, anio):
+    """
+    Genera un reporte PDF general del mes con todos los detalles.
+    """
+    # reportlab solo se necesita al exportar: se importa aquí para no
+    # cargarlo en cada ejecución de la app
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    
+    # Estilos
+    styles, _, heading_style = obtener_estilos_pdf()
+    
+    # Título y fecha de generación
+    elements.extend(construir_encabezado_pdf(mes, anio))
     
     # Resumen Financiero
     elements.append(Paragraph("RESUMEN FINANCIERO", heading_style))
@@ -1110,71 +1456,15 @@ def generar_pdf_reporte_general(conn, mes, anio):
     tabla_df = calcular_tabla_mensual(conn, mes, anio)
     
     if not tabla_df.empty:
-        # Agregar columnas de monto pagado y pendiente
-        cursor = conn.cursor()
-        
-        tabla_df['Ricardo Pagado'] = 0.0
-        tabla_df['Ricardo Pendiente'] = 0.0
-        tabla_df['Ricardo %'] = 0.0
-        
-        for idx, row in tabla_df.iterrows():
-            gasto_id = row['id']
-            debe_ricardo = row['Asignado Ricardo']
-            
-            # Calcular para Ricardo
-            try:
-                if str(gasto_id).startswith('grupo_'):
-                    grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                    query = """
-                        SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                        FROM pagos p
-                        INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                        WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Ricardo'
-                    """
-                    cursor.execute(query, (grupo_id, mes, anio))
-                else:
-                    query = """
-                        SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                        FROM pagos
-                        WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Ricardo'
-                    """
-                    cursor.execute(query, (gasto_id, mes, anio))
-                
-                result = cursor.fetchone()
-                ricardo_pagado = result[0] if result else 0.0
-                ricardo_pendiente = max(0, debe_ricardo - ricardo_pagado)
-                ricardo_porcentaje = (ricardo_pagado / debe_ricardo * 100) if debe_ricardo > 0 else 0
-                
-                tabla_df.at[idx, 'Ricardo Pagado'] = ricardo_pagado
-                tabla_df.at[idx, 'Ricardo Pendiente'] = ricardo_pendiente
-                tabla_df.at[idx, 'Ricardo %'] = ricardo_porcentaje
-            except:
-                pass
+        # Montos ya pagados del mes, por fila de la tabla
+        totales_pagados = obtener_totales_pagados_del_mes(conn, mes, anio)
         
         # Tabla Ricardo
         data_ricardo = [['Gasto', 'Asignado', 'Pagado', 'Pendiente', 'Progreso']]
-        
-        for _, row in tabla_df.iterrows():
-            data_ricardo.append([
-                row['Concepto'],
-                f"${row['Asignado Ricardo']:.2f}",
-                f"${row['Ricardo Pagado']:.2f}",
-                f"${row['Ricardo Pendiente']:.2f}",
-                f"{row['Ricardo %']:.0f}%"
-            ])
+        data_ricardo += calcular_filas_detalle_pdf(tabla_df, totales_pagados, 'Ricardo')
         
         tabla_ricardo = Table(data_ricardo, colWidths=[2*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1*inch])
-        tabla_ricardo.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
+        tabla_ricardo.setStyle(obtener_estilo_tabla_detalle('#3498DB'))
         
         elements.append(tabla_ricardo)
         elements.append(Spacer(1, 0.3*inch))
@@ -1182,68 +1472,12 @@ def generar_pdf_reporte_general(conn, mes, anio):
         # TABLA DE WENDY
         elements.append(Paragraph("TABLA DE WENDY", heading_style))
         
-        # Calcular para Wendy
-        tabla_df['Wendy Pagado'] = 0.0
-        tabla_df['Wendy Pendiente'] = 0.0
-        tabla_df['Wendy %'] = 0.0
-        
-        for idx, row in tabla_df.iterrows():
-            gasto_id = row['id']
-            debe_wendy = row['Asignado Wendy']
-            
-            try:
-                if str(gasto_id).startswith('grupo_'):
-                    grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                    query = """
-                        SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                        FROM pagos p
-                        INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                        WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Wendy'
-                    """
-                    cursor.execute(query, (grupo_id, mes, anio))
-                else:
-                    query = """
-                        SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                        FROM pagos
-                        WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Wendy'
-                    """
-                    cursor.execute(query, (gasto_id, mes, anio))
-                
-                result = cursor.fetchone()
-                wendy_pagado = result[0] if result else 0.0
-                wendy_pendiente = max(0, debe_wendy - wendy_pagado)
-                wendy_porcentaje = (wendy_pagado / debe_wendy * 100) if debe_wendy > 0 else 0
-                
-                tabla_df.at[idx, 'Wendy Pagado'] = wendy_pagado
-                tabla_df.at[idx, 'Wendy Pendiente'] = wendy_pendiente
-                tabla_df.at[idx, 'Wendy %'] = wendy_porcentaje
-            except:
-                pass
-        
         # Tabla Wendy
         data_wendy = [['Gasto', 'Asignado', 'Pagado', 'Pendiente', 'Progreso']]
-        
-        for _, row in tabla_df.iterrows():
-            data_wendy.append([
-                row['Concepto'],
-                f"${row['Asignado Wendy']:.2f}",
-                f"${row['Wendy Pagado']:.2f}",
-                f"${row['Wendy Pendiente']:.2f}",
-                f"{row['Wendy %']:.0f}%"
-            ])
+        data_wendy += calcular_filas_detalle_pdf(tabla_df, totales_pagados, 'Wendy')
         
         tabla_wendy = Table(data_wendy, colWidths=[2*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1*inch])
-        tabla_wendy.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E91E63')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
+        tabla_wendy.setStyle(obtener_estilo_tabla_detalle('#E91E63'))
         
         elements.append(tabla_wendy)
     else:
@@ -1258,27 +1492,12 @@ def generar_pdf_reporte_general(conn, mes, anio):
     
     if not pagos_df.empty:
         data_pagos = [['Fecha', 'Concepto', 'Quien Pagó', 'Monto']]
-        
-        for _, pago in pagos_df.iterrows():
-            data_pagos.append([
-                pago['fecha_pago'],
-                pago['concepto'],
-                pago['quien_pago'],
-                f"${pago['monto_pagado']:.2f}"
-            ])
+        data_pagos += pagos_df[['fecha_pago', 'concepto', 'quien_pago']].assign(
+            monto=pagos_df['monto_pagado'].map(formatear_monto)
+        ).values.tolist()
         
         tabla_pagos = Table(data_pagos, colWidths=[1.5*inch, 2*inch, 1.5*inch, 1.5*inch])
-        tabla_pagos.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
+        tabla_pagos.setStyle(obtener_estilo_tabla_detalle('#E74C3C'))
         
         elements.append(tabla_pagos)
     else:
@@ -1293,41 +1512,22 @@ def generar_pdf_reporte_individual(conn, mes, anio, persona):
     """
     Genera un reporte PDF individual para Ricardo o Wendy.
     """
+    # reportlab solo se necesita al exportar: se importa aquí para no
+    # cargarlo en cada ejecución de la app
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     elements = []
     
     # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#34495E'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
-    # Título
-    mes_nombre = calendar.month_name[mes]
-    icono = "👨" if persona == "Ricardo" else "👩"
-    titulo = Paragraph(f"REPORTE INDIVIDUAL - {persona.upper()}<br/>{mes_nombre.upper()} {anio}", title_style)
-    elements.append(titulo)
-    elements.append(Spacer(1, 0.3*inch))
+    styles, _, heading_style = obtener_estilos_pdf()
     
-    # Fecha de generación
-    fecha_gen = Paragraph(f"<b>Fecha de generación:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
-    elements.append(fecha_gen)
-    elements.append(Spacer(1, 0.3*inch))
+    # Título y fecha de generación
+    elements.extend(construir_encabezado_pdf(mes, anio, persona))
     
     # Resumen Personal
     elements.append(Paragraph(f"RESUMEN DE {persona.upper()}", heading_style))
@@ -1381,63 +1581,13 @@ def generar_pdf_reporte_individual(conn, mes, anio, persona):
     
     if not tabla_df.empty:
         # Calcular pagado y pendiente para cada gasto
-        cursor = conn.cursor()
+        totales_pagados = obtener_totales_pagados_del_mes(conn, mes, anio)
         
-        columna_asignado = f'Asignado {persona}'
         data_gastos = [['Gasto', 'Asignado', 'Ya Pagó', 'Pendiente', 'Progreso']]
-        
-        for _, row in tabla_df.iterrows():
-            gasto_id = row['id']
-            asignado = row[columna_asignado]
-            
-            # Calcular monto pagado
-            pagado = 0.0
-            try:
-                if str(gasto_id).startswith('grupo_'):
-                    grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                    query = """
-                        SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                        FROM pagos p
-                        INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                        WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = ?
-                    """
-                    cursor.execute(query, (grupo_id, mes, anio, persona))
-                else:
-                    query = """
-                        SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                        FROM pagos
-                        WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = ?
-                    """
-                    cursor.execute(query, (gasto_id, mes, anio, persona))
-                
-                result = cursor.fetchone()
-                pagado = result[0] if result else 0.0
-            except:
-                pass
-            
-            pendiente = max(0, asignado - pagado)
-            porcentaje = (pagado / asignado * 100) if asignado > 0 else 0
-            
-            data_gastos.append([
-                row['Concepto'],
-                f"${asignado:.2f}",
-                f"${pagado:.2f}",
-                f"${pendiente:.2f}",
-                f"{porcentaje:.0f}%"
-            ])
+        data_gastos += calcular_filas_detalle_pdf(tabla_df, totales_pagados, persona)
         
         tabla_gastos = Table(data_gastos, colWidths=[2*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1*inch])
-        tabla_gastos.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16A085')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
+        tabla_gastos.setStyle(obtener_estilo_tabla_detalle('#16A085'))
         
         elements.append(tabla_gastos)
     else:
@@ -1453,13 +1603,9 @@ def generar_pdf_reporte_individual(conn, mes, anio, persona):
     
     if not pagos_persona.empty:
         data_pagos = [['Fecha', 'Concepto', 'Monto Pagado']]
-        
-        for _, pago in pagos_persona.iterrows():
-            data_pagos.append([
-                pago['fecha_pago'],
-                pago['concepto'],
-                f"${pago['monto_pagado']:.2f}"
-            ])
+        data_pagos += pagos_persona[['fecha_pago', 'concepto']].assign(
+            monto=pagos_persona['monto_pagado'].map(formatear_monto)
+        ).values.tolist()
         
         # Total pagado
         total_pagado = pagos_persona['monto_pagado'].sum()
@@ -1505,8 +1651,357 @@ def generar_pdf_reporte_individual(conn, mes, anio, persona):
     buffer.seek(0)
     return buffer
 
+def obtener_pdf_reporte(conn, mes, anio, persona=None):
+    """
+    Devuelve los bytes del reporte PDF del mes: el general si persona es None,
+    o el individual de 'Ricardo' o 'Wendy'.
+    Se cachea hasta la siguiente escritura, y como mucho una hora para que
+    la fecha de generación impresa no quede desfasada.
+    """
+    return _obtener_pdf_reporte(conn, mes, anio, persona, obtener_version_datos())
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _obtener_pdf_reporte(_conn, mes, anio, persona, version_datos):
+    if persona is None:
+        buffer = generar_pdf_reporte_general(_conn, mes, anio)
+    else:
+        buffer = generar_pdf_reporte_individual(_conn, mes, anio, persona)
+    return buffer.getvalue()
+
 # ==================== INTERFAZ STREAMLIT ====================
 
+@st.fragment
+def mostrar_pagos_de_persona(conn, mes, anio, persona):
+    """
+    Muestra los gastos del mes que le tocan a una persona con sus botones de pago.
+    Al ser un fragmento, pulsar "Pagar" solo vuelve a ejecutar esta sección y no
+    toda la aplicación; el resto de pestañas se actualiza en la siguiente
+    ejecución completa.
+    """
+    # Obtener configuración de gastos
+    gastos_config = obtener_montos_configurados_sesion(conn, mes, anio)
+    
+    if not gastos_config.empty:
+        st.subheader(f"Gastos de {persona}")
+        
+        # Semanas pagadas de todos los gastos del mes en una sola consulta
+        resumen_pagos = obtener_resumen_pagos_del_mes(conn, mes, anio)
+        
+        # Semanas del mes y sus rangos, iguales para todos los gastos semanales
+        semanas_mes = calcular_semanas_del_mes(mes, anio)
+        rangos_semanas = [obtener_rango_semana(mes, anio, s) for s in range(1, semanas_mes + 1)]
+        
+        # Gastos ya saldados: se listan juntos al final en una sola línea cada uno
+        ya_pagados = []
+        
+        # Monto del mes según frecuencia y reparto entre ambos, para todos los gastos a la vez
+        montos_mes = (gastos_config['monto_total'] * gastos_config['frecuencia'].map(
+            obtener_multiplicadores_frecuencia(mes, anio)
+        ).fillna(1.0)).tolist()
+        montos_ricardo, montos_wendy = calcular_distribucion_vectorizada(gastos_config, montos_mes)
+        
+        for gasto, monto_total_mes, monto_ricardo, monto_wendy in zip(
+            gastos_config.to_dict('records'), montos_mes, montos_ricardo, montos_wendy
+        ):
+            gasto_id = gasto['id']
+            concepto = gasto['concepto']
+            monto_base = gasto['monto_total']
+            frecuencia = gasto['frecuencia']
+            grupo = gasto.get('grupo', '')
+            
+            # Cuánto debe pagar esta persona según distribución
+            monto_pagar = monto_ricardo if persona == "Ricardo" else monto_wendy
+            
+            # Información de distribución
+            plantilla = TEXTOS_DISTRIBUCION_PAGO.get(gasto.get('tipo_distribucion', '50/50'),
+                                                     TEXTOS_DISTRIBUCION_PAGO['50/50'])
+            dist_info = describir_distribucion(plantilla, gasto, monto_ricardo, monto_wendy)
+            
+            # ====== MANEJO ESPECIAL PARA GASTOS SEMANALES ======
+            if frecuencia == "Semanal":
+                semanas_pagadas = resumen_pagos.get((gasto_id, persona), {'semanas': []})['semanas']
+                semanas_pendientes = [s for s in range(1, semanas_mes + 1) if s not in semanas_pagadas]
+                
+                monto_semanal_persona = monto_pagar / semanas_mes
+                # Texto del monto semanal, formateado una vez para todas las semanas
+                monto_semanal_texto = formatear_monto(monto_semanal_persona)
+                
+                titulo = f"📅 **{concepto}**"
+                if grupo:
+                    titulo += f" [{grupo}]"
+                
+                if not semanas_pendientes:
+                    ya_pagados.append(
+                        f"{titulo} - Total pagado: {formatear_monto(monto_pagar)} "
+                        f"({semanas_mes} semanas × {monto_semanal_texto})"
+                    )
+                    continue
+                
+                titulo += f" - {monto_semanal_texto}/semana ({len(semanas_pagadas)}/{semanas_mes} pagadas)"
+                
+                with st.expander(titulo, expanded=True):
+                    st.caption(dist_info)
+                    st.write(f"**Semanas pendientes:** {len(semanas_pendientes)}")
+                    
+                    for num_semana in semanas_pendientes:
+                        rango = rangos_semanas[num_semana - 1]
+                        col1, col2, col3 = st.columns([3, 2, 1])
+                        
+                        with col1:
+                            st.write(f"**Semana {num_semana}** ({rango[0]} - {rango[1]})")
+                        
+                        with col2:
+                            st.metric("A pagar", monto_semanal_texto)
+                        
+                        with col3:
+                            if st.button("✅ Pagar", key=f"pagar_sem_{gasto_id}_{num_semana}_{persona}"):
+                                if registrar_pago(conn, gasto_id, mes, 
+                                                anio, persona, monto_semanal_persona, num_semana):
+                                    st.success(f"✅ Pagada semana {num_semana}")
+                                    st.rerun(scope="fragment")
+                    
+                    # Pagar todas las semanas pendientes en una sola transacción
+                    if len(semanas_pendientes) > 1:
+                        if st.button(f"✅ Pagar las {len(semanas_pendientes)} semanas pendientes",
+                                     key=f"pagar_todas_sem_{gasto_id}_{persona}"):
+                            if registrar_pagos(conn, [
+                                (gasto_id, mes, anio, persona, monto_semanal_persona, num_semana)
+                                for num_semana in semanas_pendientes
+                            ]):
+                                st.success(f"✅ Pagadas {len(semanas_pendientes)} semanas")
+                                st.rerun(scope="fragment")
+            
+            # ====== GASTOS NO SEMANALES (MENSUAL, QUINCENAL, ANUAL) ======
+            else:
+                monto_pagar = monto_total_mes / 2  # 50% cada uno
+                
+                titulo_gasto = f"**{concepto}**"
+                if grupo:
+                    titulo_gasto += f" [{grupo}]"
+                
+                # Verificar si ya pagó (a partir del resumen ya consultado)
+                if (gasto_id, persona) in resumen_pagos:
+                    ya_pagados.append(f"{titulo_gasto} - Pagado: {formatear_monto(monto_pagar)}")
+                    continue
+                
+                # El borde del contenedor separa las filas sin un st.markdown("---") por gasto
+                with st.container(border=True):
+                    col1, col2, col3 = st.columns([3, 2, 1])
+                    
+                    with col1:
+                        st.write(titulo_gasto)
+                        
+                        # Información de frecuencia
+                        if frecuencia == "Quincenal":
+                            info_frecuencia = f"Quincenal: ${monto_base:.2f} × 2 = ${monto_total_mes:.2f}"
+                        elif frecuencia == "Anual":
+                            info_frecuencia = f"Anual: ${monto_base:.2f} ÷ 12 = ${monto_total_mes:.2f}/mes"
+                        else:
+                            info_frecuencia = f"Frecuencia: {frecuencia}"
+                        
+                        # Frecuencia y distribución en un solo elemento
+                        st.caption(f"{info_frecuencia}  \n{dist_info}")
+                    
+                    with col2:
+                        st.metric("A pagar", formatear_monto(monto_pagar))
+                    
+                    with col3:
+                        if st.button("✅ Pagar", key=f"pagar_{gasto_id}_{persona}"):
+                            if registrar_pago(conn, gasto_id, mes, 
+                                            anio, persona, monto_pagar):
+                                st.success(f"✅ Pago registrado")
+                                st.rerun(scope="fragment")
+        
+        if ya_pagados:
+            with st.expander(f"✅ Ya pagados ({len(ya_pagados)})", expanded=False):
+                st.markdown("\n".join(f"- {linea}" for linea in ya_pagados))
+    else:
+        st.warning("⚠️ No hay gastos configurados para este mes.")
+
+
+@st.fragment
+def mostrar_fila_pago(conn, mes, anio, pago):
+    """
+    Muestra un pago del mes con su botón para eliminarlo.
+    Es un fragmento: al eliminar solo se vuelve a ejecutar esta fila, que
+    queda marcada como eliminada; el resto de la app se actualiza en la
+    siguiente ejecución completa.
+    """
+    if pago['id'] in st.session_state.get('pagos_eliminados', set()):
+        st.caption(f"🗑️ Pago de {pago['concepto']} eliminado")
+        return
+    
+    with st.container():
+        col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
+        
+        with col1:
+            # Mostrar el concepto y si es semanal, el número de semana
+            if pago['frecuencia'] == 'Semanal' and pago['semana'] is not None:
+                rango = obtener_rango_semana(mes, anio, int(pago['semana']))
+                st.write(f"**{pago['concepto']}** 📅 Semana {int(pago['semana'])} ({rango[0]}-{rango[1]})")
+            else:
+                st.write(f"**{pago['concepto']}**")
+        
+        with col2:
+            st.write(f"💵 ${pago['monto_pagado']:.2f}")
+        
+        with col3:
+            icono = "👨" if pago['quien_pago'] == 'Ricardo' else "👩"
+            st.write(f"{icono} {pago['quien_pago']}")
+        
+        with col4:
+            st.caption(pago['fecha_pago'])
+        
+        with col5:
+            if st.button("🗑️", key=f"eliminar_pago_{pago['id']}", help="Eliminar este pago"):
+                if eliminar_pago(conn, pago['id']):
+                    st.session_state.setdefault('pagos_eliminados', set()).add(pago['id'])
+                    st.rerun(scope="fragment")
+        
+        st.markdown("---")
+
+def mostrar_tabla_pendientes(pendientes_df):
+    """
+    Muestra los gastos pendientes de una persona (de calcular_pendientes_persona)
+    como una sola tabla, en lugar de columnas y métricas fila por fila.
+    """
+    st.dataframe(
+        pendientes_df,
+        use_container_width=True,
+        hide_index=True,
+        column_order=["concepto", "frecuencia", "monto_total", "debe_pagar_total", "ya_pago", "pendiente"],
+        column_config={
+            "concepto": st.column_config.TextColumn(
+                "Gasto",
+                width="medium"
+            ),
+            "frecuencia": st.column_config.TextColumn(
+                "Frecuencia",
+                width="small"
+            ),
+            "monto_total": st.column_config.NumberColumn(
+                "Total",
+                format="$%.2f",
+                width="small"
+            ),
+            "debe_pagar_total": st.column_config.NumberColumn(
+                "Debes Pagar",
+                format="$%.2f",
+                width="small"
+            ),
+            "ya_pago": st.column_config.NumberColumn(
+                "Pagaste",
+                format="$%.2f",
+                width="small"
+            ),
+            "pendiente": st.column_config.NumberColumn(
+                "Pendiente",
+                format="$%.2f",
+                width="small"
+            )
+        }
+    )
+
+@st.dialog("Confirmar eliminación")
+def confirmar_eliminar_pagos_del_mes(conn, mes, anio):
+    """
+    Pide confirmación en un diálogo antes de eliminar todos los pagos del mes,
+    en lugar de esperar un segundo clic en el mismo botón.
+    """
+    st.error(f"Se eliminarán **todos** los pagos de {MESES[mes]} {anio}.")
+    st.caption("Esta acción no se puede deshacer.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🗑️ Sí, eliminar", type="primary", use_container_width=True):
+            eliminados = eliminar_pagos_del_mes(conn, mes, anio)
+            st.session_state.pagos_eliminados_del_mes = eliminados
+            st.rerun()
+    with col2:
+        if st.button("Cancelar", use_container_width=True):
+            st.rerun()
+
+# Etiquetas de cada tipo de distribución en los formularios de gastos
+OPCIONES_DISTRIBUCION = {
+    "50/50": "⚖️ 50/50 (mitad cada uno)",
+    "fijo_ricardo": "💰 Ricardo paga monto fijo",
+    "fijo_wendy": "💰 Wendy paga monto fijo",
+    "personalizado": "⚙️ Porcentaje personalizado"
+}
+
+def mostrar_campos_distribucion(sufijo_key, monto_total, gasto=None):
+    """
+    Muestra los campos de distribución del pago de un gasto, compartidos por el
+    formulario de alta y el de edición.
+    sufijo_key: sufijo de las keys de los widgets ('nuevo' o 'edit_<id>')
+    gasto: gasto que se está editando, para tomar sus valores actuales
+    Returns: (tipo_distribucion, monto_fijo_ricardo, monto_fijo_wendy, porcentaje_ricardo)
+    """
+    gasto = gasto or {}
+    opciones = list(OPCIONES_DISTRIBUCION)
+    tipo_actual = gasto.get('tipo_distribucion', '50/50')
+    monto_por_defecto = min(100.0, float(monto_total) if monto_total > 0 else 100.0)
+    
+    tipo_distribucion = st.radio(
+        "¿Cómo se divide el pago?",
+        options=opciones,
+        format_func=OPCIONES_DISTRIBUCION.get,
+        index=opciones.index(tipo_actual) if tipo_actual in opciones else 0,
+        key=f"dist_{sufijo_key}"
+    )
+    
+    monto_fijo_ricardo = None
+    monto_fijo_wendy = None
+    porcentaje_ricardo = 50.0
+    
+    if tipo_distribucion == "fijo_ricardo":
+        st.info("💰 Ricardo paga un monto fijo, Wendy paga la diferencia")
+        monto_fijo_ricardo = st.number_input(
+            "¿Cuánto paga Ricardo? ($)",
+            min_value=0.0,
+            value=float(gasto['monto_fijo_ricardo']) if gasto.get('monto_fijo_ricardo') else monto_por_defecto,
+            step=0.01,
+            format="%.2f",
+            key=f"monto_r_{sufijo_key}"
+        )
+        if monto_total > 0:
+            diferencia = max(0, monto_total - monto_fijo_ricardo)
+            st.success(f"✅ Ricardo: ${monto_fijo_ricardo:.2f} | Wendy: ${diferencia:.2f}")
+    
+    elif tipo_distribucion == "fijo_wendy":
+        st.info("💰 Wendy paga un monto fijo, Ricardo paga la diferencia")
+        monto_fijo_wendy = st.number_input(
+            "¿Cuánto paga Wendy? ($)",
+            min_value=0.0,
+            value=float(gasto['monto_fijo_wendy']) if gasto.get('monto_fijo_wendy') else monto_por_defecto,
+            step=0.01,
+            format="%.2f",
+            key=f"monto_w_{sufijo_key}"
+        )
+        if monto_total > 0:
+            diferencia = max(0, monto_total - monto_fijo_wendy)
+            st.success(f"✅ Wendy: ${monto_fijo_wendy:.2f} | Ricardo: ${diferencia:.2f}")
+    
+    elif tipo_distribucion == "personalizado":
+        st.info("⚙️ Define el porcentaje de cada uno")
+        porcentaje_ricardo = st.slider(
+            "Porcentaje que paga Ricardo (%)",
+            0.0, 100.0,
+            float(gasto['porcentaje_ricardo']) if gasto.get('porcentaje_ricardo') else 50.0,
+            1.0,
+            key=f"porc_r_{sufijo_key}"
+        )
+        if monto_total > 0:
+            monto_r = monto_total * (porcentaje_ricardo / 100)
+            monto_w = monto_total * ((100 - porcentaje_ricardo) / 100)
+            st.success(f"✅ Ricardo: {porcentaje_ricardo:.0f}% (${monto_r:.2f}) | Wendy: {100-porcentaje_ricardo:.0f}% (${monto_w:.2f})")
+    else:
+        if monto_total > 0:
+            mitad = monto_total / 2
+            st.success(f"✅ Ricardo: ${mitad:.2f} | Wendy: ${mitad:.2f}")
+    
+    return tipo_distribucion, monto_fijo_ricardo, monto_fijo_wendy, porcentaje_ricardo
+
 def main():
     st.set_page_config(
         page_title="Contabilidad Ricardo y Wendy",
@@ -1551,11 +2046,10 @@ def main():
         mes_actual = fecha_actual.month
         anio_actual = fecha_actual.year
         
-        meses = {i: calendar.month_name[i] for i in range(1, 13)}
         mes_seleccionado = st.selectbox(
             "📅 Mes",
-            options=list(meses.keys()),
-            format_func=lambda x: meses[x],
+            options=list(MESES.keys()),
+            format_func=lambda x: MESES[x],
             index=mes_actual - 1
         )
     
@@ -1567,7 +2061,19 @@ def main():
             value=anio_actual
         )
     
+    # Nombre del mes y periodo que repiten los títulos de todas las pestañas
+    nombre_mes = MESES[mes_seleccionado]
+    periodo = f"{nombre_mes} {anio_seleccionado}"
+    
+    # Tabla, saldo y pagos por gasto del mes: se calculan una vez por
+    # ejecución y los comparten todas las pestañas
+    tabla_mes = calcular_tabla_mensual(conn, mes_seleccionado, anio_seleccionado)
+    saldo_mes = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
+    totales_pagados_mes = obtener_totales_pagados_del_mes(conn, mes_seleccionado, anio_seleccionado)
+    
     # Crear tabs para diferentes funcionalidades
+    # Pestañas perezosas: solo se ejecuta el cuerpo de la pestaña abierta
+    # (tabN.open), así las demás no consultan datos ni dibujan nada
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
         "📊 Tabla Mensual", 
         "💳 Pagar Gastos",
@@ -1578,1546 +2084,1075 @@ def main():
         "💰 Resumen",
         "👨 Ricardo",
         "👩 Wendy"
-    ])
+    ], key="pestana_activa", on_change="rerun")
     
     # ========== TAB 1: TABLA MENSUAL ==========
     with tab1:
-        st.header(f"📊 Tabla de Gastos - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        # Mensaje informativo
-        if mes_seleccionado == fecha_actual.month and anio_seleccionado == fecha_actual.year:
-            st.info(f"📅 Estás viendo el mes **actual** ({meses[mes_seleccionado]} {anio_seleccionado})")
-        else:
-            st.warning(f"📅 Estás viendo un mes **diferente** ({meses[mes_seleccionado]} {anio_seleccionado}). Los gastos son los mismos cada mes, pero los pagos varían.")
-        
-        # Sección para editar montos del mes
-        with st.expander("✏️ Editar Montos de este Mes (Luz, Agua, Internet, etc.)"):
-            st.write("**Los gastos como luz, agua e internet varían cada mes. Aquí puedes ajustar sus montos.**")
-            st.caption("📝 Los montos editados solo afectarán a este mes, no a los meses anteriores o futuros.")
-            st.caption("ℹ️ Solo se muestran gastos con monto **variable**. Los gastos fijos no se pueden editar aquí.")
-            
-            gastos_config = obtener_montos_configurados(conn, mes_seleccionado, anio_seleccionado)
+        if tab1.open:
+            st.header(f"📊 Tabla de Gastos - {periodo}")
             
-            # Filtrar solo los gastos VARIABLES
-            if not gastos_config.empty:
-                gastos_config = gastos_config[gastos_config['tipo_monto'] == 'variable']
+            # Mensaje informativo
+            if mes_seleccionado == fecha_actual.month and anio_seleccionado == fecha_actual.year:
+                st.info(f"📅 Estás viendo el mes **actual** ({periodo})")
+            else:
+                st.warning(f"📅 Estás viendo un mes **diferente** ({periodo}). Los gastos son los mismos cada mes, pero los pagos varían.")
             
-            if not gastos_config.empty:
-                for idx, gasto in gastos_config.iterrows():
-                    es_grupo = gasto.get('grupo') is not None and gasto.get('grupo') != '' and gasto.get('grupo') != None
-                    
-                    # Si es un grupo, mostrar edición expandida
-                    if es_grupo:
-                        with st.container():
-                            col_header1, col_header2 = st.columns([3, 1])
-                            
-                            with col_header1:
-                                st.write(f"**📦 {gasto['grupo']}** ({gasto['concepto']})")
-                                if gasto['personalizado']:
-                                    st.caption("📝 Montos personalizados para este mes")
-                                else:
-                                    st.caption(f"📋 Monto base total: ${gasto['monto_total']:.2f}")
-                            
-                            with col_header2:
-                                mostrar_grupo = st.checkbox(
-                                    "Editar",
-                                    key=f"toggle_grupo_{gasto['id']}",
-                                    help="Editar gastos individuales del grupo"
-                                )
-                            
-                            if mostrar_grupo:
-                                st.markdown("---")
-                                st.write("**Gastos individuales del grupo:**")
-                                
-                                # Parsear los gastos individuales
-                                gastos_individuales = [g.strip() for g in gasto['concepto'].split('+')]
+            # Sección para editar montos del mes
+            with st.expander("✏️ Editar Montos de este Mes (Luz, Agua, Internet, etc.)"):
+                st.write("**Los gastos como luz, agua e internet varían cada mes. Aquí puedes ajustar sus montos.**")
+                st.caption("📝 Los montos editados solo afectarán a este mes, no a los meses anteriores o futuros.")
+                st.caption("ℹ️ Solo se muestran gastos con monto **variable**. Los gastos fijos no se pueden editar aquí.")
+                
+                gastos_config = obtener_montos_configurados_sesion(conn, mes_seleccionado, anio_seleccionado)
+                
+                # Filtrar solo los gastos VARIABLES
+                if not gastos_config.empty:
+                    gastos_config = gastos_config[gastos_config['tipo_monto'] == 'variable']
+                
+                if not gastos_config.empty:
+                    for gasto in gastos_config.to_dict('records'):
+                        es_grupo = gasto.get('grupo') is not None and gasto.get('grupo') != '' and gasto.get('grupo') != None
+                        
+                        # Si es un grupo, mostrar edición expandida
+                        if es_grupo:
+                            with st.container():
+                                col_header1, col_header2 = st.columns([3, 1])
                                 
-                                # Calcular monto por gasto (distribución equitativa por defecto)
-                                monto_por_gasto = gasto['monto_total'] / len(gastos_individuales)
+                                with col_header1:
+                                    st.write(f"**📦 {gasto['grupo']}** ({gasto['concepto']})")
+                                    if gasto['personalizado']:
+                                        st.caption("📝 Montos personalizados para este mes")
+                                    else:
+                                        st.caption(f"📋 Monto base total: ${gasto['monto_total']:.2f}")
                                 
-                                montos_individuales = []
+                                with col_header2:
+                                    mostrar_grupo = st.checkbox(
+                                        "Editar",
+                                        key=f"toggle_grupo_{gasto['id']}",
+                                        help="Editar gastos individuales del grupo"
+                                    )
                                 
-                                for i, nombre_gasto in enumerate(gastos_individuales):
-                                    col1, col2 = st.columns([2, 2])
+                                if mostrar_grupo:
+                                    st.markdown("---")
+                                    st.write("**Gastos individuales del grupo:**")
                                     
-                                    with col1:
-                                        st.write(f"  • **{nombre_gasto}**")
+                                    # Parsear los gastos individuales
+                                    gastos_individuales = separar_conceptos_grupo(gasto['concepto'])
                                     
-                                    with col2:
-                                        monto_individual = st.number_input(
-                                            f"Monto {nombre_gasto}",
-                                            min_value=0.0,
-                                            value=float(monto_por_gasto),
-                                            step=0.01,
-                                            format="%.2f",
-                                            key=f"monto_individual_{gasto['id']}_{i}",
-                                            label_visibility="collapsed",
-                                            help=f"Monto específico para {nombre_gasto} en {meses[mes_seleccionado]}"
-                                        )
-                                        montos_individuales.append(monto_individual)
-                                
-                                # Mostrar total calculado
-                                total_calculado = sum(montos_individuales)
-                                st.info(f"💰 **Total del grupo:** ${total_calculado:.2f}")
+                                    # Calcular monto por gasto (distribución equitativa por defecto)
+                                    monto_por_gasto = gasto['monto_total'] / len(gastos_individuales)
+                                    
+                                    montos_individuales = []
+                                    
+                                    for i, nombre_gasto in enumerate(gastos_individuales):
+                                        col1, col2 = st.columns([2, 2])
+                                        
+                                        with col1:
+                                            st.write(f"  • **{nombre_gasto}**")
+                                        
+                                        with col2:
+                                            monto_individual = st.number_input(
+                                                f"Monto {nombre_gasto}",
+                                                min_value=0.0,
+                                                value=float(monto_por_gasto),
+                                                step=0.01,
+                                                format="%.2f",
+                                                key=f"monto_individual_{gasto['id']}_{i}",
+                                                label_visibility="collapsed",
+                                                help=f"Monto específico para {nombre_gasto} en {nombre_mes}"
+                                            )
+                                            montos_individuales.append(monto_individual)
+                                    
+                                    # Mostrar total calculado
+                                    total_calculado = sum(montos_individuales)
+                                    st.info(f"💰 **Total del grupo:** ${total_calculado:.2f}")
+                                    
+                                    # Botón para guardar
+                                    if st.button("💾 Guardar montos del grupo", key=f"guardar_grupo_{gasto['id']}", type="primary"):
+                                        resultado = establecer_monto_del_mes(conn, gasto['id'], mes_seleccionado, anio_seleccionado, total_calculado)
+                                        if resultado:
+                                            st.success(f"✅ Montos actualizados para {gasto['grupo']}")
+                                            st.caption(f"Desglose guardado: {' | '.join([f'{g}: ${m:.2f}' for g, m in zip(gastos_individuales, montos_individuales)])}")
+                                            st.rerun()
+                                        else:
+                                            st.error("❌ Error al guardar los montos del grupo")
                                 
-                                # Botón para guardar
-                                if st.button("💾 Guardar montos del grupo", key=f"guardar_grupo_{gasto['id']}", type="primary"):
-                                    resultado = establecer_monto_del_mes(conn, gasto['id'], mes_seleccionado, anio_seleccionado, total_calculado)
+                                st.markdown("---")
+                        
+                        # Gasto simple (no es grupo)
+                        else:
+                            col1, col2, col3 = st.columns([2, 2, 1])
+                            
+                            with col1:
+                                st.write(f"**{gasto['concepto']}**")
+                                if gasto['personalizado']:
+                                    st.caption("📝 Monto personalizado para este mes")
+                                else:
+                                    st.caption("📋 Usando monto base")
+                            
+                            with col2:
+                                nuevo_monto = st.number_input(
+                                    f"Monto para {nombre_mes}",
+                                    min_value=0.0,
+                                    value=float(gasto['monto_total']),
+                                    step=0.01,
+                                    format="%.2f",
+                                    key=f"monto_{gasto['id']}",
+                                    label_visibility="collapsed"
+                                )
+                            
+                            with col3:
+                                if st.button("💾", key=f"guardar_monto_{gasto['id']}", help="Guardar monto"):
+                                    resultado = establecer_monto_del_mes(conn, gasto['id'], mes_seleccionado, anio_seleccionado, nuevo_monto)
                                     if resultado:
-                                        st.success(f"✅ Montos actualizados para {gasto['grupo']}")
-                                        st.caption(f"Desglose guardado: {' | '.join([f'{g}: ${m:.2f}' for g, m in zip(gastos_individuales, montos_individuales)])}")
+                                        st.success("✅ Guardado")
                                         st.rerun()
                                     else:
-                                        st.error("❌ Error al guardar los montos del grupo")
+                                        st.error("❌ Error al guardar")
                             
                             st.markdown("---")
-                    
-                    # Gasto simple (no es grupo)
-                    else:
-                        col1, col2, col3 = st.columns([2, 2, 1])
-                        
-                        with col1:
-                            st.write(f"**{gasto['concepto']}**")
-                            if gasto['personalizado']:
-                                st.caption("📝 Monto personalizado para este mes")
-                            else:
-                                st.caption("📋 Usando monto base")
-                        
-                        with col2:
-                            nuevo_monto = st.number_input(
-                                f"Monto para {meses[mes_seleccionado]}",
-                                min_value=0.0,
-                                value=float(gasto['monto_total']),
-                                step=0.01,
-                                format="%.2f",
-                                key=f"monto_{gasto['id']}",
-                                label_visibility="collapsed"
-                            )
-                        
-                        with col3:
-                            if st.button("💾", key=f"guardar_monto_{gasto['id']}", help="Guardar monto"):
-                                resultado = establecer_monto_del_mes(conn, gasto['id'], mes_seleccionado, anio_seleccionado, nuevo_monto)
-                                if resultado:
-                                    st.success("✅ Guardado")
-                                    st.rerun()
-                                else:
-                                    st.error("❌ Error al guardar")
-                        
-                        st.markdown("---")
-            else:
-                st.info("ℹ️ No hay gastos **variables** configurados en este momento. Los gastos con montos fijos no se muestran aquí.")
-        
-        st.markdown("---")
-        
-        tabla_df = calcular_tabla_mensual(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not tabla_df.empty:
-            # Agregar columnas de monto pagado y pendiente
-            cursor = conn.cursor()
+                else:
+                    st.info("ℹ️ No hay gastos **variables** configurados en este momento. Los gastos con montos fijos no se muestran aquí.")
+            
+            st.markdown("---")
             
-            tabla_df['Ricardo Pagado'] = 0.0
-            tabla_df['Ricardo Pendiente'] = 0.0
-            tabla_df['Ricardo %'] = 0.0
-            tabla_df['Wendy Pagado'] = 0.0
-            tabla_df['Wendy Pendiente'] = 0.0
-            tabla_df['Wendy %'] = 0.0
+            # Copia porque esta pestaña le agrega las columnas de pagos
+            tabla_df = tabla_mes.copy()
             
-            for idx, row in tabla_df.iterrows():
-                gasto_id = row['id']
-                asignado_ricardo = row['Asignado Ricardo']
-                asignado_wendy = row['Asignado Wendy']
+            if not tabla_df.empty:
+                # Agregar columnas de monto pagado y pendiente, a partir de los
+                # totales del mes ya consultados
+                for quien in ("Ricardo", "Wendy"):
+                    asignado = tabla_df[f'Asignado {quien}']
+                    pagado = tabla_df['id'].map(
+                        lambda id_fila: totales_pagados_mes.get((id_fila, quien), 0.0)
+                    ).astype(float)
+                    tabla_df[f'{quien} Pagado'] = pagado
+                    tabla_df[f'{quien} Pendiente'] = (asignado - pagado).clip(lower=0)
+                    tabla_df[f'{quien} %'] = (pagado / asignado * 100).where(asignado > 0, 0.0)
                 
-                # Calcular para Ricardo
-                try:
-                    if str(gasto_id).startswith('grupo_'):
-                        grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                        query = """
-                            SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                            FROM pagos p
-                            INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                            WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Ricardo'
-                        """
-                        cursor.execute(query, (grupo_id, mes_seleccionado, anio_seleccionado))
-                    else:
-                        query = """
-                            SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                            FROM pagos
-                            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Ricardo'
-                        """
-                        cursor.execute(query, (gasto_id, mes_seleccionado, anio_seleccionado))
-                    
-                    result = cursor.fetchone()
-                    ricardo_pagado = result[0] if result else 0.0
-                    ricardo_pendiente = max(0, asignado_ricardo - ricardo_pagado)
-                    ricardo_porcentaje = (ricardo_pagado / asignado_ricardo * 100) if asignado_ricardo > 0 else 0
-                    
-                    tabla_df.at[idx, 'Ricardo Pagado'] = ricardo_pagado
-                    tabla_df.at[idx, 'Ricardo Pendiente'] = ricardo_pendiente
-                    tabla_df.at[idx, 'Ricardo %'] = ricardo_porcentaje
-                except:
-                    pass
+                # Crear dos tablas separadas: una para Ricardo y otra para Wendy
+                st.subheader("👨 Tabla de Ricardo")
                 
-                # Calcular para Wendy
-                try:
-                    if str(gasto_id).startswith('grupo_'):
-                        grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                        query = """
-                            SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                            FROM pagos p
-                            INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                            WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Wendy'
-                        """
-                        cursor.execute(query, (grupo_id, mes_seleccionado, anio_seleccionado))
-                    else:
-                        query = """
-                            SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                            FROM pagos
-                            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Wendy'
-                        """
-                        cursor.execute(query, (gasto_id, mes_seleccionado, anio_seleccionado))
-                    
-                    result = cursor.fetchone()
-                    wendy_pagado = result[0] if result else 0.0
-                    wendy_pendiente = max(0, asignado_wendy - wendy_pagado)
-                    wendy_porcentaje = (wendy_pagado / asignado_wendy * 100) if asignado_wendy > 0 else 0
-                    
-                    tabla_df.at[idx, 'Wendy Pagado'] = wendy_pagado
-                    tabla_df.at[idx, 'Wendy Pendiente'] = wendy_pendiente
-                    tabla_df.at[idx, 'Wendy %'] = wendy_porcentaje
-                except:
-                    pass
-            
-            # Crear dos tablas separadas: una para Ricardo y otra para Wendy
-            st.subheader("👨 Tabla de Ricardo")
-            
-            # Tabla de Ricardo
-            columnas_ricardo = ['Concepto', 'Monto Total', 'Frecuencia', 'Asignado Ricardo',
-                               'Ricardo Pagado', 'Ricardo Pendiente', 'Ricardo %']
-            tabla_ricardo = tabla_df[columnas_ricardo].copy()
-            
-            st.dataframe(
-                tabla_ricardo,
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "Concepto": st.column_config.TextColumn(
-                        "Concepto",
-                        width="medium",
-                        help="Nombre del gasto"
-                    ),
-                    "Monto Total": st.column_config.NumberColumn(
-                        "💰 Total",
-                        format="$%.2f",
-                        width="small"
-                    ),
-                    "Frecuencia": st.column_config.TextColumn(
-                        "📅 Frecuencia",
-                        width="small"
-                    ),
-                    "Asignado Ricardo": st.column_config.NumberColumn(
-                        "💵 Asignado",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto asignado a Ricardo"
-                    ),
-                    "Ricardo Pagado": st.column_config.NumberColumn(
-                        "✅ Pagado",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto que Ricardo ya pagó"
-                    ),
-                    "Ricardo Pendiente": st.column_config.NumberColumn(
-                        "⏳ Pendiente",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto que le falta pagar a Ricardo"
-                    ),
-                    "Ricardo %": st.column_config.NumberColumn(
-                        "📊 Progreso",
-                        format="%.0f%%",
-                        width="small",
-                        help="Porcentaje pagado por Ricardo"
-                    )
-                }
-            )
+                # Tabla de Ricardo
+                columnas_ricardo = ['Concepto', 'Monto Total', 'Frecuencia', 'Asignado Ricardo',
+                                   'Ricardo Pagado', 'Ricardo Pendiente', 'Ricardo %']
+                tabla_ricardo = tabla_df[columnas_ricardo]
+                
+                st.dataframe(
+                    tabla_ricardo,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Concepto": st.column_config.TextColumn(
+                            "Concepto",
+                            width="medium",
+                            help="Nombre del gasto"
+                        ),
+                        "Monto Total": st.column_config.NumberColumn(
+                            "💰 Total",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Frecuencia": st.column_config.TextColumn(
+                            "📅 Frecuencia",
+                            width="small"
+                        ),
+                        "Asignado Ricardo": st.column_config.NumberColumn(
+                            "💵 Asignado",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto asignado a Ricardo"
+                        ),
+                        "Ricardo Pagado": st.column_config.NumberColumn(
+                            "✅ Pagado",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto que Ricardo ya pagó"
+                        ),
+                        "Ricardo Pendiente": st.column_config.NumberColumn(
+                            "⏳ Pendiente",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto que le falta pagar a Ricardo"
+                        ),
+                        "Ricardo %": st.column_config.NumberColumn(
+                            "📊 Progreso",
+                            format="%.0f%%",
+                            width="small",
+                            help="Porcentaje pagado por Ricardo"
+                        )
+                    }
+                )
+                
+                # Resumen de Ricardo
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    ricardo_asignado_total = tabla_df['Asignado Ricardo'].sum()
+                    st.metric("💵 Asignado Total", f"${ricardo_asignado_total:.2f}")
+                with col2:
+                    ricardo_pagado_total = tabla_df['Ricardo Pagado'].sum()
+                    st.metric("✅ Ya Pagó", f"${ricardo_pagado_total:.2f}")
+                with col3:
+                    ricardo_pendiente_total = tabla_df['Ricardo Pendiente'].sum()
+                    progreso_ricardo = (ricardo_pagado_total / ricardo_asignado_total * 100) if ricardo_asignado_total > 0 else 0
+                    st.metric("⏳ Pendiente", f"${ricardo_pendiente_total:.2f}", 
+                             delta=f"{progreso_ricardo:.0f}% pagado", delta_color="normal")
+                
+                st.markdown("---")
+                
+                # Tabla de Wendy
+                st.subheader("👩 Tabla de Wendy")
+                
+                columnas_wendy = ['Concepto', 'Monto Total', 'Frecuencia', 'Asignado Wendy',
+                                 'Wendy Pagado', 'Wendy Pendiente', 'Wendy %']
+                tabla_wendy = tabla_df[columnas_wendy]
+                
+                st.dataframe(
+                    tabla_wendy,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Concepto": st.column_config.TextColumn(
+                            "Concepto",
+                            width="medium",
+                            help="Nombre del gasto"
+                        ),
+                        "Monto Total": st.column_config.NumberColumn(
+                            "💰 Total",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Frecuencia": st.column_config.TextColumn(
+                            "📅 Frecuencia",
+                            width="small"
+                        ),
+                        "Asignado Wendy": st.column_config.NumberColumn(
+                            "💵 Asignado",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto asignado a Wendy"
+                        ),
+                        "Wendy Pagado": st.column_config.NumberColumn(
+                            "✅ Pagado",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto que Wendy ya pagó"
+                        ),
+                        "Wendy Pendiente": st.column_config.NumberColumn(
+                            "⏳ Pendiente",
+                            format="$%.2f",
+                            width="small",
+                            help="Monto que le falta pagar a Wendy"
+                        ),
+                        "Wendy %": st.column_config.NumberColumn(
+                            "📊 Progreso",
+                            format="%.0f%%",
+                            width="small",
+                            help="Porcentaje pagado por Wendy"
+                        )
+                    }
+                )
+                
+                # Resumen de Wendy
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    wendy_asignado_total = tabla_df['Asignado Wendy'].sum()
+                    st.metric("💵 Asignado Total", f"${wendy_asignado_total:.2f}")
+                with col2:
+                    wendy_pagado_total = tabla_df['Wendy Pagado'].sum()
+                    st.metric("✅ Ya Pagó", f"${wendy_pagado_total:.2f}")
+                with col3:
+                    wendy_pendiente_total = tabla_df['Wendy Pendiente'].sum()
+                    progreso_wendy = (wendy_pagado_total / wendy_asignado_total * 100) if wendy_asignado_total > 0 else 0
+                    st.metric("⏳ Pendiente", f"${wendy_pendiente_total:.2f}",
+                             delta=f"{progreso_wendy:.0f}% pagado", delta_color="normal")
+            else:
+                st.warning("⚠️ No hay gastos mensuales configurados. Ve a la pestaña 'Gestionar Gastos' para agregar.")
+        
+    # ========== TAB 2: PAGAR GASTOS ==========
+    with tab2:
+        if tab2.open:
+            st.header(f"💳 Registrar Pago de Gastos - {periodo}")
             
-            # Resumen de Ricardo
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                ricardo_asignado_total = tabla_df['Asignado Ricardo'].sum()
-                st.metric("💵 Asignado Total", f"${ricardo_asignado_total:.2f}")
-            with col2:
-                ricardo_pagado_total = tabla_df['Ricardo Pagado'].sum()
-                st.metric("✅ Ya Pagó", f"${ricardo_pagado_total:.2f}")
-            with col3:
-                ricardo_pendiente_total = tabla_df['Ricardo Pendiente'].sum()
-                progreso_ricardo = (ricardo_pagado_total / ricardo_asignado_total * 100) if ricardo_asignado_total > 0 else 0
-                st.metric("⏳ Pendiente", f"${ricardo_pendiente_total:.2f}", 
-                         delta=f"{progreso_ricardo:.0f}% pagado", delta_color="normal")
+            # Verificar si es el mes actual
+            if mes_seleccionado != fecha_actual.month or anio_seleccionado != fecha_actual.year:
+                st.warning(f"⚠️ Atención: Estás registrando pagos para **{periodo}** (no es el mes actual)")
+            
+            # Selector de persona
+            persona = st.radio(
+                "¿Quién está pagando?",
+                options=["Ricardo", "Wendy"],
+                horizontal=True
+            )
             
             st.markdown("---")
             
-            # Tabla de Wendy
-            st.subheader("👩 Tabla de Wendy")
+            mostrar_pagos_de_persona(conn, mes_seleccionado, anio_seleccionado, persona)
+        
+    # ========== TAB 3: GESTIONAR GASTOS MENSUALES ==========
+    with tab3:
+        if tab3.open:
+            st.header("⚙️ Gestionar Gastos Mensuales")
             
-            columnas_wendy = ['Concepto', 'Monto Total', 'Frecuencia', 'Asignado Wendy',
-                             'Wendy Pagado', 'Wendy Pendiente', 'Wendy %']
-            tabla_wendy = tabla_df[columnas_wendy].copy()
+            # 3 Subtabs: Agregar Gasto (simplificado), Lista de Gastos, Grupos de Distribución
+            subtab1, subtab2, subtab3 = st.tabs([
+                "➕ Agregar Gasto", 
+                "📋 Lista de Gastos",
+                "📦 Grupos de Distribución"
+            ])
             
-            st.dataframe(
-                tabla_wendy,
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "Concepto": st.column_config.TextColumn(
+            # ========== SUBTAB 1: AGREGAR NUEVO GASTO (SIMPLIFICADO) ==========
+            with subtab1:
+                st.subheader("➕ Agregar Nuevo Gasto Mensual")
+                st.info("💡 **Nuevo diseño:** Cada gasto es independiente. Luego puedes agruparlos en 'Grupos de Distribución'.")
+                
+                with st.form("form_agregar_gasto", clear_on_submit=True):
+                    st.markdown("### 📝 Información del Gasto")
+                    
+                    concepto = st.text_input(
                         "Concepto",
-                        width="medium",
-                        help="Nombre del gasto"
-                    ),
-                    "Monto Total": st.column_config.NumberColumn(
-                        "💰 Total",
-                        format="$%.2f",
-                        width="small"
-                    ),
-                    "Frecuencia": st.column_config.TextColumn(
-                        "📅 Frecuencia",
-                        width="small"
-                    ),
-                    "Asignado Wendy": st.column_config.NumberColumn(
-                        "💵 Asignado",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto asignado a Wendy"
-                    ),
-                    "Wendy Pagado": st.column_config.NumberColumn(
-                        "✅ Pagado",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto que Wendy ya pagó"
-                    ),
-                    "Wendy Pendiente": st.column_config.NumberColumn(
-                        "⏳ Pendiente",
-                        format="$%.2f",
-                        width="small",
-                        help="Monto que le falta pagar a Wendy"
-                    ),
-                    "Wendy %": st.column_config.NumberColumn(
-                        "📊 Progreso",
-                        format="%.0f%%",
-                        width="small",
-                        help="Porcentaje pagado por Wendy"
+                        placeholder="Ej: Luz, Agua, Renta, Internet",
+                        help="Nombre del gasto (cada uno por separado)"
                     )
-                }
-            )
-            
-            # Resumen de Wendy
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                wendy_asignado_total = tabla_df['Asignado Wendy'].sum()
-                st.metric("💵 Asignado Total", f"${wendy_asignado_total:.2f}")
-            with col2:
-                wendy_pagado_total = tabla_df['Wendy Pagado'].sum()
-                st.metric("✅ Ya Pagó", f"${wendy_pagado_total:.2f}")
-            with col3:
-                wendy_pendiente_total = tabla_df['Wendy Pendiente'].sum()
-                progreso_wendy = (wendy_pagado_total / wendy_asignado_total * 100) if wendy_asignado_total > 0 else 0
-                st.metric("⏳ Pendiente", f"${wendy_pendiente_total:.2f}",
-                         delta=f"{progreso_wendy:.0f}% pagado", delta_color="normal")
-        else:
-            st.warning("⚠️ No hay gastos mensuales configurados. Ve a la pestaña 'Gestionar Gastos' para agregar.")
-    
-    # ========== TAB 2: PAGAR GASTOS ==========
-    with tab2:
-        st.header(f"💳 Registrar Pago de Gastos - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        # Verificar si es el mes actual
-        if mes_seleccionado != fecha_actual.month or anio_seleccionado != fecha_actual.year:
-            st.warning(f"⚠️ Atención: Estás registrando pagos para **{meses[mes_seleccionado]} {anio_seleccionado}** (no es el mes actual)")
-        
-        # Selector de persona
-        persona = st.radio(
-            "¿Quién está pagando?",
-            options=["Ricardo", "Wendy"],
-            horizontal=True
-        )
-        
-        st.markdown("---")
-        
-        # Obtener configuración de gastos
-        gastos_config = obtener_montos_configurados(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not gastos_config.empty:
-            st.subheader(f"Gastos de {persona}")
-            
-            for idx, gasto in gastos_config.iterrows():
-                gasto_id = gasto['id']
-                concepto = gasto['concepto']
-                monto_base = gasto['monto_total']
-                frecuencia = gasto['frecuencia']
-                grupo = gasto.get('grupo', '')
-                
-                # Calcular el monto total del mes según frecuencia
-                monto_total_mes = calcular_monto_mensual_segun_frecuencia(monto_base, frecuencia, mes_seleccionado, anio_seleccionado)
-                
-                # Calcular cuánto debe pagar esta persona según distribución
-                monto_ricardo, monto_wendy = calcular_distribucion_pago(gasto, monto_total_mes)
-                monto_pagar = monto_ricardo if persona == "Ricardo" else monto_wendy
-                
-                # Información de distribución
-                tipo_dist = gasto.get('tipo_distribucion', '50/50')
-                if tipo_dist == 'fijo_ricardo':
-                    dist_info = f"💰 Ricardo paga ${monto_ricardo:.2f} fijo, Wendy ${monto_wendy:.2f}"
-                elif tipo_dist == 'fijo_wendy':
-                    dist_info = f"💰 Wendy paga ${monto_wendy:.2f} fijo, Ricardo ${monto_ricardo:.2f}"
-                elif tipo_dist == 'personalizado':
-                    porc_r = gasto.get('porcentaje_ricardo', 50.0)
-                    porc_w = 100 - porc_r
-                    dist_info = f"⚖️ Ricardo {porc_r:.0f}% (${monto_ricardo:.2f}), Wendy {porc_w:.0f}% (${monto_wendy:.2f})"
-                else:
-                    dist_info = f"⚖️ 50/50 - ${monto_pagar:.2f} cada uno"
-                
-                # ====== MANEJO ESPECIAL PARA GASTOS SEMANALES ======
-                if frecuencia == "Semanal":
-                    semanas_mes = calcular_semanas_del_mes(mes_seleccionado, anio_seleccionado)
-                    semanas_pagadas = obtener_semanas_pagadas(conn, gasto_id, mes_seleccionado, anio_seleccionado, persona)
-                    semanas_pendientes = [s for s in range(1, semanas_mes + 1) if s not in semanas_pagadas]
                     
-                    monto_semanal_persona = monto_pagar / semanas_mes
+                    col1, col2 = st.columns(2)
                     
-                    titulo = f"📅 **{concepto}**"
-                    if grupo:
-                        titulo += f" [{grupo}]"
-                    titulo += f" - ${monto_semanal_persona:.2f}/semana ({len(semanas_pagadas)}/{semanas_mes} pagadas)"
+                    with col1:
+                        monto_total = st.number_input(
+                            "💰 Monto Base ($)",
+                            min_value=0.0,
+                            step=0.01,
+                            format="%.2f",
+                            help="Monto del gasto"
+                        )
                     
-                    with st.expander(titulo, expanded=len(semanas_pendientes) > 0):
-                        st.caption(dist_info)
-                        
-                        if semanas_pendientes:
-                            st.write(f"**Semanas pendientes:** {len(semanas_pendientes)}")
-                            
-                            for num_semana in semanas_pendientes:
-                                rango = obtener_rango_semana(mes_seleccionado, anio_seleccionado, num_semana)
-                                col1, col2, col3 = st.columns([3, 2, 1])
-                                
-                                with col1:
-                                    st.write(f"**Semana {num_semana}** ({rango[0]} - {rango[1]})")
-                                
-                                with col2:
-                                    st.metric("A pagar", f"${monto_semanal_persona:.2f}")
-                                
-                                with col3:
-                                    if st.button("✅ Pagar", key=f"pagar_sem_{gasto_id}_{num_semana}_{persona}"):
-                                        if registrar_pago(conn, gasto_id, mes_seleccionado, 
-                                                        anio_seleccionado, persona, monto_semanal_persona, num_semana):
-                                            st.success(f"✅ Pagada semana {num_semana}")
-                                            st.rerun()
-                        else:
-                            st.success(f"✅ Todas las semanas pagadas!")
-                            st.info(f"Total pagado: ${monto_pagar:.2f} ({semanas_mes} semanas × ${monto_semanal_persona:.2f})")
-                
-                # ====== GASTOS NO SEMANALES (MENSUAL, QUINCENAL, ANUAL) ======
-                else:
-                    monto_pagar = monto_total_mes / 2  # 50% cada uno
+                    with col2:
+                        frecuencia = st.selectbox(
+                            "📅 Frecuencia",
+                            options=["Mensual", "Semanal", "Quincenal", "Anual"],
+                            help="Con qué frecuencia se paga"
+                        )
                     
-                    # Verificar si ya pagó
-                    ya_pago = verificar_pago_existente(conn, gasto_id, mes_seleccionado, anio_seleccionado, persona)
+                    st.markdown("---")
+                    st.markdown("### 🔒/🔄 Tipo de Monto")
                     
-                    with st.container():
-                        col1, col2, col3 = st.columns([3, 2, 1])
-                        
-                        with col1:
-                            titulo_gasto = f"**{concepto}**"
-                            if grupo:
-                                titulo_gasto += f" [{grupo}]"
-                            st.write(titulo_gasto)
-                            
-                            # Información de frecuencia
-                            if frecuencia == "Quincenal":
-                                st.caption(f"Quincenal: ${monto_base:.2f} × 2 = ${monto_total_mes:.2f}")
-                            elif frecuencia == "Anual":
-                                st.caption(f"Anual: ${monto_base:.2f} ÷ 12 = ${monto_total_mes:.2f}/mes")
-                            else:
-                                st.caption(f"Frecuencia: {frecuencia}")
-                            
-                            # Información de distribución
-                            st.caption(dist_info)
-                        
-                        with col2:
-                            if ya_pago:
-                                st.success(f"✅ Pagado: ${monto_pagar:.2f}")
-                            else:
-                                st.metric("A pagar", f"${monto_pagar:.2f}")
-                        
-                        with col3:
-                            if not ya_pago:
-                                if st.button("✅ Pagar", key=f"pagar_{gasto_id}_{persona}"):
-                                    if registrar_pago(conn, gasto_id, mes_seleccionado, 
-                                                    anio_seleccionado, persona, monto_pagar):
-                                        st.success(f"✅ Pago registrado")
-                                        st.rerun()
-                            else:
-                                st.write("✓ Listo")
-                        
-                        st.markdown("---")
-        else:
-            st.warning("⚠️ No hay gastos configurados para este mes.")
-    
-    # ========== TAB 3: GESTIONAR GASTOS MENSUALES ==========
-    with tab3:
-        st.header("⚙️ Gestionar Gastos Mensuales")
-        
-        # 3 Subtabs: Agregar Gasto (simplificado), Lista de Gastos, Grupos de Distribución
-        subtab1, subtab2, subtab3 = st.tabs([
-            "➕ Agregar Gasto", 
-            "📋 Lista de Gastos",
-            "📦 Grupos de Distribución"
-        ])
-        
-        # ========== SUBTAB 1: AGREGAR NUEVO GASTO (SIMPLIFICADO) ==========
-        with subtab1:
-            st.subheader("➕ Agregar Nuevo Gasto Mensual")
-            st.info("💡 **Nuevo diseño:** Cada gasto es independiente. Luego puedes agruparlos en 'Grupos de Distribución'.")
-            
-            with st.form("form_agregar_gasto", clear_on_submit=True):
-                st.markdown("### 📝 Información del Gasto")
-                
-                concepto = st.text_input(
-                    "Concepto",
-                    placeholder="Ej: Luz, Agua, Renta, Internet",
-                    help="Nombre del gasto (cada uno por separado)"
-                )
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    monto_total = st.number_input(
-                        "💰 Monto Base ($)",
-                        min_value=0.0,
-                        step=0.01,
-                        format="%.2f",
-                        help="Monto del gasto"
-                    )
-                
-                with col2:
-                    frecuencia = st.selectbox(
-                        "📅 Frecuencia",
-                        options=["Mensual", "Semanal", "Quincenal", "Anual"],
-                        help="Con qué frecuencia se paga"
-                    )
-                
-                st.markdown("---")
-                st.markdown("### 🔒/🔄 Tipo de Monto")
-                
-                tipo_monto = st.radio(
-                    "Selecciona el tipo:",
-                    options=["fijo", "variable"],
-                    format_func=lambda x: "🔒 Fijo (siempre el mismo monto)" if x == "fijo" else "🔄 Variable (puede cambiar cada mes)",
-                    horizontal=True
-                )
-                
-                if tipo_monto == "fijo":
-                    st.caption("🔒 Este gasto siempre costará lo mismo")
-                else:
-                    st.caption("🔄 Podrás ajustar el monto cada mes")
-                
-                st.markdown("---")
-                st.markdown("### ⚖️ Distribución del Pago")
-                st.caption("💡 Puedes cambiar esto después o agrupar gastos en la pestaña 'Grupos de Distribución'")
-                
-                tipo_distribucion = st.radio(
-                    "¿Cómo se divide el pago?",
-                    options=["50/50", "fijo_ricardo", "fijo_wendy", "personalizado"],
-                    format_func=lambda x: {
-                        "50/50": "⚖️ 50/50 (mitad cada uno)",
-                        "fijo_ricardo": "💰 Ricardo paga monto fijo",
-                        "fijo_wendy": "💰 Wendy paga monto fijo",
-                        "personalizado": "⚙️ Porcentaje personalizado"
-                    }[x],
-                    index=0,
-                    key="dist_nuevo_gasto"
-                )
-                
-                monto_fijo_ricardo = None
-                monto_fijo_wendy = None
-                porcentaje_ricardo = 50.0
-                
-                if tipo_distribucion == "fijo_ricardo":
-                    st.info("💰 Ricardo paga un monto fijo, Wendy paga la diferencia")
-                    monto_fijo_ricardo = st.number_input(
-                        "¿Cuánto paga Ricardo? ($)",
-                        min_value=0.0,
-                        value=min(100.0, float(monto_total) if monto_total > 0 else 100.0),
-                        step=0.01,
-                        format="%.2f",
-                        key="monto_r_nuevo"
-                    )
-                    if monto_total > 0:
-                        diferencia = max(0, monto_total - monto_fijo_ricardo)
-                        st.success(f"✅ Ricardo: ${monto_fijo_ricardo:.2f} | Wendy: ${diferencia:.2f}")
-                
-                elif tipo_distribucion == "fijo_wendy":
-                    st.info("💰 Wendy paga un monto fijo, Ricardo paga la diferencia")
-                    monto_fijo_wendy = st.number_input(
-                        "¿Cuánto paga Wendy? ($)",
-                        min_value=0.0,
-                        value=min(100.0, float(monto_total) if monto_total > 0 else 100.0),
-                        step=0.01,
-                        format="%.2f",
-                        key="monto_w_nuevo"
-                    )
-                    if monto_total > 0:
-                        diferencia = max(0, monto_total - monto_fijo_wendy)
-                        st.success(f"✅ Wendy: ${monto_fijo_wendy:.2f} | Ricardo: ${diferencia:.2f}")
-                
-                elif tipo_distribucion == "personalizado":
-                    st.info("⚙️ Define el porcentaje de cada uno")
-                    porcentaje_ricardo = st.slider(
-                        "Porcentaje que paga Ricardo (%)",
-                        0.0, 100.0, 50.0, 1.0,
-                        key="porc_r_nuevo"
+                    tipo_monto = st.radio(
+                        "Selecciona el tipo:",
+                        options=["fijo", "variable"],
+                        format_func=lambda x: "🔒 Fijo (siempre el mismo monto)" if x == "fijo" else "🔄 Variable (puede cambiar cada mes)",
+                        horizontal=True
                     )
-                    if monto_total > 0:
-                        monto_r = monto_total * (porcentaje_ricardo / 100)
-                        monto_w = monto_total * ((100 - porcentaje_ricardo) / 100)
-                        st.success(f"✅ Ricardo: {porcentaje_ricardo:.0f}% (${monto_r:.2f}) | Wendy: {100-porcentaje_ricardo:.0f}% (${monto_w:.2f})")
-                else:
-                    if monto_total > 0:
-                        mitad = monto_total / 2
-                        st.success(f"✅ Ricardo: ${mitad:.2f} | Wendy: ${mitad:.2f}")
-                
-                st.markdown("---")
-                
-                submit_agregar = st.form_submit_button("💾 Agregar Gasto", type="primary", use_container_width=True)
-                
-                if submit_agregar:
-                    if concepto and monto_total > 0:
-                        # Validaciones
-                        if tipo_distribucion == "fijo_ricardo" and monto_fijo_ricardo and monto_fijo_ricardo > monto_total:
-                            st.error("❌ El monto fijo de Ricardo no puede ser mayor al monto total")
-                        elif tipo_distribucion == "fijo_wendy" and monto_fijo_wendy and monto_fijo_wendy > monto_total:
-                            st.error("❌ El monto fijo de Wendy no puede ser mayor al monto total")
-                        else:
-                            # Crear gasto sin grupo
-                            if crear_gasto_mensual(conn, concepto, monto_total, frecuencia, tipo_monto,
-                                                  tipo_distribucion, monto_fijo_ricardo, monto_fijo_wendy,
-                                                  porcentaje_ricardo, None):  # grupo=None
-                                tipo_texto = "Fijo" if tipo_monto == "fijo" else "Variable"
-                                st.success(f"✅ Gasto '{concepto}' agregado: ${monto_total:.2f} ({tipo_texto})")
-                                st.info("💡 Ve a la pestaña 'Grupos de Distribución' si quieres agrupar este gasto con otros")
-                                st.rerun()
+                    
+                    if tipo_monto == "fijo":
+                        st.caption("🔒 Este gasto siempre costará lo mismo")
                     else:
-                        st.error("⚠️ Completa todos los campos correctamente.")
-        
-        # ========== SUBTAB 2: LISTA Y EDICIÓN DE GASTOS ==========
-        with subtab2:
-            st.subheader("📋 Gastos Mensuales Actuales")
-            
-            gastos_df = leer_gastos_mensuales(conn)
+                        st.caption("🔄 Podrás ajustar el monto cada mes")
+                    
+                    st.markdown("---")
+                    st.markdown("### ⚖️ Distribución del Pago")
+                    st.caption("💡 Puedes cambiar esto después o agrupar gastos en la pestaña 'Grupos de Distribución'")
+                    
+                    tipo_distribucion, monto_fijo_ricardo, monto_fijo_wendy, porcentaje_ricardo = \
+                        mostrar_campos_distribucion('nuevo', monto_total)
+                    
+                    st.markdown("---")
+                    
+                    submit_agregar = st.form_submit_button("💾 Agregar Gasto", type="primary", use_container_width=True)
+                    
+                    if submit_agregar:
+                        if concepto and monto_total > 0:
+                            # Validaciones
+                            if tipo_distribucion == "fijo_ricardo" and monto_fijo_ricardo and monto_fijo_ricardo > monto_total:
+                                st.error("❌ El monto fijo de Ricardo no puede ser mayor al monto total")
+                            elif tipo_distribucion == "fijo_wendy" and monto_fijo_wendy and monto_fijo_wendy > monto_total:
+                                st.error("❌ El monto fijo de Wendy no puede ser mayor al monto total")
+                            else:
+                                # Crear gasto sin grupo
+                                if crear_gasto_mensual(conn, concepto, monto_total, frecuencia, tipo_monto,
+                                                      tipo_distribucion, monto_fijo_ricardo, monto_fijo_wendy,
+                                                      porcentaje_ricardo, None):  # grupo=None
+                                    tipo_texto = "Fijo" if tipo_monto == "fijo" else "Variable"
+                                    st.success(f"✅ Gasto '{concepto}' agregado: ${monto_total:.2f} ({tipo_texto})")
+                                    st.info("💡 Ve a la pestaña 'Grupos de Distribución' si quieres agrupar este gasto con otros")
+                                    st.rerun()
+                        else:
+                            st.error("⚠️ Completa todos los campos correctamente.")
             
-            if not gastos_df.empty:
-                # Botón para mostrar/ocultar el editor
-                if 'gasto_editar_id' not in st.session_state:
-                    st.session_state.gasto_editar_id = None
+            # ========== SUBTAB 2: LISTA Y EDICIÓN DE GASTOS ==========
+            with subtab2:
+                st.subheader("📋 Gastos Mensuales Actuales")
                 
-                for _, gasto in gastos_df.iterrows():
-                    # Verificar si el gasto está en algún grupo
-                    cursor = conn.cursor()
-                    query_grupo = """
-                        SELECT gd.nombre 
-                        FROM grupos_distribucion gd
-                        INNER JOIN gastos_en_grupo ge ON gd.id = ge.grupo_id
-                        WHERE ge.gasto_id = ? AND gd.activo = 1
-                    """
-                    cursor.execute(query_grupo, (gasto['id'],))
-                    grupo_info = cursor.fetchone()
-                    grupo_nombre = grupo_info[0] if grupo_info else None
+                gastos_df = leer_gastos_mensuales(conn)
+                
+                if not gastos_df.empty:
+                    # Botón para mostrar/ocultar el editor
+                    if 'gasto_editar_id' not in st.session_state:
+                        st.session_state.gasto_editar_id = None
                     
-                    with st.container():
-                        # Mostrar información del gasto
-                        col1, col2, col3, col4 = st.columns([3, 2, 1.5, 1.5])
-                        
-                        with col1:
-                            icono_tipo = "🔒" if gasto['tipo_monto'] == 'fijo' else "🔄"
-                            icono_grupo = "📦 " if grupo_nombre else ""
-                            st.write(f"**{icono_grupo}{icono_tipo} {gasto['concepto']}**")
-                            if grupo_nombre:
-                                st.caption(f"En grupo: {grupo_nombre} | {gasto['frecuencia']}")
-                            else:
-                                st.caption(f"{gasto['frecuencia']}")
-                        
-                        with col2:
-                            # Mostrar distribución
-                            tipo_dist = gasto.get('tipo_distribucion', '50/50')
-                            if tipo_dist == 'agrupado':
-                                st.write(f"💰 ${gasto['monto_total']:.2f}")
-                                st.caption(f"📦 Ver grupo")
-                            elif tipo_dist == '50/50':
-                                st.write(f"💰 ${gasto['monto_total']:.2f}")
-                                st.caption(f"⚖️ c/u: ${gasto['monto_total']/2:.2f}")
-                            elif tipo_dist == 'fijo_ricardo':
-                                monto_r = gasto.get('monto_fijo_ricardo', 0) or 0
-                                monto_w = max(0, gasto['monto_total'] - monto_r)
-                                st.write(f"💰 ${gasto['monto_total']:.2f}")
-                                st.caption(f"💰R ${monto_r:.2f} | W ${monto_w:.2f}")
-                            elif tipo_dist == 'fijo_wendy':
-                                monto_w = gasto.get('monto_fijo_wendy', 0) or 0
-                                monto_r = max(0, gasto['monto_total'] - monto_w)
-                                st.write(f"💰 ${gasto['monto_total']:.2f}")
-                                st.caption(f"R ${monto_r:.2f} | 💰W ${monto_w:.2f}")
-                            elif tipo_dist == 'personalizado':
-                                porc = gasto.get('porcentaje_ricardo', 50) or 50
-                                monto_r = gasto['monto_total'] * (porc / 100)
-                                monto_w = gasto['monto_total'] * ((100 - porc) / 100)
-                                st.write(f"💰 ${gasto['monto_total']:.2f}")
-                                st.caption(f"⚙️ R {porc:.0f}% | W {100-porc:.0f}%")
-                        
-                        with col3:
-                            tipo_texto = "Fijo" if gasto['tipo_monto'] == 'fijo' else "Variable"
-                            st.caption(f"Tipo: {tipo_texto}")
+                    # Grupo de cada gasto, en una sola consulta para toda la lista
+                    grupo_por_gasto = obtener_grupo_por_gasto(conn)
+                    
+                    for gasto in gastos_df.to_dict('records'):
+                        # Verificar si el gasto está en algún grupo
+                        grupo_nombre = grupo_por_gasto.get(gasto['id'])
                         
-                        with col4:
-                            col_btn1, col_btn2 = st.columns(2)
-                            with col_btn1:
-                                # No permitir editar si está en un grupo
+                        with st.container():
+                            # Mostrar información del gasto
+                            col1, col2, col3, col4 = st.columns([3, 2, 1.5, 1.5])
+                            
+                            with col1:
+                                icono_tipo = "🔒" if gasto['tipo_monto'] == 'fijo' else "🔄"
+                                icono_grupo = "📦 " if grupo_nombre else ""
+                                st.write(f"**{icono_grupo}{icono_tipo} {gasto['concepto']}**")
                                 if grupo_nombre:
-                                    st.button("✏️", key=f"edit_{gasto['id']}", disabled=True, help="No se puede editar: está en un grupo")
+                                    st.caption(f"En grupo: {grupo_nombre} | {gasto['frecuencia']}")
                                 else:
-                                    if st.button("✏️", key=f"edit_{gasto['id']}", help="Editar"):
-                                        st.session_state.gasto_editar_id = gasto['id']
-                                        st.rerun()
-                            with col_btn2:
-                                if st.button("🗑️", key=f"del_{gasto['id']}", help="Eliminar"):
-                                    if desactivar_gasto_mensual(conn, gasto['id']):
-                                        st.success("✅ Eliminado")
-                                        st.rerun()
-                        
-                        # Formulario de edición (solo si no está en grupo)
-                        if st.session_state.gasto_editar_id == gasto['id'] and not grupo_nombre:
-                            with st.expander("✏️ Editar Gasto", expanded=True):
-                                with st.form(f"form_editar_{gasto['id']}"):
-                                    st.write("**Editando:** " + gasto['concepto'])
-                                    
-                                    nuevo_concepto = st.text_input(
-                                        "Concepto",
-                                        value=gasto['concepto'],
-                                        key=f"concepto_edit_{gasto['id']}"
-                                    )
-                                    
-                                    col_edit1, col_edit2 = st.columns(2)
-                                    
-                                    with col_edit1:
-                                        nuevo_monto = st.number_input(
-                                            "Monto Base ($)",
-                                            min_value=0.0,
-                                            value=float(gasto['monto_total']),
-                                            step=0.01,
-                                            format="%.2f",
-                                            key=f"monto_edit_{gasto['id']}"
-                                        )
-                                    
-                                    with col_edit2:
-                                        nueva_frecuencia = st.selectbox(
-                                            "Frecuencia",
-                                            options=["Mensual", "Semanal", "Quincenal", "Anual"],
-                                            index=["Mensual", "Semanal", "Quincenal", "Anual"].index(gasto['frecuencia']),
-                                            key=f"frecuencia_edit_{gasto['id']}"
-                                        )
-                                    
-                                    nuevo_tipo = st.radio(
-                                        "Tipo de Monto",
-                                        options=["fijo", "variable"],
-                                        format_func=lambda x: "🔒 Fijo" if x == "fijo" else "🔄 Variable",
-                                        index=0 if gasto['tipo_monto'] == 'fijo' else 1,
-                                        horizontal=True,
-                                        key=f"tipo_edit_{gasto['id']}"
-                                    )
-                                    
-                                    st.markdown("---")
-                                    st.markdown("**Distribución:**")
-                                    
-                                    tipo_dist_actual = gasto.get('tipo_distribucion', '50/50')
-                                    opciones_dist = ["50/50", "fijo_ricardo", "fijo_wendy", "personalizado"]
-                                    idx_dist = opciones_dist.index(tipo_dist_actual) if tipo_dist_actual in opciones_dist else 0
-                                    
-                                    nuevo_tipo_dist = st.radio(
-                                        "Tipo distribución",
-                                        options=opciones_dist,
-                                        format_func=lambda x: {
-                                            "50/50": "⚖️ 50/50",
-                                            "fijo_ricardo": "💰R fijo",
-                                            "fijo_wendy": "💰W fijo",
-                                            "personalizado": "⚙️ Personalizado"
-                                        }[x],
-                                        index=idx_dist,
-                                        horizontal=True,
-                                        key=f"dist_edit_{gasto['id']}"
-                                    )
-                                    
-                                    nuevo_monto_fijo_r = None
-                                    nuevo_monto_fijo_w = None
-                                    nuevo_porc_r = 50.0
-                                    
-                                    if nuevo_tipo_dist == "fijo_ricardo":
-                                        val_actual = float(gasto.get('monto_fijo_ricardo', 0)) if gasto.get('monto_fijo_ricardo') else 0.0
-                                        nuevo_monto_fijo_r = st.number_input(
-                                            "Monto fijo Ricardo ($)",
-                                            min_value=0.0,
-                                            value=val_actual,
-                                            step=0.01,
-                                            format="%.2f",
-                                            key=f"monto_r_edit_{gasto['id']}"
-                                        )
-                                    elif nuevo_tipo_dist == "fijo_wendy":
-                                        val_actual = float(gasto.get('monto_fijo_wendy', 0)) if gasto.get('monto_fijo_wendy') else 0.0
-                                        nuevo_monto_fijo_w = st.number_input(
-                                            "Monto fijo Wendy ($)",
-                                            min_value=0.0,
-                                            value=val_actual,
-                                            step=0.01,
-                                            format="%.2f",
-                                            key=f"monto_w_edit_{gasto['id']}"
+                                    st.caption(f"{gasto['frecuencia']}")
+                            
+                            with col2:
+                                # Mostrar distribución
+                                plantilla = TEXTOS_DISTRIBUCION_RESUMEN.get(gasto.get('tipo_distribucion', '50/50'))
+                                if plantilla:
+                                    monto_r, monto_w = calcular_distribucion_pago(gasto, gasto['monto_total'])
+                                    st.write(f"💰 ${gasto['monto_total']:.2f}")
+                                    st.caption(describir_distribucion(plantilla, gasto, monto_r, monto_w))
+                            
+                            with col3:
+                                tipo_texto = "Fijo" if gasto['tipo_monto'] == 'fijo' else "Variable"
+                                st.caption(f"Tipo: {tipo_texto}")
+                            
+                            with col4:
+                                col_btn1, col_btn2 = st.columns(2)
+                                with col_btn1:
+                                    # No permitir editar si está en un grupo
+                                    if grupo_nombre:
+                                        st.caption("🔒", help="No se puede editar: está en un grupo")
+                                    else:
+                                        if st.button("✏️", key=f"edit_{gasto['id']}", help="Editar"):
+                                            st.session_state.gasto_editar_id = gasto['id']
+                                            st.rerun()
+                                with col_btn2:
+                                    if st.button("🗑️", key=f"del_{gasto['id']}", help="Eliminar"):
+                                        if desactivar_gasto_mensual(conn, gasto['id']):
+                                            st.success("✅ Eliminado")
+                                            st.rerun()
+                            
+                            # Formulario de edición (solo si no está en grupo)
+                            if st.session_state.gasto_editar_id == gasto['id'] and not grupo_nombre:
+                                with st.expander("✏️ Editar Gasto", expanded=True):
+                                    with st.form(f"form_editar_{gasto['id']}"):
+                                        st.write("**Editando:** " + gasto['concepto'])
+                                        
+                                        nuevo_concepto = st.text_input(
+                                            "Concepto",
+                                            value=gasto['concepto'],
+                                            key=f"concepto_edit_{gasto['id']}"
                                         )
-                                    elif nuevo_tipo_dist == "personalizado":
-                                        val_actual = float(gasto.get('porcentaje_ricardo', 50)) if gasto.get('porcentaje_ricardo') else 50.0
-                                        nuevo_porc_r = st.slider(
-                                            "% Ricardo",
-                                            0.0, 100.0, val_actual, 1.0,
-                                            key=f"porc_r_edit_{gasto['id']}"
+                                        
+                                        col_edit1, col_edit2 = st.columns(2)
+                                        
+                                        with col_edit1:
+                                            nuevo_monto = st.number_input(
+                                                "Monto Base ($)",
+                                                min_value=0.0,
+                                                value=float(gasto['monto_total']),
+                                                step=0.01,
+                                                format="%.2f",
+                                                key=f"monto_edit_{gasto['id']}"
+                                            )
+                                        
+                                        with col_edit2:
+                                            nueva_frecuencia = st.selectbox(
+                                                "Frecuencia",
+                                                options=["Mensual", "Semanal", "Quincenal", "Anual"],
+                                                index=["Mensual", "Semanal", "Quincenal", "Anual"].index(gasto['frecuencia']),
+                                                key=f"frecuencia_edit_{gasto['id']}"
+                                            )
+                                        
+                                        nuevo_tipo = st.radio(
+                                            "Tipo de Monto",
+                                            options=["fijo", "variable"],
+                                            format_func=lambda x: "🔒 Fijo" if x == "fijo" else "🔄 Variable",
+                                            index=0 if gasto['tipo_monto'] == 'fijo' else 1,
+                                            horizontal=True,
+                                            key=f"tipo_edit_{gasto['id']}"
                                         )
-                                    
-                                    col_btn_edit1, col_btn_edit2 = st.columns(2)
-                                    
-                                    with col_btn_edit1:
-                                        submit_editar = st.form_submit_button("💾 Guardar", type="primary", use_container_width=True)
-                                    
-                                    with col_btn_edit2:
-                                        cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
-                                    
-                                    if submit_editar:
-                                        if actualizar_gasto_mensual(conn, gasto['id'], nuevo_concepto, nuevo_monto, 
-                                                                   nueva_frecuencia, nuevo_tipo, nuevo_tipo_dist,
-                                                                   nuevo_monto_fijo_r, nuevo_monto_fijo_w,
-                                                                   nuevo_porc_r, None):
-                                            st.success("✅ Actualizado")
+                                        
+                                        st.markdown("---")
+                                        st.markdown("**Distribución:**")
+                                        
+                                        nuevo_tipo_dist, nuevo_monto_fijo_r, nuevo_monto_fijo_w, nuevo_porc_r = \
+                                            mostrar_campos_distribucion(f"edit_{gasto['id']}", nuevo_monto, gasto)
+                                        
+                                        col_btn_edit1, col_btn_edit2 = st.columns(2)
+                                        
+                                        with col_btn_edit1:
+                                            submit_editar = st.form_submit_button("💾 Guardar", type="primary", use_container_width=True)
+                                        
+                                        with col_btn_edit2:
+                                            cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
+                                        
+                                        if submit_editar:
+                                            if actualizar_gasto_mensual(conn, gasto['id'], nuevo_concepto, nuevo_monto, 
+                                                                       nueva_frecuencia, nuevo_tipo, nuevo_tipo_dist,
+                                                                       nuevo_monto_fijo_r, nuevo_monto_fijo_w,
+                                                                       nuevo_porc_r, None):
+                                                st.success("✅ Actualizado")
+                                                st.session_state.gasto_editar_id = None
+                                                st.rerun()
+                                        
+                                        if cancelar:
                                             st.session_state.gasto_editar_id = None
                                             st.rerun()
-                                    
-                                    if cancelar:
-                                        st.session_state.gasto_editar_id = None
-                                        st.rerun()
-                        
-                        st.markdown("---")
-            else:
-                st.info("No hay gastos configurados. Agrega uno en 'Agregar Gasto'.")
-        
-        # ========== SUBTAB 3: GRUPOS DE DISTRIBUCIÓN (NUEVO) ==========
-        with subtab3:
-            st.subheader("📦 Grupos de Distribución")
-            st.info("💡 Aquí puedes agrupar varios gastos para que una persona pague un monto fijo por todos.")
-            
-            # Obtener grupos existentes
-            grupos = obtener_grupos_distribucion(conn)
-            
-            if grupos:
-                st.markdown("### Grupos Activos")
-                
-                for grupo in grupos:
-                    with st.expander(f"📦 {grupo['nombre']}", expanded=False):
-                        st.write(f"**Descripción:** {grupo['descripcion'] or 'Sin descripción'}")
-                        
-                        quien_paga = grupo['quien_paga_fijo']
-                        monto_fijo = grupo['monto_fijo_ricardo'] if quien_paga == 'Ricardo' else grupo['monto_fijo_wendy']
-                        
-                        st.write(f"**💰 {quien_paga} paga:** ${monto_fijo:.2f} fijo")
-                        
-                        # Calcular total del grupo
-                        total_grupo = sum(g[2] for g in grupo['gastos'])
-                        monto_otro = max(0, total_grupo - monto_fijo)
-                        otro = "Wendy" if quien_paga == "Ricardo" else "Ricardo"
-                        
-                        st.write(f"**{otro} paga:** ${monto_otro:.2f} (diferencia)")
-                        st.write(f"**Total del grupo:** ${total_grupo:.2f}")
-                        
-                        st.markdown("**Gastos incluidos:**")
-                        for gasto_id, concepto, monto in grupo['gastos']:
-                            st.caption(f"  • {concepto}: ${monto:.2f}")
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if st.button("✏️ Editar", key=f"edit_grupo_{grupo['id']}"):
-                                st.session_state[f"editando_grupo_{grupo['id']}"] = True
-                                st.rerun()
-                        with col2:
-                            if st.button("🗑️ Eliminar", key=f"del_grupo_{grupo['id']}"):
-                                if eliminar_grupo_distribucion(conn, grupo['id']):
-                                    st.success("✅ Grupo eliminado. Los gastos vuelven a distribución individual.")
-                                    st.rerun()
-                
-                st.markdown("---")
-            
-            # Formulario para crear nuevo grupo
-            st.markdown("### ➕ Crear Nuevo Grupo")
+                            
+                            st.markdown("---")
+                else:
+                    st.info("No hay gastos configurados. Agrega uno en 'Agregar Gasto'.")
             
-            with st.form("form_nuevo_grupo"):
-                nombre_grupo = st.text_input(
-                    "Nombre del Grupo",
-                    placeholder="Ej: Servicios Básicos, Alimentación",
-                    help="Nombre que identifica este grupo"
-                )
+            # ========== SUBTAB 3: GRUPOS DE DISTRIBUCIÓN (NUEVO) ==========
+            with subtab3:
+                st.subheader("📦 Grupos de Distribución")
+                st.info("💡 Aquí puedes agrupar varios gastos para que una persona pague un monto fijo por todos.")
                 
-                descripcion_grupo = st.text_area(
-                    "Descripción (opcional)",
-                    placeholder="Ej: Servicios de luz, agua y gas del hogar",
-                    max_chars=200
-                )
+                # Obtener grupos existentes
+                grupos = obtener_grupos_distribucion(conn)
                 
-                st.markdown("### 💰 Distribución del Grupo")
+                if grupos:
+                    st.markdown("### Grupos Activos")
+                    
+                    for grupo in grupos:
+                        with st.expander(f"📦 {grupo['nombre']}", expanded=False):
+                            st.write(f"**Descripción:** {grupo['descripcion'] or 'Sin descripción'}")
+                            
+                            quien_paga = grupo['quien_paga_fijo']
+                            monto_fijo = grupo['monto_fijo_ricardo'] if quien_paga == 'Ricardo' else grupo['monto_fijo_wendy']
+                            
+                            st.write(f"**💰 {quien_paga} paga:** ${monto_fijo:.2f} fijo")
+                            
+                            # Calcular total del grupo
+                            total_grupo = grupo['total_grupo']
+                            monto_otro = max(0, total_grupo - monto_fijo)
+                            otro = "Wendy" if quien_paga == "Ricardo" else "Ricardo"
+                            
+                            st.write(f"**{otro} paga:** ${monto_otro:.2f} (diferencia)")
+                            st.write(f"**Total del grupo:** ${total_grupo:.2f}")
+                            
+                            st.markdown("**Gastos incluidos:**")
+                            for gasto_id, concepto, monto in grupo['gastos']:
+                                st.caption(f"  • {concepto}: ${monto:.2f}")
+                            
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                if st.button("✏️ Editar", key=f"edit_grupo_{grupo['id']}"):
+                                    st.session_state[f"editando_grupo_{grupo['id']}"] = True
+                                    st.rerun()
+                            with col2:
+                                if st.button("🗑️ Eliminar", key=f"del_grupo_{grupo['id']}"):
+                                    if eliminar_grupo_distribucion(conn, grupo['id']):
+                                        st.success("✅ Grupo eliminado. Los gastos vuelven a distribución individual.")
+                                        st.rerun()
+                    
+                    st.markdown("---")
                 
-                col1, col2 = st.columns(2)
+                # Formulario para crear nuevo grupo
+                st.markdown("### ➕ Crear Nuevo Grupo")
                 
-                with col1:
-                    quien_paga_fijo = st.radio(
-                        "¿Quién paga monto fijo?",
-                        options=["Ricardo", "Wendy"],
-                        horizontal=True
+                with st.form("form_nuevo_grupo"):
+                    nombre_grupo = st.text_input(
+                        "Nombre del Grupo",
+                        placeholder="Ej: Servicios Básicos, Alimentación",
+                        help="Nombre que identifica este grupo"
                     )
-                
-                with col2:
-                    monto_fijo_grupo = st.number_input(
-                        f"Monto fijo que paga {quien_paga_fijo} ($)",
-                        min_value=0.0,
-                        value=100.0,
-                        step=0.01,
-                        format="%.2f"
+                    
+                    descripcion_grupo = st.text_area(
+                        "Descripción (opcional)",
+                        placeholder="Ej: Servicios de luz, agua y gas del hogar",
+                        max_chars=200
                     )
-                
-                st.markdown("### 📋 Selecciona Gastos")
-                st.caption("Elige los gastos que deseas agrupar")
-                
-                # Obtener gastos disponibles (no agrupados)
-                gastos_disponibles = gastos_df[
-                    (gastos_df['tipo_distribucion'] != 'agrupado') & 
-                    (gastos_df['activo'] == 1)
-                ].copy()
-                
-                if gastos_disponibles.empty:
-                    st.warning("⚠️ No hay gastos disponibles para agrupar. Crea gastos primero en 'Agregar Gasto'.")
-                    gastos_seleccionados = []
-                else:
-                    gastos_seleccionados = []
-                    total_seleccionado = 0
                     
-                    for _, gasto in gastos_disponibles.iterrows():
-                        col_check, col_info = st.columns([1, 4])
-                        
-                        with col_check:
-                            if st.checkbox(
-                                "",
-                                key=f"sel_gasto_{gasto['id']}",
-                                label_visibility="collapsed"
-                            ):
-                                gastos_seleccionados.append(gasto['id'])
-                                total_seleccionado += gasto['monto_total']
-                        
-                        with col_info:
-                            st.write(f"**{gasto['concepto']}** - ${gasto['monto_total']:.2f}")
+                    st.markdown("### 💰 Distribución del Grupo")
                     
-                    if gastos_seleccionados:
-                        st.info(f"💰 **Total de gastos seleccionados:** ${total_seleccionado:.2f}")
-                        st.success(f"✅ {quien_paga_fijo}: ${monto_fijo_grupo:.2f} | {('Wendy' if quien_paga_fijo == 'Ricardo' else 'Ricardo')}: ${max(0, total_seleccionado - monto_fijo_grupo):.2f}")
-                
-                submit_grupo = st.form_submit_button("💾 Crear Grupo de Distribución", type="primary", use_container_width=True)
-                
-                if submit_grupo:
-                    if not nombre_grupo:
-                        st.error("❌ Ingresa un nombre para el grupo")
-                    elif len(gastos_seleccionados) < 2:
-                        st.error("❌ Selecciona al menos 2 gastos para crear un grupo")
-                    else:
-                        grupo_id = crear_grupo_distribucion(
-                            conn, 
-                            nombre_grupo, 
-                            descripcion_grupo,
-                            quien_paga_fijo,
-                            monto_fijo_grupo,
-                            gastos_seleccionados
-                        )
-                        if grupo_id:
-                            st.success(f"✅ Grupo '{nombre_grupo}' creado correctamente")
-                            st.info(f"Los {len(gastos_seleccionados)} gastos ahora están agrupados con distribución fija.")
-                            st.rerun()
-                        else:
-                            st.error("❌ Error al crear el grupo")
-    
-    # ========== TAB 4: ELIMINAR PAGOS ==========
-    with tab4:
-        st.header(f"🗑️ Eliminar Pagos - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        st.warning("⚠️ Esta sección te permite corregir errores eliminando pagos que se registraron por equivocación.")
-        
-        # Obtener pagos del mes
-        pagos_df = obtener_pagos_del_mes(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not pagos_df.empty:
-            st.subheader(f"Pagos registrados en {meses[mes_seleccionado]} {anio_seleccionado}")
-            
-            # Mostrar cada pago con opción de eliminar
-            for idx, pago in pagos_df.iterrows():
-                with st.container():
-                    col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
+                    col1, col2 = st.columns(2)
                     
                     with col1:
-                        # Mostrar el concepto y si es semanal, el número de semana
-                        if pago['frecuencia'] == 'Semanal' and pago['semana'] is not None:
-                            rango = obtener_rango_semana(mes_seleccionado, anio_seleccionado, int(pago['semana']))
-                            st.write(f"**{pago['concepto']}** 📅 Semana {int(pago['semana'])} ({rango[0]}-{rango[1]})")
-                        else:
-                            st.write(f"**{pago['concepto']}**")
+                        quien_paga_fijo = st.radio(
+                            "¿Quién paga monto fijo?",
+                            options=["Ricardo", "Wendy"],
+                            horizontal=True
+                        )
                     
                     with col2:
-                        st.write(f"💵 ${pago['monto_pagado']:.2f}")
+                        monto_fijo_grupo = st.number_input(
+                            f"Monto fijo que paga {quien_paga_fijo} ($)",
+                            min_value=0.0,
+                            value=100.0,
+                            step=0.01,
+                            format="%.2f"
+                        )
                     
-                    with col3:
-                        icono = "👨" if pago['quien_pago'] == 'Ricardo' else "👩"
-                        st.write(f"{icono} {pago['quien_pago']}")
+                    st.markdown("### 📋 Selecciona Gastos")
+                    st.caption("Elige los gastos que deseas agrupar")
                     
-                    with col4:
-                        st.caption(pago['fecha_pago'])
+                    # Obtener gastos disponibles (no agrupados)
+                    gastos_disponibles = gastos_df[
+                        (gastos_df['tipo_distribucion'] != 'agrupado') & 
+                        (gastos_df['activo'] == 1)
+                    ]
                     
-                    with col5:
-                        if st.button("🗑️", key=f"eliminar_pago_{pago['id']}", help="Eliminar este pago"):
-                            if eliminar_pago(conn, pago['id']):
-                                st.success("✅ Pago eliminado")
-                                st.rerun()
+                    if gastos_disponibles.empty:
+                        st.warning("⚠️ No hay gastos disponibles para agrupar. Crea gastos primero en 'Agregar Gasto'.")
+                        gastos_seleccionados = []
+                    else:
+                        # Una sola tabla editable con una casilla por gasto, en lugar
+                        # de un checkbox y una fila de columnas por gasto
+                        seleccion_df = st.data_editor(
+                            gastos_disponibles[['id', 'concepto', 'monto_total']].assign(seleccionar=False),
+                            column_config={
+                                "seleccionar": st.column_config.CheckboxColumn("Agrupar"),
+                                "concepto": st.column_config.TextColumn("Gasto"),
+                                "monto_total": st.column_config.NumberColumn("Monto", format="$%.2f")
+                            },
+                            column_order=["seleccionar", "concepto", "monto_total"],
+                            disabled=["id", "concepto", "monto_total"],
+                            hide_index=True,
+                            use_container_width=True,
+                            key="seleccion_gastos_grupo"
+                        )
+                        
+                        seleccionados = seleccion_df[seleccion_df['seleccionar']]
+                        gastos_seleccionados = seleccionados['id'].tolist()
+                        total_seleccionado = seleccionados['monto_total'].sum()
+                        
+                        if gastos_seleccionados:
+                            st.info(f"💰 **Total de gastos seleccionados:** ${total_seleccionado:.2f}")
+                            st.success(f"✅ {quien_paga_fijo}: ${monto_fijo_grupo:.2f} | {('Wendy' if quien_paga_fijo == 'Ricardo' else 'Ricardo')}: ${max(0, total_seleccionado - monto_fijo_grupo):.2f}")
                     
-                    st.markdown("---")
+                    submit_grupo = st.form_submit_button("💾 Crear Grupo de Distribución", type="primary", use_container_width=True)
+                    
+                    if submit_grupo:
+                        if not nombre_grupo:
+                            st.error("❌ Ingresa un nombre para el grupo")
+                        elif len(gastos_seleccionados) < 2:
+                            st.error("❌ Selecciona al menos 2 gastos para crear un grupo")
+                        else:
+                            grupo_id = crear_grupo_distribucion(
+                                conn, 
+                                nombre_grupo, 
+                                descripcion_grupo,
+                                quien_paga_fijo,
+                                monto_fijo_grupo,
+                                gastos_seleccionados
+                            )
+                            if grupo_id:
+                                st.success(f"✅ Grupo '{nombre_grupo}' creado correctamente")
+                                st.info(f"Los {len(gastos_seleccionados)} gastos ahora están agrupados con distribución fija.")
+                                st.rerun()
+                            else:
+                                st.error("❌ Error al crear el grupo")
+        
+    # ========== TAB 4: ELIMINAR PAGOS ==========
+    with tab4:
+        if tab4.open:
+            st.header(f"🗑️ Eliminar Pagos - {periodo}")
             
-            # Opción de limpiar todos los pagos del mes
-            st.markdown("---")
-            st.subheader("⚠️ Zona Peligrosa")
+            st.warning("⚠️ Esta sección te permite corregir errores eliminando pagos que se registraron por equivocación.")
             
-            col_danger1, col_danger2 = st.columns([3, 1])
+            # Resultado de "Eliminar Todos", confirmado en el diálogo de la ejecución anterior
+            if 'pagos_eliminados_del_mes' in st.session_state:
+                st.success(f"✅ Se eliminaron {st.session_state.pop('pagos_eliminados_del_mes')} pagos")
             
-            with col_danger1:
-                st.error(f"**Eliminar TODOS los pagos de {meses[mes_seleccionado]} {anio_seleccionado}**")
-                st.caption("Esta acción no se puede deshacer. Se eliminarán todos los pagos de este mes.")
+            # Obtener pagos del mes. En una ejecución completa la lista ya viene
+            # sin los pagos eliminados, así que se olvidan las marcas de los
+            # fragmentos (un id borrado puede reutilizarse en un pago nuevo)
+            pagos_df = obtener_pagos_del_mes(conn, mes_seleccionado, anio_seleccionado)
+            st.session_state.pop('pagos_eliminados', None)
             
-            with col_danger2:
-                if st.button("🗑️ Eliminar Todos", type="primary", key="eliminar_todos"):
-                    # Confirmación adicional
-                    if 'confirmar_eliminar_todos' not in st.session_state:
-                        st.session_state.confirmar_eliminar_todos = True
-                        st.warning("⚠️ Haz clic nuevamente para confirmar")
-                    else:
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            DELETE FROM pagos
-                            WHERE mes = ? AND anio = ?
-                        ''', (mes_seleccionado, anio_seleccionado))
-                        conn.commit()
-                        eliminados = cursor.rowcount
-                        st.success(f"✅ Se eliminaron {eliminados} pagos")
-                        del st.session_state.confirmar_eliminar_todos
-                        st.rerun()
-        else:
-            st.info("No hay pagos registrados en este mes para eliminar.")
-    
+            if not pagos_df.empty:
+                st.subheader(f"Pagos registrados en {periodo}")
+                
+                # Mostrar cada pago con opción de eliminar
+                for pago in pagos_df.to_dict('records'):
+                    mostrar_fila_pago(conn, mes_seleccionado, anio_seleccionado, pago)
+                
+                # Opción de limpiar todos los pagos del mes
+                st.markdown("---")
+                st.subheader("⚠️ Zona Peligrosa")
+                
+                col_danger1, col_danger2 = st.columns([3, 1])
+                
+                with col_danger1:
+                    st.error(f"**Eliminar TODOS los pagos de {periodo}**")
+                    st.caption("Esta acción no se puede deshacer. Se eliminarán todos los pagos de este mes.")
+                
+                with col_danger2:
+                    if st.button("🗑️ Eliminar Todos", type="primary", key="eliminar_todos"):
+                        confirmar_eliminar_pagos_del_mes(conn, mes_seleccionado, anio_seleccionado)
+            else:
+                st.info("No hay pagos registrados en este mes para eliminar.")
+        
     # ========== TAB 5: REPORTES PDF ==========
     with tab5:
-        st.header(f"📄 Generar Reportes PDF - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        st.info("📋 Genera reportes detallados en formato PDF para imprimir o compartir")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        # Reporte General
-        with col1:
-            st.subheader("📊 Reporte General")
-            st.write("Incluye:")
-            st.write("✅ Resumen financiero completo")
-            st.write("✅ Estado de todos los gastos")
-            st.write("✅ Pagos de Ricardo y Wendy")
-            st.write("✅ Historial completo del mes")
-            
-            if st.button("📥 Descargar Reporte General", key="btn_general", type="primary"):
-                with st.spinner("Generando PDF..."):
-                    pdf_buffer = generar_pdf_reporte_general(conn, mes_seleccionado, anio_seleccionado)
-                    
-                    st.download_button(
-                        label="💾 Descargar PDF General",
-                        data=pdf_buffer,
-                        file_name=f"Reporte_General_{meses[mes_seleccionado]}_{anio_seleccionado}.pdf",
-                        mime="application/pdf",
-                        key="download_general"
-                    )
-                    st.success("✅ PDF generado correctamente")
-        
-        # Reporte Ricardo
-        with col2:
-            st.subheader("👨 Reporte Ricardo")
-            st.write("Incluye:")
-            st.write("✅ Resumen personal de Ricardo")
-            st.write("✅ Cuánto debe pagar")
-            st.write("✅ Qué ha pagado")
-            st.write("✅ Qué le falta pagar")
-            
-            if st.button("📥 Descargar Reporte Ricardo", key="btn_ricardo", type="primary"):
-                with st.spinner("Generando PDF..."):
-                    pdf_buffer = generar_pdf_reporte_individual(conn, mes_seleccionado, anio_seleccionado, "Ricardo")
-                    
-                    st.download_button(
-                        label="💾 Descargar PDF Ricardo",
-                        data=pdf_buffer,
-                        file_name=f"Reporte_Ricardo_{meses[mes_seleccionado]}_{anio_seleccionado}.pdf",
-                        mime="application/pdf",
-                        key="download_ricardo"
-                    )
-                    st.success("✅ PDF generado correctamente")
-        
-        # Reporte Wendy
-        with col3:
-            st.subheader("👩 Reporte Wendy")
-            st.write("Incluye:")
-            st.write("✅ Resumen personal de Wendy")
-            st.write("✅ Cuánto debe pagar")
-            st.write("✅ Qué ha pagado")
-            st.write("✅ Qué le falta pagar")
-            
-            if st.button("📥 Descargar Reporte Wendy", key="btn_wendy", type="primary"):
-                with st.spinner("Generando PDF..."):
-                    pdf_buffer = generar_pdf_reporte_individual(conn, mes_seleccionado, anio_seleccionado, "Wendy")
-                    
-                    st.download_button(
-                        label="💾 Descargar PDF Wendy",
-                        data=pdf_buffer,
-                        file_name=f"Reporte_Wendy_{meses[mes_seleccionado]}_{anio_seleccionado}.pdf",
-                        mime="application/pdf",
-                        key="download_wendy"
-                    )
-                    st.success("✅ PDF generado correctamente")
-        
-        st.markdown("---")
-        
-        # Vista previa de contenido
-        st.subheader("👁️ Vista Previa del Contenido")
-        
-        tabla_df = calcular_tabla_mensual(conn, mes_seleccionado, anio_seleccionado)
-        saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
-        
-        # Obtener totales específicos de cada persona
-        total_debe_ricardo = saldo.get('total_debe_ricardo', saldo['total_debe_cada_uno'])
-        total_debe_wendy = saldo.get('total_debe_wendy', saldo['total_debe_cada_uno'])
-        total_gastos = total_debe_ricardo + total_debe_wendy
-        
-        col_prev1, col_prev2 = st.columns(2)
-        
-        with col_prev1:
-            st.write("**👨 Ricardo:**")
-            st.write(f"- Debe pagar: ${total_debe_ricardo:.2f}")
-            st.write(f"- Ya pagó: ${saldo['pagado_ricardo']:.2f}")
-            st.write(f"- Pendiente: ${saldo['saldo_ricardo']:.2f}")
-            ricardo_prog = (saldo['pagado_ricardo'] / total_debe_ricardo * 100) if total_debe_ricardo > 0 else 0
-            st.write(f"- Progreso: {ricardo_prog:.0f}%")
-        
-        with col_prev2:
-            st.write("**👩 Wendy:**")
-            st.write(f"- Debe pagar: ${total_debe_wendy:.2f}")
-            st.write(f"- Ya pagó: ${saldo['pagado_wendy']:.2f}")
-            st.write(f"- Pendiente: ${saldo['saldo_wendy']:.2f}")
-            wendy_prog = (saldo['pagado_wendy'] / total_debe_wendy * 100) if total_debe_wendy > 0 else 0
-            st.write(f"- Progreso: {wendy_prog:.0f}%")
+        if tab5.open:
+            st.header(f"📄 Generar Reportes PDF - {periodo}")
+            
+            st.info("📋 Genera reportes detallados en formato PDF para imprimir o compartir")
+            # Los PDF se generan (y cachean) recién al pulsar cada botón de descarga,
+            # sin el paso previo de "generar" ni una reejecución de la app
+            
+            col1, col2, col3 = st.columns(3)
+            
+            # Reporte General
+            with col1:
+                st.subheader("📊 Reporte General")
+                st.write("Incluye:")
+                st.write("✅ Resumen financiero completo")
+                st.write("✅ Estado de todos los gastos")
+                st.write("✅ Pagos de Ricardo y Wendy")
+                st.write("✅ Historial completo del mes")
+                
+                st.download_button(
+                    label="📥 Descargar Reporte General",
+                    data=partial(obtener_pdf_reporte, conn, mes_seleccionado, anio_seleccionado),
+                    file_name=f"Reporte_General_{nombre_mes}_{anio_seleccionado}.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                    type="primary",
+                    key="download_general"
+                )
+            
+            # Reporte Ricardo
+            with col2:
+                st.subheader("👨 Reporte Ricardo")
+                st.write("Incluye:")
+                st.write("✅ Resumen personal de Ricardo")
+                st.write("✅ Cuánto debe pagar")
+                st.write("✅ Qué ha pagado")
+                st.write("✅ Qué le falta pagar")
+                
+                st.download_button(
+                    label="📥 Descargar Reporte Ricardo",
+                    data=partial(obtener_pdf_reporte, conn, mes_seleccionado, anio_seleccionado, "Ricardo"),
+                    file_name=f"Reporte_Ricardo_{nombre_mes}_{anio_seleccionado}.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                    type="primary",
+                    key="download_ricardo"
+                )
+            
+            # Reporte Wendy
+            with col3:
+                st.subheader("👩 Reporte Wendy")
+                st.write("Incluye:")
+                st.write("✅ Resumen personal de Wendy")
+                st.write("✅ Cuánto debe pagar")
+                st.write("✅ Qué ha pagado")
+                st.write("✅ Qué le falta pagar")
+                
+                st.download_button(
+                    label="📥 Descargar Reporte Wendy",
+                    data=partial(obtener_pdf_reporte, conn, mes_seleccionado, anio_seleccionado, "Wendy"),
+                    file_name=f"Reporte_Wendy_{nombre_mes}_{anio_seleccionado}.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                    type="primary",
+                    key="download_wendy"
+                )
+            
+            st.markdown("---")
+            
+            # Vista previa de contenido
+            st.subheader("👁️ Vista Previa del Contenido")
+            
+            tabla_df = tabla_mes
+            saldo = saldo_mes
+            
+            # Obtener totales específicos de cada persona
+            total_debe_ricardo = saldo.get('total_debe_ricardo', saldo['total_debe_cada_uno'])
+            total_debe_wendy = saldo.get('total_debe_wendy', saldo['total_debe_cada_uno'])
+            total_gastos = total_debe_ricardo + total_debe_wendy
+            
+            col_prev1, col_prev2 = st.columns(2)
+            
+            with col_prev1:
+                st.write("**👨 Ricardo:**")
+                st.write(f"- Debe pagar: ${total_debe_ricardo:.2f}")
+                st.write(f"- Ya pagó: ${saldo['pagado_ricardo']:.2f}")
+                st.write(f"- Pendiente: ${saldo['saldo_ricardo']:.2f}")
+                ricardo_prog = (saldo['pagado_ricardo'] / total_debe_ricardo * 100) if total_debe_ricardo > 0 else 0
+                st.write(f"- Progreso: {ricardo_prog:.0f}%")
+            
+            with col_prev2:
+                st.write("**👩 Wendy:**")
+                st.write(f"- Debe pagar: ${total_debe_wendy:.2f}")
+                st.write(f"- Ya pagó: ${saldo['pagado_wendy']:.2f}")
+                st.write(f"- Pendiente: ${saldo['saldo_wendy']:.2f}")
+                wendy_prog = (saldo['pagado_wendy'] / total_debe_wendy * 100) if total_debe_wendy > 0 else 0
+                st.write(f"- Progreso: {wendy_prog:.0f}%")
+            
+            st.markdown("---")
+            st.write(f"**💰 Total Gastos del Mes:** ${total_gastos:.2f}")
+            st.write(f"**📊 Estado:** {saldo['mensaje']}")
+            
+            if not tabla_df.empty:
+                st.write("**Detalle de Gastos:**")
+                st.dataframe(
+                    tabla_df.drop('id', axis=1), 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config={
+                        "Concepto": st.column_config.TextColumn(
+                            "Concepto",
+                            width="medium"
+                        ),
+                        "Monto Total": st.column_config.NumberColumn(
+                            "Monto Total",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Frecuencia": st.column_config.TextColumn(
+                            "Frecuencia",
+                            width="small"
+                        ),
+                        "Asignado Ricardo": st.column_config.NumberColumn(
+                            "Asignado Ricardo",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Asignado Wendy": st.column_config.NumberColumn(
+                            "Asignado Wendy",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Ricardo Pagó": st.column_config.TextColumn(
+                            "Ricardo Pagó",
+                            width="small"
+                        ),
+                        "Wendy Pagó": st.column_config.TextColumn(
+                            "Wendy Pagó",
+                            width="small"
+                        )
+                    }
+                )
         
-        st.markdown("---")
-        st.write(f"**💰 Total Gastos del Mes:** ${total_gastos:.2f}")
-        st.write(f"**📊 Estado:** {saldo['mensaje']}")
-        
-        if not tabla_df.empty:
-            st.write("**Detalle de Gastos:**")
-            st.dataframe(
-                tabla_df.drop('id', axis=1), 
-                use_container_width=True, 
-                hide_index=True,
-                column_config={
-                    "Concepto": st.column_config.TextColumn(
-                        "Concepto",
-                        width="medium"
-                    ),
-                    "Monto Total": st.column_config.NumberColumn(
-                        "Monto Total",
-                        format="$%.2f",
-                        width="small"
-                    ),
-                    "Frecuencia": st.column_config.TextColumn(
-                        "Frecuencia",
-                        width="small"
-                    ),
-                    "Asignado Ricardo": st.column_config.NumberColumn(
-                        "Asignado Ricardo",
-                        format="$%.2f",
-                        width="small"
-                    ),
-                    "Asignado Wendy": st.column_config.NumberColumn(
-                        "Asignado Wendy",
-                        format="$%.2f",
-                        width="small"
-                    ),
-                    "Ricardo Pagó": st.column_config.TextColumn(
-                        "Ricardo Pagó",
-                        width="small"
-                    ),
-                    "Wendy Pagó": st.column_config.TextColumn(
-                        "Wendy Pagó",
-                        width="small"
-                    )
-                }
-            )
-    
     # ========== TAB 6: ESTADÍSTICAS ==========
     with tab6:
-        st.header("� Estadísticas y Gráficos")
-        
-        # Gráfico de gastos en el tiempo
-        st.subheader("📊 Gastos en el Tiempo")
-        fig_tiempo = crear_grafico_gastos_tiempo(conn)
-        
-        if fig_tiempo:
-            st.plotly_chart(fig_tiempo, use_container_width=True)
-        else:
-            st.info("No hay datos suficientes para mostrar el gráfico de tiempo.")
-        
-        st.markdown("---")
-        
-        # Gráfico de distribución del mes actual
-        st.subheader(f"🥧 Distribución de Gastos - {meses[mes_seleccionado]} {anio_seleccionado}")
-        fig_distribucion = crear_grafico_distribucion(conn, mes_seleccionado, anio_seleccionado)
-        
-        if fig_distribucion:
-            st.plotly_chart(fig_distribucion, use_container_width=True)
-        else:
-            st.info("No hay pagos registrados para este mes.")
-        
-        st.markdown("---")
+        if tab6.open:
+            st.header("� Estadísticas y Gráficos")
+            
+            # Gráfico de gastos en el tiempo
+            st.subheader("📊 Gastos en el Tiempo")
+            fig_tiempo = crear_grafico_gastos_tiempo(conn)
+            
+            if fig_tiempo:
+                st.plotly_chart(fig_tiempo, use_container_width=True)
+            else:
+                st.info("No hay datos suficientes para mostrar el gráfico de tiempo.")
+            
+            st.markdown("---")
+            
+            # Gráfico de distribución del mes actual
+            st.subheader(f"🥧 Distribución de Gastos - {periodo}")
+            fig_distribucion = crear_grafico_distribucion(conn, mes_seleccionado, anio_seleccionado)
+            
+            if fig_distribucion:
+                st.plotly_chart(fig_distribucion, use_container_width=True)
+            else:
+                st.info("No hay pagos registrados para este mes.")
+            
+            st.markdown("---")
+            
+            # Tabla de historial de pagos
+            st.subheader("📋 Historial de Pagos")
+            pagos_df = obtener_pagos_del_mes(conn, mes_seleccionado, anio_seleccionado)
+            
+            if not pagos_df.empty:
+                # Columnas a mostrar; el monto se deja numérico y lo formatea la tabla
+                pagos_display = pagos_df[['concepto', 'quien_pago', 'monto_pagado', 'fecha_pago']].rename(columns={
+                    'concepto': 'Concepto',
+                    'quien_pago': 'Quien Pagó',
+                    'monto_pagado': 'Monto',
+                    'fecha_pago': 'Fecha'
+                })
+                
+                st.dataframe(
+                    pagos_display, 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config={
+                        "Concepto": st.column_config.TextColumn(
+                            "Concepto",
+                            width="medium"
+                        ),
+                        "Quien Pagó": st.column_config.TextColumn(
+                            "Quien Pagó",
+                            width="small"
+                        ),
+                        "Monto": st.column_config.NumberColumn(
+                            "Monto",
+                            format="$%.2f",
+                            width="small"
+                        ),
+                        "Fecha": st.column_config.TextColumn(
+                            "Fecha",
+                            width="small"
+                        )
+                    }
+                )
+            else:
+                st.info("No hay pagos registrados para este mes.")
         
-        # Tabla de historial de pagos
-        st.subheader("📋 Historial de Pagos")
-        pagos_df = obtener_pagos_del_mes(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not pagos_df.empty:
-            # Formatear para mostrar
-            pagos_display = pagos_df[['concepto', 'quien_pago', 'monto_pagado', 'fecha_pago']].copy()
-            pagos_display.columns = ['Concepto', 'Quien Pagó', 'Monto', 'Fecha']
-            pagos_display['Monto'] = pagos_display['Monto'].apply(lambda x: f"${x:.2f}")
-            
-            st.dataframe(
-                pagos_display, 
-                use_container_width=True, 
-                hide_index=True,
-                column_config={
-                    "Concepto": st.column_config.TextColumn(
-                        "Concepto",
-                        width="medium"
-                    ),
-                    "Quien Pagó": st.column_config.TextColumn(
-                        "Quien Pagó",
-                        width="small"
-                    ),
-                    "Monto": st.column_config.TextColumn(
-                        "Monto",
-                        width="small"
-                    ),
-                    "Fecha": st.column_config.TextColumn(
-                        "Fecha",
-                        width="small"
-                    )
-                }
-            )
-        else:
-            st.info("No hay pagos registrados para este mes.")
-    
     # ========== TAB 7: RESUMEN ==========
     with tab7:
-        st.header(f"💰 Resumen - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        # Indicador de mes
-        if mes_seleccionado == fecha_actual.month and anio_seleccionado == fecha_actual.year:
-            st.success(f"✅ Resumen del mes **actual**: {meses[mes_seleccionado]} {anio_seleccionado}")
-        else:
-            st.info(f"📅 Resumen de: {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
-        
-        # Mostrar resumen en tarjetas
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                label="💰 Total Debe Cada Uno",
-                value=f"${saldo['total_debe_cada_uno']:.2f}"
-            )
-        
-        with col2:
-            st.metric(
-                label="� Ha Pagado Ricardo",
-                value=f"${saldo['pagado_ricardo']:.2f}"
-            )
-        
-        with col3:
-            st.metric(
-                label="� Ha Pagado Wendy",
-                value=f"${saldo['pagado_wendy']:.2f}"
-            )
-        
-        st.markdown("---")
-        
-        # Pendientes
-        col4, col5 = st.columns(2)
-        
-        with col4:
-            color_ricardo = "off" if saldo['saldo_ricardo'] <= 0 else "normal"
-            st.metric(
-                label="📊 Pendiente Ricardo",
-                value=f"${saldo['saldo_ricardo']:.2f}",
-                delta=f"-${saldo['pagado_ricardo']:.2f}" if saldo['pagado_ricardo'] > 0 else None,
-                delta_color=color_ricardo
-            )
-        
-        with col5:
-            color_wendy = "off" if saldo['saldo_wendy'] <= 0 else "normal"
-            st.metric(
-                label="📊 Pendiente Wendy",
-                value=f"${saldo['saldo_wendy']:.2f}",
-                delta=f"-${saldo['pagado_wendy']:.2f}" if saldo['pagado_wendy'] > 0 else None,
-                delta_color=color_wendy
-            )
-        
-        st.markdown("---")
-        
-        # Mostrar el mensaje del saldo neto
-        if "pagado" in saldo['mensaje'].lower():
-            st.success(f"✅ **{saldo['mensaje']}**")
-        else:
-            st.warning(f"⚠️ **{saldo['mensaje']}**")
-        
-        # Barra de progreso
-        st.subheader("📊 Progreso de Pagos")
-        
-        col_prog1, col_prog2 = st.columns(2)
-        
-        with col_prog1:
-            st.write("**Ricardo**")
-            if saldo['total_debe_cada_uno'] > 0:
-                progreso_ricardo = min(saldo['pagado_ricardo'] / saldo['total_debe_cada_uno'], 1.0)
-                st.progress(progreso_ricardo)
-                st.caption(f"{progreso_ricardo*100:.1f}% pagado")
+        if tab7.open:
+            st.header(f"💰 Resumen - {periodo}")
+            
+            # Indicador de mes
+            if mes_seleccionado == fecha_actual.month and anio_seleccionado == fecha_actual.year:
+                st.success(f"✅ Resumen del mes **actual**: {periodo}")
+            else:
+                st.info(f"📅 Resumen de: {periodo}")
+            
+            saldo = saldo_mes
+            
+            # Mostrar resumen en tarjetas
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric(
+                    label="💰 Total Debe Cada Uno",
+                    value=f"${saldo['total_debe_cada_uno']:.2f}"
+                )
+            
+            with col2:
+                st.metric(
+                    label="� Ha Pagado Ricardo",
+                    value=f"${saldo['pagado_ricardo']:.2f}"
+                )
+            
+            with col3:
+                st.metric(
+                    label="� Ha Pagado Wendy",
+                    value=f"${saldo['pagado_wendy']:.2f}"
+                )
+            
+            st.markdown("---")
+            
+            # Pendientes
+            col4, col5 = st.columns(2)
+            
+            with col4:
+                color_ricardo = "off" if saldo['saldo_ricardo'] <= 0 else "normal"
+                st.metric(
+                    label="📊 Pendiente Ricardo",
+                    value=f"${saldo['saldo_ricardo']:.2f}",
+                    delta=f"-${saldo['pagado_ricardo']:.2f}" if saldo['pagado_ricardo'] > 0 else None,
+                    delta_color=color_ricardo
+                )
+            
+            with col5:
+                color_wendy = "off" if saldo['saldo_wendy'] <= 0 else "normal"
+                st.metric(
+                    label="📊 Pendiente Wendy",
+                    value=f"${saldo['saldo_wendy']:.2f}",
+                    delta=f"-${saldo['pagado_wendy']:.2f}" if saldo['pagado_wendy'] > 0 else None,
+                    delta_color=color_wendy
+                )
+            
+            st.markdown("---")
+            
+            # Mostrar el mensaje del saldo neto
+            if "pagado" in saldo['mensaje'].lower():
+                st.success(f"✅ **{saldo['mensaje']}**")
+            else:
+                st.warning(f"⚠️ **{saldo['mensaje']}**")
+            
+            # Barra de progreso
+            st.subheader("📊 Progreso de Pagos")
+            
+            col_prog1, col_prog2 = st.columns(2)
+            
+            with col_prog1:
+                st.write("**Ricardo**")
+                if saldo['total_debe_cada_uno'] > 0:
+                    progreso_ricardo = min(saldo['pagado_ricardo'] / saldo['total_debe_cada_uno'], 1.0)
+                    st.progress(progreso_ricardo)
+                    st.caption(f"{progreso_ricardo*100:.1f}% pagado")
+            
+            with col_prog2:
+                st.write("**Wendy**")
+                if saldo['total_debe_cada_uno'] > 0:
+                    progreso_wendy = min(saldo['pagado_wendy'] / saldo['total_debe_cada_uno'], 1.0)
+                    st.progress(progreso_wendy)
+                    st.caption(f"{progreso_wendy*100:.1f}% pagado")
         
-        with col_prog2:
-            st.write("**Wendy**")
-            if saldo['total_debe_cada_uno'] > 0:
-                progreso_wendy = min(saldo['pagado_wendy'] / saldo['total_debe_cada_uno'], 1.0)
-                st.progress(progreso_wendy)
-                st.caption(f"{progreso_wendy*100:.1f}% pagado")
-    
     # ========== TAB 8: INTERFAZ RICARDO ==========
     with tab8:
-        st.header(f"👨 Interfaz de Ricardo - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        # Obtener la tabla mensual completa
-        tabla_df = calcular_tabla_mensual(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not tabla_df.empty:
-            # Calcular pagos realizados por Ricardo para cada gasto
-            gastos_con_info = []
-            cursor = conn.cursor()
-            
-            for _, gasto in tabla_df.iterrows():
-                gasto_id = gasto['id']
-                concepto = gasto['Concepto']
-                monto_total = gasto['Monto Total']
-                frecuencia = gasto['Frecuencia']
-                debe_pagar_total = gasto['Asignado Ricardo']
-                
-                # Obtener cuánto ya pagó Ricardo para este gasto
-                ya_pago = 0
-                
-                try:
-                    # Si es un grupo, necesitamos sumar los pagos de todos los gastos del grupo
-                    if str(gasto_id).startswith('grupo_'):
-                        grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                        query = """
-                            SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                            FROM pagos p
-                            INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                            WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Ricardo'
-                        """
-                        cursor.execute(query, (grupo_id, mes_seleccionado, anio_seleccionado))
-                        result = cursor.fetchone()
-                        ya_pago = result[0] if result else 0
-                    else:
-                        query = """
-                            SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                            FROM pagos
-                            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Ricardo'
-                        """
-                        cursor.execute(query, (gasto_id, mes_seleccionado, anio_seleccionado))
-                        result = cursor.fetchone()
-                        ya_pago = result[0] if result else 0
-                except Exception as e:
-                    # Si hay error en la consulta, asumir que no ha pagado nada
-                    ya_pago = 0
-                
-                pendiente = debe_pagar_total - ya_pago
-                
-                # Solo agregar si hay algo pendiente (incluso si ya pagó algo parcialmente)
-                if pendiente > 0:
-                    gastos_con_info.append({
-                        'concepto': concepto,
-                        'monto_total': monto_total,
-                        'frecuencia': frecuencia,
-                        'debe_pagar_total': debe_pagar_total,
-                        'ya_pago': ya_pago,
-                        'pendiente': pendiente
-                    })
-            
-            if gastos_con_info:
-                st.info(f"💡 Tienes **{len(gastos_con_info)}** gastos pendientes por pagar")
-                
-                total_pendiente = 0
+        if tab8.open:
+            st.header(f"👨 Interfaz de Ricardo - {periodo}")
+            
+            # Obtener la tabla mensual completa
+            tabla_df = tabla_mes
+            
+            if not tabla_df.empty:
+                # Gastos con algo pendiente para Ricardo, a partir de los totales del mes
+                pendientes_df = calcular_pendientes_persona(tabla_df, totales_pagados_mes, 'Ricardo')
                 
-                for gasto_info in gastos_con_info:
-                    total_pendiente += gasto_info['pendiente']
+                if not pendientes_df.empty:
+                    st.info(f"💡 Tienes **{len(pendientes_df)}** gastos pendientes por pagar")
                     
-                    with st.container():
-                        col1, col2, col3 = st.columns([3, 1, 1])
-                        
-                        with col1:
-                            st.markdown(f"**{gasto_info['concepto']}**")
-                            st.caption(f"Frecuencia: {gasto_info['frecuencia']} | Total: ${gasto_info['monto_total']:.2f}")
-                        
-                        with col2:
-                            st.metric("Debes Pagar", f"${gasto_info['debe_pagar_total']:.2f}")
-                            if gasto_info['ya_pago'] > 0:
-                                st.caption(f"✅ Pagaste: ${gasto_info['ya_pago']:.2f}")
-                        
-                        with col3:
-                            st.metric("Pendiente", f"${gasto_info['pendiente']:.2f}")
-                        
-                        st.markdown("---")
-                
-                # Resumen total
-                st.subheader("📊 Resumen Total")
-                col_res1, col_res2 = st.columns(2)
-                with col_res1:
-                    st.metric("Total Pendiente", f"${total_pendiente:.2f}")
-                with col_res2:
-                    saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
+                    total_pendiente = pendientes_df['pendiente'].sum()
+                    
+                    mostrar_tabla_pendientes(pendientes_df)
+                    
+                    # Resumen total
+                    st.subheader("📊 Resumen Total")
+                    col_res1, col_res2 = st.columns(2)
+                    with col_res1:
+                        st.metric("Total Pendiente", f"${total_pendiente:.2f}")
+                    with col_res2:
+                        saldo = saldo_mes
+                        st.metric("Total Pagado", f"${saldo['pagado_ricardo']:.2f}")
+                else:
+                    st.success("🎉 ¡Excelente! No tienes gastos pendientes por pagar este mes.")
+                    saldo = saldo_mes
                     st.metric("Total Pagado", f"${saldo['pagado_ricardo']:.2f}")
             else:
-                st.success("🎉 ¡Excelente! No tienes gastos pendientes por pagar este mes.")
-                saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
-                st.metric("Total Pagado", f"${saldo['pagado_ricardo']:.2f}")
-        else:
-            st.info("No hay gastos registrados para este mes.")
-    
+                st.info("No hay gastos registrados para este mes.")
+        
     # ========== TAB 9: INTERFAZ WENDY ==========
     with tab9:
-        st.header(f"👩 Interfaz de Wendy - {meses[mes_seleccionado]} {anio_seleccionado}")
-        
-        # Obtener la tabla mensual completa
-        tabla_df = calcular_tabla_mensual(conn, mes_seleccionado, anio_seleccionado)
-        
-        if not tabla_df.empty:
-            # Calcular pagos realizados por Wendy para cada gasto
-            gastos_con_info = []
-            cursor = conn.cursor()
-            
-            for _, gasto in tabla_df.iterrows():
-                gasto_id = gasto['id']
-                concepto = gasto['Concepto']
-                monto_total = gasto['Monto Total']
-                frecuencia = gasto['Frecuencia']
-                debe_pagar_total = gasto['Asignado Wendy']
-                
-                # Obtener cuánto ya pagó Wendy para este gasto
-                ya_pago = 0
-                
-                try:
-                    # Si es un grupo, necesitamos sumar los pagos de todos los gastos del grupo
-                    if str(gasto_id).startswith('grupo_'):
-                        grupo_id = int(str(gasto_id).replace('grupo_', ''))
-                        query = """
-                            SELECT COALESCE(SUM(p.monto_pagado), 0) as total_pagado
-                            FROM pagos p
-                            INNER JOIN gastos_en_grupo geg ON p.gasto_id = geg.gasto_id
-                            WHERE geg.grupo_id = ? AND p.mes = ? AND p.anio = ? AND p.quien_pago = 'Wendy'
-                        """
-                        cursor.execute(query, (grupo_id, mes_seleccionado, anio_seleccionado))
-                        result = cursor.fetchone()
-                        ya_pago = result[0] if result else 0
-                    else:
-                        query = """
-                            SELECT COALESCE(SUM(monto_pagado), 0) as total_pagado
-                            FROM pagos
-                            WHERE gasto_id = ? AND mes = ? AND anio = ? AND quien_pago = 'Wendy'
-                        """
-                        cursor.execute(query, (gasto_id, mes_seleccionado, anio_seleccionado))
-                        result = cursor.fetchone()
-                        ya_pago = result[0] if result else 0
-                except Exception as e:
-                    # Si hay error en la consulta, asumir que no ha pagado nada
-                    ya_pago = 0
-                
-                pendiente = debe_pagar_total - ya_pago
-                
-                # Solo agregar si hay algo pendiente (incluso si ya pagó algo parcialmente)
-                if pendiente > 0:
-                    gastos_con_info.append({
-                        'concepto': concepto,
-                        'monto_total': monto_total,
-                        'frecuencia': frecuencia,
-                        'debe_pagar_total': debe_pagar_total,
-                        'ya_pago': ya_pago,
-                        'pendiente': pendiente
-                    })
-            
-            if gastos_con_info:
-                st.info(f"💡 Tienes **{len(gastos_con_info)}** gastos pendientes por pagar")
-                
-                total_pendiente = 0
+        if tab9.open:
+            st.header(f"👩 Interfaz de Wendy - {periodo}")
+            
+            # Obtener la tabla mensual completa
+            tabla_df = tabla_mes
+            
+            if not tabla_df.empty:
+                # Gastos con algo pendiente para Wendy, a partir de los totales del mes
+                pendientes_df = calcular_pendientes_persona(tabla_df, totales_pagados_mes, 'Wendy')
                 
-                for gasto_info in gastos_con_info:
-                    total_pendiente += gasto_info['pendiente']
+                if not pendientes_df.empty:
+                    st.info(f"💡 Tienes **{len(pendientes_df)}** gastos pendientes por pagar")
                     
-                    with st.container():
-                        col1, col2, col3 = st.columns([3, 1, 1])
-                        
-                        with col1:
-                            st.markdown(f"**{gasto_info['concepto']}**")
-                            st.caption(f"Frecuencia: {gasto_info['frecuencia']} | Total: ${gasto_info['monto_total']:.2f}")
-                        
-                        with col2:
-                            st.metric("Debes Pagar", f"${gasto_info['debe_pagar_total']:.2f}")
-                            if gasto_info['ya_pago'] > 0:
-                                st.caption(f"✅ Pagaste: ${gasto_info['ya_pago']:.2f}")
-                        
-                        with col3:
-                            st.metric("Pendiente", f"${gasto_info['pendiente']:.2f}")
-                        
-                        st.markdown("---")
-                
-                # Resumen total
-                st.subheader("📊 Resumen Total")
-                col_res1, col_res2 = st.columns(2)
-                with col_res1:
-                    st.metric("Total Pendiente", f"${total_pendiente:.2f}")
-                with col_res2:
-                    saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
+                    total_pendiente = pendientes_df['pendiente'].sum()
+                    
+                    mostrar_tabla_pendientes(pendientes_df)
+                    
+                    # Resumen total
+                    st.subheader("📊 Resumen Total")
+                    col_res1, col_res2 = st.columns(2)
+                    with col_res1:
+                        st.metric("Total Pendiente", f"${total_pendiente:.2f}")
+                    with col_res2:
+                        saldo = saldo_mes
+                        st.metric("Total Pagado", f"${saldo['pagado_wendy']:.2f}")
+                else:
+                    st.success("🎉 ¡Excelente! No tienes gastos pendientes por pagar este mes.")
+                    saldo = saldo_mes
                     st.metric("Total Pagado", f"${saldo['pagado_wendy']:.2f}")
             else:
-                st.success("🎉 ¡Excelente! No tienes gastos pendientes por pagar este mes.")
-                saldo = calcular_saldo_neto(conn, mes_seleccionado, anio_seleccionado)
-                st.metric("Total Pagado", f"${saldo['pagado_wendy']:.2f}")
-        else:
-            st.info("No hay gastos registrados para este mes.")
+                st.info("No hay gastos registrados para este mes.")
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,116 @@ Reemplaza SQLite con Google Sheets para persistencia en la nube
 """
 
 import gspread
+from gspread.utils import convert_credentials
+from google.auth.transport.requests import AuthorizedSession
 from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 import streamlit as st
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+# Segundos que se reutilizan las filas leídas de una hoja antes de volver a pedirlas
+CACHE_TTL_SEGUNDOS = 30
+
+class _ReintentosAPI(Retry):
+    """Retry que ante una respuesta de error solo repite un POST si es un 429"""
+    
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # Un POST (append_row, batch_update...) no es idempotente: un 503 no garantiza
+        # que la API no lo aplicara, y repetirlo podría duplicar la fila. Un 429
+        # (límite de cuota) sí se rechaza sin procesar la petición
+        if method == 'POST' and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+# Reintentos con espera exponencial (de como mucho 4 segundos entre intentos, para no
+# retener el lock de la instancia mucho tiempo): fallos al conectar para cualquier
+# método, límite de cuota (429) para cualquier método y servicio no disponible (503)
+# salvo en POST. Un error al leer la respuesta no se reintenta, porque la escritura
+# ya pudo aplicarse y repetirla duplicaría la fila
+REINTENTOS_API = _ReintentosAPI(
+    total=5,
+    connect=5,
+    read=False,
+    status=5,
+    status_forcelist=(429, 503),
+    allowed_methods=None,
+    backoff_factor=1,
+    backoff_max=4,
+    raise_on_status=False
+)
+
+# Columnas de cada hoja y su tipo (None: texto, se deja como object). Mes y año
+# caben en enteros pequeños y los textos con pocos valores distintos van como category
+ESQUEMAS = {
+    'gastos_mensuales': {
+        'id': 'int64', 'concepto': None, 'monto': 'float64', 'frecuencia': 'category',
+        'distribucion_ricardo': 'float64', 'distribucion_wendy': 'float64'
+    },
+    'montos_mensuales': {
+        'id': 'int64', 'gasto_id': 'int64', 'mes': 'int8', 'anio': 'int16',
+        'monto_ricardo': 'float64', 'monto_wendy': 'float64'
+    },
+    'pagos': {
+        'id': 'int64', 'gasto_id': 'int64', 'mes': 'int8', 'anio': 'int16',
+        'quien_pago': 'category', 'monto_pagado': 'float64', 'fecha_pago': None
+    },
+    'grupos_distribucion': {
+        'id': 'int64', 'nombre_grupo': None,
+        'distribucion_ricardo': 'float64', 'distribucion_wendy': 'float64'
+    },
+    'gastos_en_grupo': {'id': 'int64', 'grupo_id': 'int64', 'gasto_id': 'int64'},
+}
+
+def _coerce_numeric(df, cols):
+    """Convertir a número las columnas indicadas, salvo las que ya tienen tipo numérico"""
+    for col in cols:
+        if df[col].dtype.kind not in 'fiu':
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def _separar_header(valores):
+    """Separar el header de las filas de una hoja, completando con '' las filas cortas"""
+    if not valores:
+        return [], []
+    header = valores[0]
+    filas = [fila + [''] * (len(header) - len(fila)) for fila in valores[1:]]
+    return header, filas
+
+def _dataframe_tipado(header, filas, table_name):
+    """
+    Construir el DataFrame de una hoja con los tipos de su esquema en lugar de
+    dejar que pandas los infiera. Las columnas numéricas con celdas vacías o con
+    texto se convierten después con _coerce_numeric (a NaN donde no hay número).
+    """
+    esquema = ESQUEMAS[table_name]
+    posiciones = {col: i for i, col in enumerate(header)}
+    columnas = {}
+    pendientes = []
+    for col, dtype in esquema.items():
+        i = posiciones.get(col)
+        valores = [fila[i] for fila in filas] if i is not None else [''] * len(filas)
+        if dtype is None or dtype == 'category':
+            columnas[col] = pd.Series(valores, dtype=dtype or object)
+            continue
+        try:
+            columnas[col] = np.fromiter(valores, dtype=dtype, count=len(valores))
+        except (TypeError, ValueError, OverflowError):
+            columnas[col] = np.array(valores, dtype=object)
+            pendientes.append(col)
+    return _coerce_numeric(pd.DataFrame(columnas), pendientes)
+
+def _clave_id(valor):
+    """Clave de un id en los índices: '3' tanto si la celda trae 3, 3.0 o '3'"""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor)
+
 class GoogleSheetsDB:
     """Clase para manejar la conexión y operaciones con Google Sheets"""
     
@@ -16,6 +121,31 @@ class GoogleSheetsDB:
         """Inicializar conexión con Google Sheets usando secrets de Streamlit"""
         self.client = None
         self.spreadsheet = None
+        # Hojas ya obtenidas, para no pedir sus metadatos en cada operación
+        self._ws_cache = {}
+        # La instancia se comparte entre sesiones (st.cache_resource): los índices y
+        # contadores de filas se leen y modifican con este lock
+        self._lock = threading.RLock()
+        # Número de fila de cada id por hoja y la lectura de la que se construyó:
+        # {hoja: (filas, {id: fila})}
+        self._row_index = {}
+        # Último id usado y número de filas (con el header) de cada hoja indexada
+        self._ultimo_id = {}
+        self._num_filas = {}
+        # Filas leídas por hoja: {hoja: (momento de la lectura, (header, filas))}
+        self._cache = {}
+        # Veces que se invalidó cada hoja: una lectura solo se guarda en la caché si
+        # la hoja no se invalidó mientras se hacía la petición
+        self._generacion = {}
+        self._cache_lock = threading.Lock()
+        # Totales pagados calculados a partir de una lectura concreta de pagos: (filas, totales)
+        self._totales_cache = (None, {})
+        # Fila e id de cada monto mensual y la lectura de la que se construyó:
+        # (filas, {(gasto_id, mes, anio): (fila, id)})
+        self._montos_index = (None, {})
+        # Escrituras acumuladas dentro de un bloque batch(), por hilo: cada sesión
+        # tiene su propio lote y no se mezclan con las escrituras de las demás
+        self._local = threading.local()
         self._connect()
     
     def _connect(self):
@@ -30,7 +160,12 @@ class GoogleSheetsDB:
             # Cargar credenciales desde secrets
             creds_dict = st.secrets["gcp_service_account"]
             creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-            self.client = gspread.authorize(creds)
+            
+            # Sesión HTTP persistente (reutiliza conexiones) con reintentos y espera exponencial
+            session = AuthorizedSession(convert_credentials(creds))
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=REINTENTOS_API)
+            session.mount('https://', adapter)
+            self.client = gspread.authorize(creds, session=session)
             
             # Abrir el spreadsheet
             spreadsheet_url = st.secrets["spreadsheet_url"]
@@ -41,14 +176,229 @@ class GoogleSheetsDB:
             st.info("Asegúrate de configurar los secrets en Streamlit Cloud")
     
     def _get_worksheet(self, sheet_name, create_if_missing=True):
-        """Obtener o crear una hoja específica"""
+        """Obtener o crear una hoja específica (se pide a la API una sola vez)"""
+        if sheet_name in self._ws_cache:
+            return self._ws_cache[sheet_name]
         try:
             worksheet = self.spreadsheet.worksheet(sheet_name)
-            return worksheet
         except gspread.exceptions.WorksheetNotFound:
-            if create_if_missing:
-                return self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
-            return None
+            if not create_if_missing:
+                return None
+            worksheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
+        self._ws_cache[sheet_name] = worksheet
+        return worksheet
+    
+    def _en_cache(self, table_name):
+        """(header, filas) de la hoja si se leyeron hace menos de CACHE_TTL_SEGUNDOS, si no None"""
+        en_cache = self._cache.get(table_name)
+        if en_cache and time.monotonic() - en_cache[0] < CACHE_TTL_SEGUNDOS:
+            return en_cache[1]
+        return None
+    
+    def _leer_tabla(self, table_name):
+        """
+        Obtener (header, filas) de una hoja, reutilizando la última lectura durante
+        CACHE_TTL_SEGUNDOS. Las filas son listas de valores: no se crea un dict por fila
+        """
+        while True:
+            tabla = self._en_cache(table_name)
+            if tabla is not None:
+                return tabla
+            # Al caducar una hoja se recargan juntas todas las caducadas
+            try:
+                tabla = self.precargar_tablas().get(table_name)
+            except gspread.exceptions.APIError:
+                tabla = None
+            if tabla is None:
+                # La lectura conjunta falló o no trajo esta hoja: leerla sola
+                generacion = self._generacion.get(table_name, 0)
+                valores = self._get_worksheet(table_name).get_all_values(
+                    value_render_option='UNFORMATTED_VALUE',
+                    date_time_render_option='FORMATTED_STRING'
+                )
+                tabla = _separar_header(valores)
+                if not self._guardar_lectura(table_name, generacion, time.monotonic(), tabla):
+                    tabla = None
+            if tabla is not None:
+                return tabla
+            # La hoja cambió mientras se leía y la lectura puede ser anterior al cambio
+    
+    def precargar_tablas(self, tablas=None):
+        """
+        Leer con una sola petición (values_batch_get) todas las hojas indicadas
+        cuya lectura haya caducado, dejar sus filas en la caché y devolver
+        {hoja: (header, filas)} de las hojas leídas. Los números van sin formato
+        y las fechas como el texto que muestra la hoja
+        """
+        tablas = [t for t in (tablas or ESQUEMAS) if self._en_cache(t) is None]
+        if not tablas:
+            return {}
+        generaciones = {tabla: self._generacion.get(tabla, 0) for tabla in tablas}
+        respuesta = self.spreadsheet.values_batch_get(
+            [f"'{tabla}'" for tabla in tablas],
+            params={
+                'valueRenderOption': 'UNFORMATTED_VALUE',
+                'dateTimeRenderOption': 'FORMATTED_STRING'
+            }
+        )
+        ahora = time.monotonic()
+        leidas = {}
+        for tabla, rango in zip(tablas, respuesta.get('valueRanges', [])):
+            leida = _separar_header(rango.get('values', []))
+            if self._guardar_lectura(tabla, generaciones[tabla], ahora, leida):
+                leidas[tabla] = leida
+        return leidas
+    
+    def _guardar_lectura(self, table_name, generacion, momento, tabla):
+        """
+        Guardar en la caché la lectura de una hoja pedida cuando la hoja iba por la
+        generación indicada. Si se invalidó mientras tanto no se guarda y devuelve False
+        """
+        with self._cache_lock:
+            if self._generacion.get(table_name, 0) != generacion:
+                return False
+            self._cache[table_name] = (momento, tabla)
+            return True
+    
+    def _invalidar_cache(self, table_name):
+        """Descartar las filas en caché de una hoja tras escribir en ella"""
+        with self._cache_lock:
+            self._generacion[table_name] = self._generacion.get(table_name, 0) + 1
+            self._cache.pop(table_name, None)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Acumular las escrituras hechas dentro del bloque y enviarlas juntas al salir:
+        las filas nuevas con un append_rows por hoja y las actualizaciones con un
+        solo values_batch_update. Si el bloque falla, no se envía nada.
+        
+        El bloque se ejecuta con el lock de la instancia: ninguna otra sesión inserta
+        ni borra filas hasta enviarlo, así las filas acumuladas llegan a la hoja en
+        los números de fila que se les reservaron. Dentro del bloque no se puede
+        eliminar filas (desplazarían las reservadas).
+        """
+        if self._lote() is not None:
+            yield self
+            return
+        with self._lock:
+            lote = self._local.lote = {'pending': [], 'appends': {}}
+            try:
+                yield self
+            except Exception:
+                # Los índices cuentan con las filas reservadas que no se escribirán:
+                # descartar la lectura de esas hojas para que se reconstruyan
+                for table_name in lote['appends']:
+                    self._invalidar_cache(table_name)
+                raise
+            else:
+                self._enviar_pendientes()
+            finally:
+                self._local.lote = None
+    
+    def _lote(self):
+        """Escrituras acumuladas del batch() abierto en este hilo, o None si no hay ninguno"""
+        return getattr(self._local, 'lote', None)
+    
+    def _filas_pendientes(self, table_name):
+        """Filas nuevas de una hoja acumuladas en el batch() abierto en este hilo"""
+        lote = self._lote()
+        return lote['appends'].get(table_name, []) if lote else []
+    
+    def _enviar_pendientes(self):
+        """Enviar las escrituras acumuladas: primero las filas nuevas, luego las actualizaciones"""
+        lote = self._lote()
+        appends, lote['appends'] = lote['appends'], {}
+        for table_name, rows in appends.items():
+            self._get_worksheet(table_name).append_rows(rows)
+            self._invalidar_cache(table_name)
+        
+        pending, lote['pending'] = lote['pending'], []
+        if pending:
+            self.spreadsheet.values_batch_update({'valueInputOption': 'RAW', 'data': pending})
+            for item in pending:
+                self._invalidar_cache(item['range'].split('!')[0].strip("'"))
+    
+    def _agregar_fila(self, table_name, row):
+        """Agregar una fila al final de la hoja (acumulada si hay un batch() abierto)"""
+        lote = self._lote()
+        if lote is not None:
+            # La hoja no cambia hasta enviar lo acumulado: la caché sigue siendo válida
+            lote['appends'].setdefault(table_name, []).append(row)
+        else:
+            self._get_worksheet(table_name).append_row(row)
+            self._invalidar_cache(table_name)
+    
+    def _actualizar_rango(self, table_name, rango, values):
+        """Escribir un rango de la hoja (acumulado si hay un batch() abierto)"""
+        lote = self._lote()
+        if lote is not None:
+            lote['pending'].append({'range': f"'{table_name}'!{rango}", 'values': values})
+        else:
+            self._get_worksheet(table_name).update(rango, values)
+            self._invalidar_cache(table_name)
+    
+    def _indice_filas(self, table_name):
+        """
+        Obtener {id: fila} de una hoja. Se reconstruye, junto con el número de filas
+        y el último id, cada vez que cambia la lectura en caché de la hoja, así que
+        refleja los cambios hechos en la hoja desde otra sesión o a mano. Las filas
+        acumuladas en un batch() abierto se cuentan al final de la hoja.
+        """
+        header, filas = self._leer_tabla(table_name)
+        with self._lock:
+            filas_indexadas, indice = self._row_index.get(table_name, (None, None))
+            if filas_indexadas is not filas:
+                todas = filas + self._filas_pendientes(table_name)
+                ids = [fila[0] if fila else '' for fila in todas]
+                indice = {
+                    _clave_id(valor): fila for fila, valor in enumerate(ids, start=2) if valor != ''
+                }
+                self._row_index[table_name] = (filas, indice)
+                self._num_filas[table_name] = len(todas) + 1
+                numericos = []
+                for valor in ids:
+                    try:
+                        numericos.append(int(float(valor)))
+                    except (TypeError, ValueError):
+                        pass
+                # Sin bajar del último id reservado: un id borrado no se vuelve a usar
+                self._ultimo_id[table_name] = max(numericos + [self._ultimo_id.get(table_name, 0)])
+            return indice
+    
+    def _nueva_fila(self, table_name, valores):
+        """
+        Agregar al final de la hoja una fila con un id nuevo seguido de los valores
+        y devolver (id, número de fila). Los contadores salen de la lectura en caché
+        de la hoja, así que insertar no descarga la hoja y los ids no se repiten
+        aunque se hayan borrado filas. Reservar y agregar se hacen con el lock, para
+        que las filas lleguen a la hoja en el orden en que se reservaron.
+        """
+        with self._lock:
+            indice = self._indice_filas(table_name)
+            self._ultimo_id[table_name] += 1
+            self._num_filas[table_name] += 1
+            row_id = self._ultimo_id[table_name]
+            row_num = self._num_filas[table_name]
+            indice[_clave_id(row_id)] = row_num
+            self._agregar_fila(table_name, [row_id] + valores)
+            return row_id, row_num
+    
+    def _eliminar_fila(self, table_name, row_id):
+        """Eliminar la fila de un id y desplazar en el índice las filas siguientes"""
+        if self._lote() is not None:
+            raise RuntimeError("No se pueden eliminar filas dentro de un batch()")
+        with self._lock:
+            indice = self._indice_filas(table_name)
+            row_num = indice.pop(_clave_id(row_id), None)
+            if row_num is None:
+                return
+            self._get_worksheet(table_name).delete_rows(row_num)
+            self._num_filas[table_name] -= 1
+            self._invalidar_cache(table_name)
+            for clave, fila in indice.items():
+                if fila > row_num:
+                    indice[clave] = fila - 1
     
     def _ensure_table_exists(self, table_name, columns):
         """Asegurar que la tabla (hoja) existe con sus columnas"""
@@ -57,6 +407,9 @@ class GoogleSheetsDB:
         # Si la hoja está vacía, agregar encabezados
         if worksheet.row_count == 0 or not worksheet.row_values(1):
             worksheet.insert_row(columns, 1)
+            self._invalidar_cache(table_name)
+            # El header desplaza las filas: el índice se vuelve a leer
+            self._row_index.pop(table_name, None)
         
         return worksheet
     
@@ -69,54 +422,38 @@ class GoogleSheetsDB:
     
     def insertar_gasto_mensual(self, concepto, monto, frecuencia, dist_ricardo, dist_wendy):
         """Insertar un nuevo gasto mensual"""
-        worksheet = self._get_worksheet('gastos_mensuales')
-        
-        # Obtener el siguiente ID
-        all_values = worksheet.get_all_values()
-        next_id = len(all_values)  # Incluye el header
-        
-        # Insertar fila
-        row = [next_id, concepto, monto, frecuencia, dist_ricardo, dist_wendy]
-        worksheet.append_row(row)
+        # Insertar fila con el siguiente ID
+        next_id, _ = self._nueva_fila(
+            'gastos_mensuales', [concepto, monto, frecuencia, dist_ricardo, dist_wendy]
+        )
         
         return next_id
     
     def obtener_gastos_mensuales(self):
         """Obtener todos los gastos mensuales como DataFrame"""
-        worksheet = self._get_worksheet('gastos_mensuales')
-        data = worksheet.get_all_records()
+        header, filas = self._leer_tabla('gastos_mensuales')
         
-        if not data:
+        if not filas:
             return pd.DataFrame(columns=['id', 'concepto', 'monto', 'frecuencia', 
                                         'distribucion_ricardo', 'distribucion_wendy'])
         
-        df = pd.DataFrame(data)
-        # Convertir tipos de datos
-        df['monto'] = pd.to_numeric(df['monto'], errors='coerce')
-        df['distribucion_ricardo'] = pd.to_numeric(df['distribucion_ricardo'], errors='coerce')
-        df['distribucion_wendy'] = pd.to_numeric(df['distribucion_wendy'], errors='coerce')
+        df = _dataframe_tipado(header, filas, 'gastos_mensuales')
         
         return df
     
     def actualizar_gasto_mensual(self, gasto_id, concepto, monto, frecuencia, dist_ricardo, dist_wendy):
         """Actualizar un gasto mensual existente"""
-        worksheet = self._get_worksheet('gastos_mensuales')
-        
-        # Buscar la fila con el ID
-        cell = worksheet.find(str(gasto_id))
-        if cell:
-            row_num = cell.row
-            worksheet.update(f'A{row_num}:F{row_num}', 
-                           [[gasto_id, concepto, monto, frecuencia, dist_ricardo, dist_wendy]])
+        # Buscar la fila con el ID en el índice (sin recorrer la hoja en el servidor).
+        # Con el lock, ningún borrado desplaza la fila entre buscarla y escribirla
+        with self._lock:
+            row_num = self._indice_filas('gastos_mensuales').get(_clave_id(gasto_id))
+            if row_num:
+                self._actualizar_rango('gastos_mensuales', f'A{row_num}:F{row_num}', 
+                                       [[gasto_id, concepto, monto, frecuencia, dist_ricardo, dist_wendy]])
     
     def eliminar_gasto_mensual(self, gasto_id):
         """Eliminar un gasto mensual"""
-        worksheet = self._get_worksheet('gastos_mensuales')
-        
-        # Buscar y eliminar la fila
-        cell = worksheet.find(str(gasto_id))
-        if cell:
-            worksheet.delete_rows(cell.row)
+        self._eliminar_fila('gastos_mensuales', gasto_id)
     
     # ==================== MONTOS MENSUALES ====================
     
@@ -127,42 +464,57 @@ class GoogleSheetsDB:
     
     def obtener_montos_mensuales(self, mes, anio):
         """Obtener montos mensuales para un mes/año específico"""
-        worksheet = self._get_worksheet('montos_mensuales')
-        data = worksheet.get_all_records()
+        header, filas = self._leer_tabla('montos_mensuales')
         
-        if not data:
+        if not filas:
             return pd.DataFrame(columns=['id', 'gasto_id', 'mes', 'anio', 'monto_ricardo', 'monto_wendy'])
         
-        df = pd.DataFrame(data)
+        df = _dataframe_tipado(header, filas, 'montos_mensuales')
         df = df[(df['mes'] == mes) & (df['anio'] == anio)]
         
-        # Convertir tipos
-        df['monto_ricardo'] = pd.to_numeric(df['monto_ricardo'], errors='coerce')
-        df['monto_wendy'] = pd.to_numeric(df['monto_wendy'], errors='coerce')
-        
         return df
     
+    def _indice_montos(self):
+        """
+        Obtener {(gasto_id, mes, anio): (fila, id)} de los montos. Se reconstruye cada
+        vez que cambia la lectura en caché de la hoja, contando al final las filas
+        acumuladas en un batch() abierto
+        """
+        header, filas = self._leer_tabla('montos_mensuales')
+        with self._lock:
+            filas_indexadas, indice = self._montos_index
+            if filas_indexadas is not filas:
+                indice = {}
+                todas = filas + self._filas_pendientes('montos_mensuales')
+                if todas:
+                    # Las filas acumuladas siguen el orden de columnas del esquema
+                    header = header or list(ESQUEMAS['montos_mensuales'])
+                    i_id, i_gasto, i_mes, i_anio = (header.index(c) for c in ('id', 'gasto_id', 'mes', 'anio'))
+                    for row_num, fila in enumerate(todas, start=2):  # Start at 2 (skip header)
+                        indice.setdefault(
+                            (fila[i_gasto], fila[i_mes], fila[i_anio]), (row_num, fila[i_id])
+                        )
+                self._montos_index = (filas, indice)
+            return indice
+    
     def actualizar_monto_mensual(self, gasto_id, mes, anio, monto_ricardo, monto_wendy):
         """Actualizar o insertar monto mensual"""
-        worksheet = self._get_worksheet('montos_mensuales')
-        all_values = worksheet.get_all_records()
+        clave = (gasto_id, mes, anio)
         
-        # Buscar si existe
-        found = False
-        for idx, row in enumerate(all_values, start=2):  # Start at 2 (skip header)
-            if (row['gasto_id'] == gasto_id and 
-                row['mes'] == mes and 
-                row['anio'] == anio):
+        # Con el lock, dos sesiones no insertan a la vez el mismo monto
+        with self._lock:
+            indice = self._indice_montos()
+            if clave in indice:
                 # Actualizar
-                worksheet.update(f'A{idx}:F{idx}', 
-                               [[row['id'], gasto_id, mes, anio, monto_ricardo, monto_wendy]])
-                found = True
-                break
-        
-        if not found:
-            # Insertar nuevo
-            next_id = len(all_values) + 1
-            worksheet.append_row([next_id, gasto_id, mes, anio, monto_ricardo, monto_wendy])
+                row_num, monto_id = indice[clave]
+                self._actualizar_rango('montos_mensuales', f'A{row_num}:F{row_num}', 
+                                       [[monto_id, gasto_id, mes, anio, monto_ricardo, monto_wendy]])
+            else:
+                # Insertar nuevo
+                next_id, row_num = self._nueva_fila(
+                    'montos_mensuales', [gasto_id, mes, anio, monto_ricardo, monto_wendy]
+                )
+                indice[clave] = (row_num, next_id)
     
     # ==================== PAGOS ====================
     
@@ -173,52 +525,47 @@ class GoogleSheetsDB:
     
     def insertar_pago(self, gasto_id, mes, anio, quien_pago, monto_pagado):
         """Insertar un nuevo pago"""
-        worksheet = self._get_worksheet('pagos')
-        
-        all_values = worksheet.get_all_values()
-        next_id = len(all_values)
-        
         fecha_pago = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        row = [next_id, gasto_id, mes, anio, quien_pago, monto_pagado, fecha_pago]
-        worksheet.append_row(row)
+        next_id, _ = self._nueva_fila(
+            'pagos', [gasto_id, mes, anio, quien_pago, monto_pagado, fecha_pago]
+        )
         
         return next_id
     
     def obtener_pagos(self, mes, anio):
         """Obtener pagos de un mes/año específico"""
-        worksheet = self._get_worksheet('pagos')
-        data = worksheet.get_all_records()
+        header, filas = self._leer_tabla('pagos')
         
-        if not data:
+        if not filas:
             return pd.DataFrame(columns=['id', 'gasto_id', 'mes', 'anio', 
                                         'quien_pago', 'monto_pagado', 'fecha_pago'])
         
-        df = pd.DataFrame(data)
+        df = _dataframe_tipado(header, filas, 'pagos')
         df = df[(df['mes'] == mes) & (df['anio'] == anio)]
         
-        df['monto_pagado'] = pd.to_numeric(df['monto_pagado'], errors='coerce')
-        
         return df
     
+    def _totales_pagados(self):
+        """
+        Obtener {(gasto_id, mes, anio, quien_pago): total} de todos los pagos.
+        Se calcula una vez por cada lectura de la hoja, así las consultas de
+        totales sucesivas son una búsqueda en un dict
+        """
+        header, filas = self._leer_tabla('pagos')
+        filas_calculadas, totales = self._totales_cache
+        if filas_calculadas is not filas:
+            totales = {}
+            if filas:
+                df = _dataframe_tipado(header, filas, 'pagos')
+                totales = df.groupby(
+                    ['gasto_id', 'mes', 'anio', 'quien_pago'], observed=True
+                )['monto_pagado'].sum().to_dict()
+            self._totales_cache = (filas, totales)
+        return totales
+    
     def obtener_total_pagado(self, gasto_id, mes, anio, quien):
         """Obtener el total pagado por una persona para un gasto específico"""
-        worksheet = self._get_worksheet('pagos')
-        data = worksheet.get_all_records()
-        
-        if not data:
-            return 0
-        
-        df = pd.DataFrame(data)
-        df = df[(df['gasto_id'] == gasto_id) & 
-                (df['mes'] == mes) & 
-                (df['anio'] == anio) & 
-                (df['quien_pago'] == quien)]
-        
-        if df.empty:
-            return 0
-        
-        df['monto_pagado'] = pd.to_numeric(df['monto_pagado'], errors='coerce')
-        return df['monto_pagado'].sum()
+        return self._totales_pagados().get((gasto_id, mes, anio, quien), 0)
     
     # ==================== GRUPOS DE DISTRIBUCIÓN ====================
     
@@ -229,15 +576,12 @@ class GoogleSheetsDB:
     
     def obtener_grupos_distribucion(self):
         """Obtener todos los grupos de distribución"""
-        worksheet = self._get_worksheet('grupos_distribucion')
-        data = worksheet.get_all_records()
+        header, filas = self._leer_tabla('grupos_distribucion')
         
-        if not data:
+        if not filas:
             return pd.DataFrame(columns=['id', 'nombre_grupo', 'distribucion_ricardo', 'distribucion_wendy'])
         
-        df = pd.DataFrame(data)
-        df['distribucion_ricardo'] = pd.to_numeric(df['distribucion_ricardo'], errors='coerce')
-        df['distribucion_wendy'] = pd.to_numeric(df['distribucion_wendy'], errors='coerce')
+        df = _dataframe_tipado(header, filas, 'grupos_distribucion')
         
         return df
     
@@ -250,13 +594,12 @@ class GoogleSheetsDB:
     
     def obtener_gastos_en_grupo(self, grupo_id):
         """Obtener todos los gastos de un grupo"""
-        worksheet = self._get_worksheet('gastos_en_grupo')
-        data = worksheet.get_all_records()
+        header, filas = self._leer_tabla('gastos_en_grupo')
         
-        if not data:
+        if not filas:
             return []
         
-        df = pd.DataFrame(data)
+        df = _dataframe_tipado(header, filas, 'gastos_en_grupo')
         df = df[df['grupo_id'] == grupo_id]
         
         return df['gasto_id'].tolist()
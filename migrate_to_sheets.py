@@ -3,11 +3,32 @@ Script de migración de SQLite a Google Sheets
 Ejecuta este script UNA VEZ para migrar tus datos existentes
 """
 
+import json
 import sqlite3
 import pandas as pd
 from google_sheets_db import GoogleSheetsDB
 import streamlit as st
 
+# Filas que se leen de SQLite en cada bloque durante la migración
+TAMANO_LOTE = 5000
+
+def conectar_sqlite(db_path):
+    """
+    Abre la base de datos SQLite de origen para la migración.
+    Solo se lee de ella, así que se configura para lecturas rápidas
+    sin tocar el modo de journal del archivo original.
+    
+    Args:
+        db_path: Ruta al archivo de base de datos SQLite
+    """
+    # Caché de sentencias preparadas más amplia que la de por defecto
+    conn = sqlite3.connect(db_path, cached_statements=256)
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -20000")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
 def migrar_sqlite_a_google_sheets(db_path='contabilidad.db'):
     """
     Migrar todos los datos de SQLite a Google Sheets
@@ -26,7 +47,7 @@ def migrar_sqlite_a_google_sheets(db_path='contabilidad.db'):
         return
     
     st.info("📊 Conectando con SQLite...")
-    conn = sqlite3.connect(db_path)
+    conn = conectar_sqlite(db_path)
     
     st.info("☁️ Conectando con Google Sheets...")
     gs_db = GoogleSheetsDB()
@@ -35,116 +56,70 @@ def migrar_sqlite_a_google_sheets(db_path='contabilidad.db'):
     st.info("🔨 Creando estructura de tablas...")
     gs_db.inicializar_todas_las_tablas()
     
+    # Tablas a migrar: (tabla, título de la sección, descripción de los registros)
+    tablas = [
+        ('gastos_mensuales', "1️⃣ Migrando gastos mensuales...", "gastos mensuales"),
+        ('montos_mensuales', "2️⃣ Migrando montos mensuales...", "montos mensuales"),
+        ('pagos', "3️⃣ Migrando pagos...", "pagos"),
+        ('grupos_distribucion', "4️⃣ Migrando grupos de distribución...", "grupos"),
+        ('gastos_en_grupo', "5️⃣ Migrando gastos en grupo...", "registros de gastos en grupo"),
+    ]
+    
     try:
-        # ==================== MIGRAR GASTOS MENSUALES ====================
-        st.subheader("1️⃣ Migrando gastos mensuales...")
-        gastos_df = pd.read_sql_query("SELECT * FROM gastos_mensuales", conn)
-        
-        if not gastos_df.empty:
-            worksheet = gs_db._get_worksheet('gastos_mensuales')
-            
-            # Limpiar datos existentes (excepto header)
-            if worksheet.row_count > 1:
-                worksheet.delete_rows(2, worksheet.row_count)
-            
-            # Convertir DataFrame a lista de listas
-            data_to_insert = gastos_df.values.tolist()
+        # ==================== LEER DATOS DE SQLITE ====================
+        # Se leen todas las tablas primero para escribir en Google Sheets
+        # con dos peticiones en total, en lugar de dos por tabla
+        migradas = []
+        for tabla, titulo, descripcion in tablas:
+            st.subheader(titulo)
+            try:
+                # Leer por bloques y pasar cada uno a listas, sin tener a la vez
+                # la tabla completa como DataFrame y como lista de filas. Los NULL
+                # de SQLite quedan como celdas vacías (NaN no se puede enviar en JSON)
+                filas = []
+                for bloque in pd.read_sql_query(f"SELECT * FROM {tabla}", conn, chunksize=TAMANO_LOTE):
+                    filas.extend(bloque.astype(object).where(bloque.notna(), '').values.tolist())
+            except Exception as e:
+                # Sin gastos mensuales no hay nada que migrar: se aborta
+                if tabla == 'gastos_mensuales':
+                    raise
+                st.warning(f"⚠️ Tabla {tabla} no existe o está vacía: {e}")
+                continue
             
-            # Insertar por lotes
-            if data_to_insert:
-                worksheet.append_rows(data_to_insert)
-            
-            st.success(f"✅ Migrados {len(gastos_df)} gastos mensuales")
-        else:
-            st.warning("⚠️ No hay gastos mensuales para migrar")
-        
-        # ==================== MIGRAR MONTOS MENSUALES ====================
-        st.subheader("2️⃣ Migrando montos mensuales...")
-        try:
-            montos_df = pd.read_sql_query("SELECT * FROM montos_mensuales", conn)
-            
-            if not montos_df.empty:
-                worksheet = gs_db._get_worksheet('montos_mensuales')
-                
-                if worksheet.row_count > 1:
-                    worksheet.delete_rows(2, worksheet.row_count)
-                
-                data_to_insert = montos_df.values.tolist()
-                
-                if data_to_insert:
-                    worksheet.append_rows(data_to_insert)
-                
-                st.success(f"✅ Migrados {len(montos_df)} montos mensuales")
+            if not filas:
+                st.warning(f"⚠️ No hay {descripcion} para migrar")
             else:
-                st.warning("⚠️ No hay montos mensuales para migrar")
-        except Exception as e:
-            st.warning(f"⚠️ Tabla montos_mensuales no existe o está vacía: {e}")
+                migradas.append((tabla, descripcion, filas))
         
-        # ==================== MIGRAR PAGOS ====================
-        st.subheader("3️⃣ Migrando pagos...")
-        try:
-            pagos_df = pd.read_sql_query("SELECT * FROM pagos", conn)
+        # ==================== ESCRIBIR EN GOOGLE SHEETS ====================
+        if migradas:
+            datos = [
+                {'range': f"'{tabla}'!A2", 'values': filas}
+                for tabla, _, filas in migradas
+            ]
+            # Comprobar que los datos se pueden enviar antes de borrar nada de las hojas
+            json.dumps(datos, allow_nan=False)
             
-            if not pagos_df.empty:
-                worksheet = gs_db._get_worksheet('pagos')
-                
+            # Limpiar datos existentes (excepto header) y dejar en cada hoja
+            # las filas justas para los datos nuevos, en una sola petición
+            peticiones = []
+            for tabla, _, filas in migradas:
+                worksheet = gs_db._get_worksheet(tabla)
                 if worksheet.row_count > 1:
-                    worksheet.delete_rows(2, worksheet.row_count)
-                
-                data_to_insert = pagos_df.values.tolist()
-                
-                if data_to_insert:
-                    worksheet.append_rows(data_to_insert)
-                
-                st.success(f"✅ Migrados {len(pagos_df)} pagos")
-            else:
-                st.warning("⚠️ No hay pagos para migrar")
-        except Exception as e:
-            st.warning(f"⚠️ Tabla pagos no existe o está vacía: {e}")
-        
-        # ==================== MIGRAR GRUPOS DE DISTRIBUCIÓN ====================
-        st.subheader("4️⃣ Migrando grupos de distribución...")
-        try:
-            grupos_df = pd.read_sql_query("SELECT * FROM grupos_distribucion", conn)
+                    peticiones.append({'deleteDimension': {'range': {
+                        'sheetId': worksheet.id, 'dimension': 'ROWS',
+                        'startIndex': 1, 'endIndex': worksheet.row_count
+                    }}})
+                peticiones.append({'appendDimension': {
+                    'sheetId': worksheet.id, 'dimension': 'ROWS', 'length': len(filas)
+                }})
+            gs_db.spreadsheet.batch_update({'requests': peticiones})
             
-            if not grupos_df.empty:
-                worksheet = gs_db._get_worksheet('grupos_distribucion')
-                
-                if worksheet.row_count > 1:
-                    worksheet.delete_rows(2, worksheet.row_count)
-                
-                data_to_insert = grupos_df.values.tolist()
-                
-                if data_to_insert:
-                    worksheet.append_rows(data_to_insert)
-                
-                st.success(f"✅ Migrados {len(grupos_df)} grupos")
-            else:
-                st.warning("⚠️ No hay grupos para migrar")
-        except Exception as e:
-            st.warning(f"⚠️ Tabla grupos_distribucion no existe o está vacía: {e}")
-        
-        # ==================== MIGRAR GASTOS EN GRUPO ====================
-        st.subheader("5️⃣ Migrando gastos en grupo...")
-        try:
-            gastos_grupo_df = pd.read_sql_query("SELECT * FROM gastos_en_grupo", conn)
+            # Insertar los datos de todas las tablas en una sola petición
+            gs_db.spreadsheet.values_batch_update({'valueInputOption': 'RAW', 'data': datos})
             
-            if not gastos_grupo_df.empty:
-                worksheet = gs_db._get_worksheet('gastos_en_grupo')
-                
-                if worksheet.row_count > 1:
-                    worksheet.delete_rows(2, worksheet.row_count)
-                
-                data_to_insert = gastos_grupo_df.values.tolist()
-                
-                if data_to_insert:
-                    worksheet.append_rows(data_to_insert)
-                
-                st.success(f"✅ Migrados {len(gastos_grupo_df)} registros de gastos en grupo")
-            else:
-                st.warning("⚠️ No hay gastos en grupo para migrar")
-        except Exception as e:
-            st.warning(f"⚠️ Tabla gastos_en_grupo no existe o está vacía: {e}")
+            for tabla, descripcion, filas in migradas:
+                st.success(f"✅ Migrados {len(filas)} {descripcion}")
         
         # ==================== RESUMEN ====================
         st.success("🎉 ¡Migración completada exitosamente!")